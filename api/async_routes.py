@@ -0,0 +1,545 @@
+import asyncio
+from quart import Blueprint, Response, g, request, jsonify
+from api.instrumentation import begin_request, finish_request
+from api.http_cache import (collection_etag, etag_matches, validator_headers, needs_body_etag,
+                             set_body_etag, choose_encoding, set_encoded)
+from services.aio.user_service import user_service
+from services.aio.mood_service import mood_service
+from services.aio.journal_service import journal_service
+from services.aio.activity_service import activity_service
+from services.aio.content_service import content_service
+from services.content_service import RELATED_CONTENT_COUNT, MAX_RELATED_CONTENT_COUNT
+from services.aio.dashboard_service import dashboard_service
+from services.dashboard_service import parse_fields, DASHBOARD_FIELDS
+from services.aio.generation_service import generation_service
+from services.collection_versions import collection_versions
+from services.search_service import search_service
+from services.stream_hub import stream_hub, STREAM_HEADERS
+from services.insights_service import insights_service, INSIGHTS_DEFAULT_DAYS, INSIGHTS_MAX_DAYS, INSIGHTS_MAX_LAG
+from services.aio.export_service import export_service
+from services.export_service import parse_types, EXPORT_TYPES, EXPORT_FORMATS
+from services.generation_service import TEMPLATES
+from utils.validators import validate_email, validate_required_fields, validate_pagination
+from datetime import datetime
+
+# Async mirror of api.routes for the ASGI app. Routes that are not defined
+# here are served by the Flask blueprint through the fallback in asgi.py.
+api = Blueprint('api', __name__, url_prefix='/api')
+
+# Instrumentation Start
+@api.before_request
+async def start_instrumentation():
+    # Requests share the event loop thread, so a sampled stack could belong
+    # to any of them; the profiler is only offered on the Flask app.
+    g.instrumentation = begin_request(None, allow_profile=False)
+
+
+@api.after_request
+async def record_instrumentation(response):
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    finish_request(g.pop('instrumentation', None), route, request.method, response)
+    return response
+# Instrumentation End
+
+# Conditional Requests Start
+@api.after_request
+async def finalize_response(response):
+    if needs_body_etag(request.method, response):
+        set_body_etag(response, await response.get_data(), request.headers.get('If-None-Match'))
+    encoding = choose_encoding(response, request.accept_encodings)
+    if encoding:
+        set_encoded(response, await response.get_data(), encoding)
+    return response
+# Conditional Requests End
+
+# User Routes Start
+@api.route('/users/profile', methods=['POST'])
+async def create_user_profile():
+    try:
+        data = await request.get_json()
+        
+        required = ['user_id', 'email', 'username', 'age']
+        if not validate_required_fields(data, required):
+            return jsonify({
+                'success': False,
+                'message': 'Missing required fields'
+            }), 400
+        
+        if not validate_email(data['email']):
+            return jsonify({
+                'success': False,
+                'message': 'Invalid email format'
+            }), 400
+        
+        result = await user_service.create_user_profile(
+            user_id=data['user_id'],
+            email=data['email'],
+            username=data['username'],
+            age=data['age'],
+            goals=data.get('goals', [])
+        )
+        
+        status_code = 201 if result['success'] else 400
+        return jsonify(result), status_code
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Server error: {str(e)}'
+        }), 500
+
+
+@api.route('/users/<user_id>', methods=['GET'])
+async def get_user_profile(user_id):
+    try:
+        result = await user_service.get_user_profile(user_id)
+        status_code = 200 if result['success'] else 404
+        return jsonify(result), status_code
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Server error: {str(e)}'
+        }), 500
+
+@api.route('/users/<user_id>/export', methods=['GET'])
+async def export_user_data(user_id):
+    try:
+        types = parse_types(request.args.get('types'))
+        fmt = request.args.get('format', 'ndjson')
+        if types is None or fmt not in EXPORT_FORMATS:
+            return jsonify({
+                'success': False,
+                'message': f"Invalid export parameters. types: {', '.join(EXPORT_TYPES)}; format: {', '.join(EXPORT_FORMATS)}"
+            }), 400
+        
+        compress = request.args.get('gzip', 'false').lower() == 'true'
+        headers = {'Content-Disposition': f'attachment; filename="upliftai-{user_id}.{fmt}"'}
+        if compress:
+            headers['Content-Encoding'] = 'gzip'
+        
+        return Response(
+            export_service.stream_export(user_id, types, fmt, compress),
+            mimetype='application/x-ndjson' if fmt == 'ndjson' else 'application/json',
+            headers=headers
+        )
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Server error: {str(e)}'
+        }), 500
+@api.route('/users/<user_id>/insights', methods=['GET'])
+async def get_user_insights(user_id):
+    try:
+        days = request.args.get('days', INSIGHTS_DEFAULT_DAYS, type=int)
+        lag = request.args.get('lag', 1, type=int)
+        if days is None or lag is None or not 0 < days <= INSIGHTS_MAX_DAYS or not 0 <= lag <= INSIGHTS_MAX_LAG:
+            return jsonify({
+                'success': False,
+                'message': f'Invalid parameters. days: 1-{INSIGHTS_MAX_DAYS}; lag: 0-{INSIGHTS_MAX_LAG}'
+            }), 400
+        
+        # Loading is a blocking storage read and the maths is CPU-bound.
+        result = await asyncio.to_thread(insights_service.get_insights, user_id, days, lag)
+        status_code = 200 if result['success'] else 500
+        return jsonify(result), status_code
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Server error: {str(e)}'
+        }), 500
+#User Routes End
+
+#Mood Routes Start
+@api.route('/moods', methods=['POST'])
+async def create_mood_entry():
+    try:
+        data = await request.get_json()
+        
+        required = ['user_id', 'mood', 'energy']
+        if not validate_required_fields(data, required):
+            return jsonify({
+                'success': False,
+                'message': 'Missing required fields'
+            }), 400
+        
+        date = data.get('date', datetime.now().strftime('%Y-%m-%d'))
+        
+        result = await mood_service.create_mood_entry(
+            user_id=data['user_id'],
+            date=date,
+            mood=data['mood'],
+            energy=data['energy'],
+            notes=data.get('notes')
+        )
+        
+        status_code = 201 if result['success'] else 400
+        return jsonify(result), status_code
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Server error: {str(e)}'
+        }), 500
+
+
+@api.route('/moods/<user_id>', methods=['GET'])
+async def get_user_moods(user_id):
+    try:
+        page_size = request.args.get('page_size', request.args.get('limit'))
+        cursor = request.args.get('cursor')
+        
+        if not validate_pagination(page_size, cursor):
+            return jsonify({
+                'success': False,
+                'message': 'Invalid pagination parameters'
+            }), 400
+        page_size = int(page_size) if page_size is not None else None
+        
+        version = await collection_versions.get_async(user_id, 'moods')
+        
+        etag = collection_etag('moods', version, request.query_string)
+        if etag_matches(request.headers.get('If-None-Match'), etag):
+            return Response(status=304, headers=validator_headers(etag))
+        
+        result = await mood_service.get_user_moods(
+            user_id,
+            since=request.args.get('since'),
+            until=request.args.get('until'),
+            cursor=cursor,
+            page_size=page_size,
+            version=version
+        )
+        status_code = 200 if result['success'] else 500
+        return jsonify(result), status_code, validator_headers(etag) if result['success'] else {}
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Server error: {str(e)}'
+        }), 500
+# Mood Routes End
+
+# Journal Routes Start
+@api.route('/journals', methods=['POST'])
+async def create_journal_entry():
+    try:
+        data = await request.get_json()
+        
+        required = ['user_id', 'content']
+        if not validate_required_fields(data, required):
+            return jsonify({
+                'success': False,
+                'message': 'Missing required fields'
+            }), 400
+        
+        date = data.get('date', datetime.now().strftime('%Y-%m-%d'))
+        
+        result = await journal_service.create_journal_entry(
+            user_id=data['user_id'],
+            date=date,
+            content=data['content'],
+            prompt=data.get('prompt')
+        )
+        
+        status_code = 201 if result['success'] else 400
+        return jsonify(result), status_code
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Server error: {str(e)}'
+        }), 500
+
+
+@api.route('/journals/<user_id>', methods=['GET'])
+async def get_user_journals(user_id):
+    try:
+        page_size = request.args.get('page_size', request.args.get('limit'))
+        cursor = request.args.get('cursor')
+        
+        if not validate_pagination(page_size, cursor):
+            return jsonify({
+                'success': False,
+                'message': 'Invalid pagination parameters'
+            }), 400
+        page_size = int(page_size) if page_size is not None else None
+        
+        version = await collection_versions.get_async(user_id, 'journals')
+        
+        etag = collection_etag('journals', version, request.query_string)
+        if etag_matches(request.headers.get('If-None-Match'), etag):
+            return Response(status=304, headers=validator_headers(etag))
+        
+        result = await journal_service.get_user_journals(
+            user_id,
+            since=request.args.get('since'),
+            until=request.args.get('until'),
+            cursor=cursor,
+            page_size=page_size,
+            version=version
+        )
+        status_code = 200 if result['success'] else 500
+        return jsonify(result), status_code, validator_headers(etag) if result['success'] else {}
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Server error: {str(e)}'
+        }), 500
+
+
+@api.route('/journals/<user_id>/search', methods=['GET'])
+async def search_journals(user_id):
+    try:
+        query = request.args.get('q', '').strip()
+        page_size = request.args.get('page_size')
+        cursor = request.args.get('cursor')
+        
+        if not query:
+            return jsonify({
+                'success': False,
+                'message': 'Missing search query'
+            }), 400
+        
+        if not validate_pagination(page_size, cursor):
+            return jsonify({
+                'success': False,
+                'message': 'Invalid pagination parameters'
+            }), 400
+        page_size = int(page_size) if page_size is not None else None
+        
+        result = await asyncio.to_thread(search_service.search_journals, user_id, query, page_size, cursor)
+        status_code = 200 if result['success'] else 500
+        return jsonify(result), status_code
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Server error: {str(e)}'
+        }), 500
+
+@api.route('/journals/<user_id>/<journal_id>', methods=['DELETE'])
+async def delete_journal_entry(user_id, journal_id):
+    try:
+        result = await journal_service.delete_journal_entry(user_id, journal_id)
+        status_code = 200 if result['success'] else 400
+        return jsonify(result), status_code
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Server error: {str(e)}'
+        }), 500
+# Journal Routes End
+
+# Activity Routes Start
+@api.route('/activities/log', methods=['POST'])
+async def log_user_activity():
+    try:
+        data = await request.get_json()
+        
+        required = ['user_id', 'activity_name', 'duration', 'date']
+        if not validate_required_fields(data, required):
+            return jsonify({
+                'success': False,
+                'message': 'Missing required fields'
+            }), 400
+            
+        user_id = data.pop('user_id')
+        result = await activity_service.log_user_activity(user_id, data)
+        
+        if result.get('buffered'):
+            status_code = 202
+        else:
+            status_code = 201 if result['success'] else 400
+        return jsonify(result), status_code
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Server error: {str(e)}'
+        }), 500
+
+
+@api.route('/activities/user/<user_id>', methods=['GET'])
+async def get_user_activities(user_id):
+    try:
+        page_size = request.args.get('page_size')
+        cursor = request.args.get('cursor')
+        
+        if not validate_pagination(page_size, cursor):
+            return jsonify({
+                'success': False,
+                'message': 'Invalid pagination parameters'
+            }), 400
+        page_size = int(page_size) if page_size is not None else None
+        
+        version = await collection_versions.get_async(user_id, 'user_activities')
+        
+        etag = collection_etag('user_activities', version, request.query_string)
+        if etag_matches(request.headers.get('If-None-Match'), etag):
+            return Response(status=304, headers=validator_headers(etag))
+        
+        result = await activity_service.get_user_activities(
+            user_id,
+            since=request.args.get('since'),
+            until=request.args.get('until'),
+            cursor=cursor,
+            page_size=page_size,
+            version=version
+        )
+        status_code = 200 if result['success'] else 500
+        return jsonify(result), status_code, validator_headers(etag) if result['success'] else {}
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Server error: {str(e)}'
+        }), 500
+# Activity Routes End
+
+# Stream Routes Start
+@api.route('/stream/<user_id>', methods=['GET'])
+async def stream_changes(user_id):
+    try:
+        response = Response(
+            await stream_hub.open_stream_async(user_id),
+            mimetype='text/event-stream',
+            headers=STREAM_HEADERS
+        )
+        # Streams stay open for as long as the client listens.
+        response.timeout = None
+        return response
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Server error: {str(e)}'
+        }), 500
+# Stream Routes End
+
+# Content Routes Start
+@api.route('/content/retrieve', methods=['GET'])
+async def retrieve_relevant_content():
+    try:
+        mood = request.args.get('mood')
+        # Goals may be repeated or sent as one comma-separated value.
+        goals = [goal.strip() for value in request.args.getlist('goals') for goal in value.split(',') if goal.strip()]
+        user_id = request.args.get('user_id')
+        
+        result = await content_service.retrieve_relevant_content(mood, goals, user_id)
+        status_code = 200 if result['success'] else 500
+        return jsonify(result), status_code
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Server error: {str(e)}'
+        }), 500
+    
+@api.route('/content/related/<user_id>', methods=['GET'])
+async def get_related_content(user_id):
+    try:
+        count = request.args.get('count', RELATED_CONTENT_COUNT, type=int)
+        if count is None or not 0 < count <= MAX_RELATED_CONTENT_COUNT:
+            return jsonify({
+                'success': False,
+                'message': f'Invalid count. Use 1-{MAX_RELATED_CONTENT_COUNT}'
+            }), 400
+
+        result = await content_service.get_related_content(user_id, count, request.args.get('type'))
+        status_code = 200 if result['success'] else 500
+        return jsonify(result), status_code
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Server error: {str(e)}'
+        }), 500
+    
+@api.route('/content/tips', methods=['GET'])
+async def get_wellness_tips():
+    try:
+        mood = request.args.get('mood')
+        result = await content_service.get_wellness_tips(mood)
+        status_code = 200 if result['success'] else 500
+        return jsonify(result), status_code
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Server error: {str(e)}'
+        }), 500
+    
+@api.route('/content/quote', methods=['GET'])
+async def get_motivational_quote():
+    try:
+        category = request.args.get('category')
+        result = await content_service.get_motivational_quote(category)
+        status_code = 200 if result['success'] else 500
+        return jsonify(result), status_code
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Server error: {str(e)}'
+        }), 500
+
+@api.route('/content/generate', methods=['POST'])
+async def generate_wellness_content():
+    try:
+        data = await request.get_json()
+        
+        if not validate_required_fields(data, ['user_id']):
+            return jsonify({
+                'success': False,
+                'message': 'Missing required fields'
+            }), 400
+        
+        template = data.get('template', 'wellness')
+        if template not in TEMPLATES:
+            return jsonify({
+                'success': False,
+                'message': f"Unknown template. Choose from: {', '.join(TEMPLATES)}"
+            }), 400
+        
+        result = await generation_service.generate_wellness_content(
+            user_id=data['user_id'],
+            mood=data.get('mood'),
+            goals=data.get('goals', []),
+            template=template
+        )
+        
+        status_code = 200 if result['success'] else 500
+        return jsonify(result), status_code
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Server error: {str(e)}'
+        }), 500
+# Content Routes End
+
+# Dashboard Routes Start
+@api.route('/dashboard/<user_id>', methods=['GET'])
+async def get_dashboard(user_id):
+    try:
+        fields = parse_fields(request.args.get('fields'))
+        if fields is None:
+            return jsonify({
+                'success': False,
+                'message': f"Invalid fields. Choose from: {', '.join(DASHBOARD_FIELDS)}"
+            }), 400
+        
+        result = await dashboard_service.get_dashboard(user_id, fields)
+        status_code = 200 if result['success'] else 500
+        return jsonify(result), status_code
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Server error: {str(e)}'
+        }), 500
+# Dashboard Routes End
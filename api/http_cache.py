@@ -0,0 +1,96 @@
+import gzip
+import hashlib
+import os
+from typing import Dict, Optional
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSION_MIN_BYTES = int(os.getenv('COMPRESSION_MIN_BYTES', '1024'))
+COMPRESSION_LEVEL = int(os.getenv('COMPRESSION_LEVEL', '6'))
+BROTLI_QUALITY = int(os.getenv('BROTLI_QUALITY', '5'))
+
+# Brotli is preferred when the optional `brotli` package is installed.
+ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+COMPRESSIBLE_TYPES = ('application/json', 'application/x-ndjson', 'text/')
+
+# Shared by the Flask and Quart blueprints. History routes tag responses
+# with the stored collection version and answer If-None-Match after reading
+# only that; any other successful GET is tagged with a hash of its body.
+# Browsers revalidate on every poll, and an unchanged response costs only
+# the headers.
+
+
+def collection_etag(collection: str, version: str, query: bytes) -> str:
+    # The query string is part of the tag, so pages and date ranges of one
+    # collection never share a tag.
+    variant = hashlib.blake2b(query, digest_size=6).hexdigest()
+    return f'"{collection}-{version}-{variant}"'
+
+
+def body_etag(data: bytes) -> str:
+    return f'"{hashlib.blake2b(data, digest_size=16).hexdigest()}"'
+
+
+def validator_headers(etag: str) -> Dict[str, str]:
+    return {'ETag': etag, 'Cache-Control': 'private, no-cache'}
+
+
+def _opaque(tag: str) -> str:
+    # Weak comparison, as If-None-Match requires, ignoring the suffix that
+    # set_encoded adds for compressed representations.
+    tag = tag.strip()
+    if tag.startswith('W/'):
+        tag = tag[2:]
+    tag = tag.strip('"')
+    for encoding in ('br', 'gzip'):
+        if tag.endswith(f'-{encoding}'):
+            return tag[:-len(encoding) - 1]
+    return tag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    opaque = _opaque(etag)
+    return any(_opaque(tag) == opaque for tag in if_none_match.split(','))
+
+
+def needs_body_etag(method: str, response) -> bool:
+    return (method in ('GET', 'HEAD') and response.status_code == 200
+            and 'ETag' not in response.headers and 'Content-Encoding' not in response.headers
+            and response.content_length is not None)
+
+
+def set_body_etag(response, data: bytes, if_none_match: Optional[str]) -> None:
+    etag = body_etag(data)
+    response.headers.update(validator_headers(etag))
+    if etag_matches(if_none_match, etag):
+        response.status_code = 304
+        response.set_data(b'')
+
+
+def choose_encoding(response, accept_encodings) -> Optional[str]:
+    if (response.status_code != 200 or 'Content-Encoding' in response.headers
+            or response.content_length is None or response.content_length < COMPRESSION_MIN_BYTES
+            or not (response.mimetype or '').startswith(COMPRESSIBLE_TYPES)):
+        return None
+    response.vary.add('Accept-Encoding')
+    return accept_encodings.best_match(ENCODINGS)
+
+
+def set_encoded(response, data: bytes, encoding: str) -> None:
+    if encoding == 'br':
+        body = brotli.compress(data, quality=BROTLI_QUALITY)
+    else:
+        body = gzip.compress(data, compresslevel=COMPRESSION_LEVEL, mtime=0)
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    # A compressed body is a different representation, so it gets its own tag.
+    etag = response.headers.get('ETag')
+    if etag:
+        response.headers['ETag'] = f'"{_opaque(etag)}-{encoding}"'
@@ -0,0 +1,70 @@
+import time
+from typing import Dict, Optional
+from flask.json.provider import DefaultJSONProvider
+from services.metrics import metrics
+from services.storage.transport import begin_request_scope, end_request_scope
+from utils.profiler import SamplingProfiler, should_profile
+
+PROFILE_HEADER = 'X-Profile'
+PHASES = ('storage', 'serialize', 'render')
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    # jsonify() goes through the app's JSON provider, so timing it here
+    # covers every route without touching the views. Quart uses the same
+    # provider class.
+
+    def response(self, *args, **kwargs):
+        with metrics.phase('render'):
+            return super().response(*args, **kwargs)
+
+
+def begin_request(profile_header: Optional[str], allow_profile: bool = True) -> Dict:
+    state = {
+        'started': time.perf_counter(),
+        'token': metrics.start_request(),
+        'storage_token': begin_request_scope(),
+        'profiler': None
+    }
+    if allow_profile and should_profile(profile_header):
+        state['profiler'] = SamplingProfiler().start()
+    return state
+
+
+def finish_request(state: Optional[Dict], route: str, method: str, response) -> None:
+    # Shared by the Flask and Quart after_request hooks. Streamed bodies are
+    # produced after this runs, so for them the timings cover the handler
+    # and the size is unknown.
+    if state is None:
+        return
+    elapsed = time.perf_counter() - state['started']
+    phases = metrics.end_request(state['token'])
+
+    # A failed response caused by storage being unreachable is something the
+    # client should retry, whatever status the handler picked for it.
+    unavailable = end_request_scope(state['storage_token'])
+    if unavailable is not None and response.status_code >= 400:
+        response.status_code = 503
+        response.headers['Retry-After'] = str(int(unavailable.retry_after + 0.5))
+
+    metrics.inc('http_requests_total', {'route': route, 'method': method, 'status': str(response.status_code)})
+    metrics.observe('http_request_duration_seconds', {'route': route, 'method': method}, elapsed)
+    for phase in PHASES:
+        if phase in phases:
+            metrics.observe('http_request_phase_seconds', {'route': route, 'phase': phase}, phases[phase])
+    if not getattr(response, 'is_streamed', False) and response.content_length is not None:
+        metrics.observe('http_response_bytes', {'route': route}, response.content_length)
+
+    if metrics.enabled:
+        timings = [f'{phase};dur={phases[phase] * 1000:.2f}' for phase in PHASES if phase in phases]
+        timings.append(f'total;dur={elapsed * 1000:.2f}')
+        response.headers['Server-Timing'] = ', '.join(timings)
+
+    profiler = state['profiler']
+    if profiler is not None:
+        profiler.stop()
+        try:
+            path = profiler.dump(f'{method}-{route}')
+            response.headers['X-Profile-File'] = path
+        except OSError as e:
+            print(f"Error writing profile for {route}: {str(e)}")
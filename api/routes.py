@@ -1,14 +1,53 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, g, request, jsonify, stream_with_context
+from api.instrumentation import begin_request, finish_request, PROFILE_HEADER
+from api.http_cache import (collection_etag, etag_matches, validator_headers, needs_body_etag,
+                             set_body_etag, choose_encoding, set_encoded)
 from services.user_service import user_service
 from services.mood_service import mood_service
 from services.journal_service import journal_service
 from services.activity_service import activity_service
-from services.content_service import content_service
-from utils.validators import validate_email, validate_required_fields
+from services.content_service import content_service, RELATED_CONTENT_COUNT, MAX_RELATED_CONTENT_COUNT
+from services.stats_service import stats_service
+from services.batch_service import batch_service, MAX_BATCH_SIZE
+from services.collection_versions import collection_versions
+from services.history_cache import history_cache
+from services.search_service import search_service
+from services.stream_hub import stream_hub, STREAM_HEADERS
+from services.insights_service import insights_service, INSIGHTS_DEFAULT_DAYS, INSIGHTS_MAX_DAYS, INSIGHTS_MAX_LAG
+from services.export_service import export_service, parse_types, EXPORT_TYPES, EXPORT_FORMATS
+from services.dashboard_service import dashboard_service, parse_fields, DASHBOARD_FIELDS
+from services.generation_service import generation_service, generation_cache, TEMPLATES
+from utils.validators import validate_email, validate_required_fields, validate_pagination
 from datetime import datetime
 
 api = Blueprint('api', __name__, url_prefix='/api')
 
+# Instrumentation Start
+@api.before_request
+def start_instrumentation():
+    g.instrumentation = begin_request(request.headers.get(PROFILE_HEADER))
+
+
+@api.after_request
+def record_instrumentation(response):
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    finish_request(g.pop('instrumentation', None), route, request.method, response)
+    return response
+# Instrumentation End
+
+# Conditional Requests Start
+# Registered after the instrumentation hook, so it runs first and the
+# metrics see the final status and size.
+@api.after_request
+def finalize_response(response):
+    if needs_body_etag(request.method, response):
+        set_body_etag(response, response.get_data(), request.headers.get('If-None-Match'))
+    encoding = choose_encoding(response, request.accept_encodings)
+    if encoding:
+        set_encoded(response, response.get_data(), encoding)
+    return response
+# Conditional Requests End
+
 # User Routes Start
 @api.route('/users/profile', methods=['POST'])
 def create_user_profile():
@@ -58,6 +97,68 @@ def get_user_profile(user_id):
             'success': False,
             'message': f'Server error: {str(e)}'
         }), 500
+
+
+@api.route('/users/<user_id>/stats', methods=['GET'])
+def get_user_stats(user_id):
+    try:
+        result = stats_service.get_user_stats(user_id)
+        status_code = 200 if result['success'] else 500
+        return jsonify(result), status_code
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Server error: {str(e)}'
+        }), 500
+
+@api.route('/users/<user_id>/export', methods=['GET'])
+def export_user_data(user_id):
+    try:
+        types = parse_types(request.args.get('types'))
+        fmt = request.args.get('format', 'ndjson')
+        if types is None or fmt not in EXPORT_FORMATS:
+            return jsonify({
+                'success': False,
+                'message': f"Invalid export parameters. types: {', '.join(EXPORT_TYPES)}; format: {', '.join(EXPORT_FORMATS)}"
+            }), 400
+        
+        compress = request.args.get('gzip', 'false').lower() == 'true'
+        headers = {'Content-Disposition': f'attachment; filename="upliftai-{user_id}.{fmt}"'}
+        if compress:
+            headers['Content-Encoding'] = 'gzip'
+        
+        return Response(
+            stream_with_context(export_service.stream_export(user_id, types, fmt, compress)),
+            mimetype='application/x-ndjson' if fmt == 'ndjson' else 'application/json',
+            headers=headers
+        )
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Server error: {str(e)}'
+        }), 500
+@api.route('/users/<user_id>/insights', methods=['GET'])
+def get_user_insights(user_id):
+    try:
+        days = request.args.get('days', INSIGHTS_DEFAULT_DAYS, type=int)
+        lag = request.args.get('lag', 1, type=int)
+        if days is None or lag is None or not 0 < days <= INSIGHTS_MAX_DAYS or not 0 <= lag <= INSIGHTS_MAX_LAG:
+            return jsonify({
+                'success': False,
+                'message': f'Invalid parameters. days: 1-{INSIGHTS_MAX_DAYS}; lag: 0-{INSIGHTS_MAX_LAG}'
+            }), 400
+        
+        result = insights_service.get_insights(user_id, days, lag)
+        status_code = 200 if result['success'] else 500
+        return jsonify(result), status_code
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Server error: {str(e)}'
+        }), 500
 #User Routes End
 
 #Mood Routes Start
@@ -96,9 +197,32 @@ def create_mood_entry():
 @api.route('/moods/<user_id>', methods=['GET'])
 def get_user_moods(user_id):
     try:
-        limit = request.args.get('limit', type=int)
-        result = mood_service.get_user_moods(user_id, limit)
-        return jsonify(result), 200
+        page_size = request.args.get('page_size', request.args.get('limit'))
+        cursor = request.args.get('cursor')
+        
+        if not validate_pagination(page_size, cursor):
+            return jsonify({
+                'success': False,
+                'message': 'Invalid pagination parameters'
+            }), 400
+        page_size = int(page_size) if page_size is not None else None
+        
+        version = collection_versions.get(user_id, 'moods')
+        
+        etag = collection_etag('moods', version, request.query_string)
+        if etag_matches(request.headers.get('If-None-Match'), etag):
+            return Response(status=304, headers=validator_headers(etag))
+        
+        result = mood_service.get_user_moods(
+            user_id,
+            since=request.args.get('since'),
+            until=request.args.get('until'),
+            cursor=cursor,
+            page_size=page_size,
+            version=version
+        )
+        status_code = 200 if result['success'] else 500
+        return jsonify(result), status_code, validator_headers(etag) if result['success'] else {}
         
     except Exception as e:
         return jsonify({
@@ -142,9 +266,32 @@ def create_journal_entry():
 @api.route('/journals/<user_id>', methods=['GET'])
 def get_user_journals(user_id):
     try:
-        limit = request.args.get('limit', type=int)
-        result = journal_service.get_user_journals(user_id, limit)
-        return jsonify(result), 200
+        page_size = request.args.get('page_size', request.args.get('limit'))
+        cursor = request.args.get('cursor')
+        
+        if not validate_pagination(page_size, cursor):
+            return jsonify({
+                'success': False,
+                'message': 'Invalid pagination parameters'
+            }), 400
+        page_size = int(page_size) if page_size is not None else None
+        
+        version = collection_versions.get(user_id, 'journals')
+        
+        etag = collection_etag('journals', version, request.query_string)
+        if etag_matches(request.headers.get('If-None-Match'), etag):
+            return Response(status=304, headers=validator_headers(etag))
+        
+        result = journal_service.get_user_journals(
+            user_id,
+            since=request.args.get('since'),
+            until=request.args.get('until'),
+            cursor=cursor,
+            page_size=page_size,
+            version=version
+        )
+        status_code = 200 if result['success'] else 500
+        return jsonify(result), status_code, validator_headers(etag) if result['success'] else {}
         
     except Exception as e:
         return jsonify({
@@ -153,6 +300,36 @@ def get_user_journals(user_id):
         }), 500
 
 
+@api.route('/journals/<user_id>/search', methods=['GET'])
+def search_journals(user_id):
+    try:
+        query = request.args.get('q', '').strip()
+        page_size = request.args.get('page_size')
+        cursor = request.args.get('cursor')
+        
+        if not query:
+            return jsonify({
+                'success': False,
+                'message': 'Missing search query'
+            }), 400
+        
+        if not validate_pagination(page_size, cursor):
+            return jsonify({
+                'success': False,
+                'message': 'Invalid pagination parameters'
+            }), 400
+        page_size = int(page_size) if page_size is not None else None
+        
+        result = search_service.search_journals(user_id, query, page_size=page_size, cursor=cursor)
+        status_code = 200 if result['success'] else 500
+        return jsonify(result), status_code
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Server error: {str(e)}'
+        }), 500
+
 @api.route('/journals/<user_id>/<journal_id>', methods=['DELETE'])
 def delete_journal_entry(user_id, journal_id):
     try:
@@ -183,7 +360,10 @@ def log_user_activity():
         user_id = data.pop('user_id')
         result = activity_service.log_user_activity(user_id, data)
         
-        status_code = 201 if result['success'] else 400
+        if result.get('buffered'):
+            status_code = 202
+        else:
+            status_code = 201 if result['success'] else 400
         return jsonify(result), status_code
         
     except Exception as e:
@@ -196,8 +376,32 @@ def log_user_activity():
 @api.route('/activities/user/<user_id>', methods=['GET'])
 def get_user_activities(user_id):
     try:
-        result = activity_service.get_user_activities(user_id)
-        return jsonify(result), 200
+        page_size = request.args.get('page_size')
+        cursor = request.args.get('cursor')
+        
+        if not validate_pagination(page_size, cursor):
+            return jsonify({
+                'success': False,
+                'message': 'Invalid pagination parameters'
+            }), 400
+        page_size = int(page_size) if page_size is not None else None
+        
+        version = collection_versions.get(user_id, 'user_activities')
+        
+        etag = collection_etag('user_activities', version, request.query_string)
+        if etag_matches(request.headers.get('If-None-Match'), etag):
+            return Response(status=304, headers=validator_headers(etag))
+        
+        result = activity_service.get_user_activities(
+            user_id,
+            since=request.args.get('since'),
+            until=request.args.get('until'),
+            cursor=cursor,
+            page_size=page_size,
+            version=version
+        )
+        status_code = 200 if result['success'] else 500
+        return jsonify(result), status_code, validator_headers(etag) if result['success'] else {}
         
     except Exception as e:
         return jsonify({
@@ -206,15 +410,67 @@ def get_user_activities(user_id):
         }), 500
 # Activity Routes End
 
+# Stream Routes Start
+@api.route('/stream/<user_id>', methods=['GET'])
+def stream_changes(user_id):
+    # Server-sent events: every new, changed or deleted mood, journal entry
+    # and activity of the user, as it happens.
+    try:
+        return Response(
+            stream_hub.open_stream(user_id),
+            mimetype='text/event-stream',
+            headers=STREAM_HEADERS
+        )
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Server error: {str(e)}'
+        }), 500
+# Stream Routes End
+
+# Batch Routes Start
+@api.route('/entries/batch', methods=['POST'])
+def ingest_entries():
+    try:
+        data = request.get_json()
+        
+        if not validate_required_fields(data, ['user_id', 'entries']) or not isinstance(data['entries'], list):
+            return jsonify({
+                'success': False,
+                'message': 'Missing required fields'
+            }), 400
+        
+        if len(data['entries']) > MAX_BATCH_SIZE:
+            return jsonify({
+                'success': False,
+                'message': f'A batch can contain at most {MAX_BATCH_SIZE} entries'
+            }), 400
+        
+        result = batch_service.ingest_entries(data['user_id'], data['entries'])
+        
+        status_code = 200 if result['success'] else 400
+        return jsonify(result), status_code
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Server error: {str(e)}'
+        }), 500
+# Batch Routes End
+
 # Content Routes Start
 @api.route('/content/retrieve', methods=['GET'])
 def retrieve_relevant_content():
     try:
         mood = request.args.get('mood')
-        goals = request.args.getlist('goals')
+        # Goals may be repeated or sent as one comma-separated value.
+        goals = [goal.strip() for value in request.args.getlist('goals') for goal in value.split(',') if goal.strip()]
+        user_id = request.args.get('user_id')
         
-        result = content_service.retrieve_relevant_content(mood, goals)
-        return jsonify(result), 200
+        result = content_service.retrieve_relevant_content(mood, goals, user_id)
+        status_code = 200 if result['success'] else 500
+        return jsonify(result), status_code
         
     except Exception as e:
         return jsonify({
@@ -222,12 +478,33 @@ def retrieve_relevant_content():
             'message': f'Server error: {str(e)}'
         }), 500
     
+@api.route('/content/related/<user_id>', methods=['GET'])
+def get_related_content(user_id):
+    try:
+        count = request.args.get('count', RELATED_CONTENT_COUNT, type=int)
+        if count is None or not 0 < count <= MAX_RELATED_CONTENT_COUNT:
+            return jsonify({
+                'success': False,
+                'message': f'Invalid count. Use 1-{MAX_RELATED_CONTENT_COUNT}'
+            }), 400
+
+        result = content_service.get_related_content(user_id, count, request.args.get('type'))
+        status_code = 200 if result['success'] else 500
+        return jsonify(result), status_code
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Server error: {str(e)}'
+        }), 500
+    
 @api.route('/content/tips', methods=['GET'])
 def get_wellness_tips():
     try:
         mood = request.args.get('mood')
         result = content_service.get_wellness_tips(mood)
-        return jsonify(result), 200
+        status_code = 200 if result['success'] else 500
+        return jsonify(result), status_code
     except Exception as e:
         return jsonify({
             'success': False,
@@ -239,11 +516,85 @@ def get_motivational_quote():
     try:
         category = request.args.get('category')
         result = content_service.get_motivational_quote(category)
-        return jsonify(result), 200
+        status_code = 200 if result['success'] else 500
+        return jsonify(result), status_code
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Server error: {str(e)}'
+        }), 500
+
+@api.route('/content/generate', methods=['POST'])
+def generate_wellness_content():
+    try:
+        data = request.get_json()
+        
+        if not validate_required_fields(data, ['user_id']):
+            return jsonify({
+                'success': False,
+                'message': 'Missing required fields'
+            }), 400
+        
+        template = data.get('template', 'wellness')
+        if template not in TEMPLATES:
+            return jsonify({
+                'success': False,
+                'message': f"Unknown template. Choose from: {', '.join(TEMPLATES)}"
+            }), 400
+        
+        result = generation_service.generate_wellness_content(
+            user_id=data['user_id'],
+            mood=data.get('mood'),
+            goals=data.get('goals', []),
+            template=template
+        )
+        
+        status_code = 200 if result['success'] else 500
+        return jsonify(result), status_code
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Server error: {str(e)}'
+        }), 500
+# Content Routes End
+
+# Dashboard Routes Start
+@api.route('/dashboard/<user_id>', methods=['GET'])
+def get_dashboard(user_id):
+    try:
+        fields = parse_fields(request.args.get('fields'))
+        if fields is None:
+            return jsonify({
+                'success': False,
+                'message': f"Invalid fields. Choose from: {', '.join(DASHBOARD_FIELDS)}"
+            }), 400
+        
+        result = dashboard_service.get_dashboard(user_id, fields)
+        status_code = 200 if result['success'] else 500
+        return jsonify(result), status_code
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Server error: {str(e)}'
+        }), 500
+# Dashboard Routes End
+
+# Cache Routes Start
+@api.route('/cache/stats', methods=['GET'])
+def get_cache_stats():
+    try:
+        return jsonify({
+            'success': True,
+            'history_cache': history_cache.stats(),
+            'generation_cache': generation_cache.stats()
+        }), 200
         
     except Exception as e:
         return jsonify({
             'success': False,
             'message': f'Server error: {str(e)}'
         }), 500
-# Content Routes End
\ No newline at end of file
+# Cache Routes End
\ No newline at end of file
@@ -1,45 +1,90 @@
-from flask import Flask, render_template
+from flask import Blueprint, Flask, Response, render_template
 from flask_cors import CORS
 from dotenv import load_dotenv
 import os
-from api.routes import api
 
-app = Flask(__name__)
-CORS(app) 
-app.register_blueprint(api) 
+# Storage is configured from the environment, and started on first use or
+# by the warm-up, never at import.
+load_dotenv()
 
-load_dotenv() 
+from services.startup import startup_report, warm_up, STARTUP_WARM_UP
 
-@app.route('/', methods=['GET', 'POST'])
+with startup_report.phase('imports'):
+    from api.routes import api
+    from api.instrumentation import TimedJSONProvider
+    from services.metrics import metrics
+    from services.task_queue import task_queue
+    # Registers the post-write tasks.
+    from services import sentiment_service
+
+pages = Blueprint('pages', __name__)
+
+@pages.route('/', methods=['GET', 'POST'])
 def login():
     firebase_api_key = os.getenv("FIREBASE_API_KEY")
     return render_template('index.html', firebase_api_key=firebase_api_key)
 
-@app.route('/goals')
+@pages.route('/goals')
 def goals():
     firebase_api_key = os.getenv("FIREBASE_API_KEY")
     return render_template('goals.html', firebase_api_key=firebase_api_key)
 
-@app.route('/today')
+@pages.route('/today')
 def today():
     firebase_api_key = os.getenv("FIREBASE_API_KEY")
     return render_template('today.html', firebase_api_key=firebase_api_key)
 
-@app.route('/journal')
+@pages.route('/journal')
 def journal_page():
     firebase_api_key = os.getenv("FIREBASE_API_KEY")
     return render_template('journal.html', firebase_api_key=firebase_api_key)
 
-@app.route('/activity')
+@pages.route('/activity')
 def activity_page():
     firebase_api_key = os.getenv("FIREBASE_API_KEY")
     return render_template('activity.html', firebase_api_key=firebase_api_key)
 
-@app.route('/profile')
+@pages.route('/profile')
 def profile_page():
     firebase_api_key = os.getenv("FIREBASE_API_KEY")
     return render_template('profile.html', firebase_api_key=firebase_api_key)
 
+@pages.route('/metrics')
+def metrics_endpoint():
+    # Prometheus text exposition format.
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+
+def build_app() -> Flask:
+    with startup_report.phase('app'):
+        app = Flask(__name__)
+        app.json = TimedJSONProvider(app)
+        CORS(app)
+        app.register_blueprint(pages)
+        app.register_blueprint(api)
+    return app
+
+
+def create_app(warm: bool = None) -> Flask:
+    # Application factory: `flask --app app run`, `gunicorn 'app:create_app()'`.
+    # With warm-up (STARTUP_WARM_UP, or warm=True) the worker starts storage
+    # and loads the content catalog before it serves its first request.
+    app = build_app()
+    if STARTUP_WARM_UP if warm is None else warm:
+        warm_up()
+    task_queue.start()
+    print(startup_report.summary())
+    return app
+
+
+def __getattr__(name):
+    # `from app import app` and `gunicorn app:app` build the app on first
+    # access, so importing this module for create_app() builds nothing.
+    if name == 'app':
+        globals()['app'] = create_app()
+        return globals()['app']
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 if __name__ == "__main__":
-    app.run(debug=True)
+    create_app().run(debug=True)
@@ -0,0 +1,74 @@
+from asgiref.wsgi import WsgiToAsgi
+from dotenv import load_dotenv
+from quart import Quart, request
+from werkzeug.exceptions import HTTPException
+
+# Storage is configured from the environment, and started on first use or
+# by the warm-up, never at import.
+load_dotenv()
+
+from services.startup import startup_report, warm_up_async, STARTUP_WARM_UP
+
+with startup_report.phase('imports'):
+    from api.async_routes import api
+    from api.instrumentation import TimedJSONProvider
+    from services.aio.firebase_service import firebase_service
+    from app import build_app, task_queue
+
+
+async def add_cors_headers(response):
+    response.headers['Access-Control-Allow-Origin'] = '*'
+    if request.method == 'OPTIONS':
+        response.headers['Access-Control-Allow-Headers'] = request.headers.get(
+            'Access-Control-Request-Headers', '*')
+        response.headers['Access-Control-Allow-Methods'] = 'GET, POST, PUT, PATCH, DELETE, OPTIONS'
+    return response
+
+
+async def close_storage():
+    await firebase_service.close()
+
+
+def create_quart_app(warm: bool = None) -> Quart:
+    # Warm-up runs in before_serving, on the event loop the async storage
+    # client will use, and the server accepts connections once it is done.
+    warm = STARTUP_WARM_UP if warm is None else warm
+    with startup_report.phase('app'):
+        quart_app = Quart(__name__)
+        quart_app.json = TimedJSONProvider(quart_app)
+        quart_app.register_blueprint(api)
+        quart_app.after_request(add_cors_headers)
+        quart_app.after_serving(close_storage)
+
+    @quart_app.before_serving
+    async def start_up():
+        if warm:
+            await warm_up_async()
+        task_queue.start()
+        print(startup_report.summary())
+
+    return quart_app
+
+
+# Serve with an ASGI server, e.g. `uvicorn asgi:app` or `hypercorn asgi:app`.
+# Routes in api.async_routes run on the event loop; pages and the remaining
+# /api routes are handed to the Flask app.
+quart_app = create_quart_app()
+flask_app = build_app()
+wsgi_app = WsgiToAsgi(flask_app)
+url_adapter = quart_app.url_map.bind('')
+
+
+def is_async_route(path: str, method: str) -> bool:
+    try:
+        url_adapter.match(path, method=method)
+        return True
+    except HTTPException:
+        return False
+
+
+async def app(scope, receive, send):
+    if scope['type'] == 'http' and not is_async_route(scope['path'], scope['method']):
+        await wsgi_app(scope, receive, send)
+    else:
+        await quart_app(scope, receive, send)
@@ -0,0 +1,83 @@
+# Per-row cost of turning a stored history into a JSON response.
+#
+#     python -m benchmarks.bench_models [--rows 10000] [--repeat 5]
+import argparse
+import json
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from models.journal_entry import JournalEntry
+from models.mood_entry import MoodEntry
+
+MOODS = ['Happy', 'Sad', 'Anxious', 'Calm', 'Stressed']
+ENERGY = ['Low', 'Medium', 'High']
+
+
+def make_rows(count: int):
+    start = datetime(2024, 1, 1)
+    moods, journals = [], []
+    for i in range(count):
+        created_at = (start + timedelta(minutes=i)).isoformat()
+        moods.append((f'm{i:06d}', {
+            'user_id': 'bench-user', 'date': created_at[:10], 'mood': MOODS[i % 5],
+            'energy': ENERGY[i % 3], 'notes': 'Quick check-in' if i % 4 else None, 'created_at': created_at
+        }))
+        journals.append((f'j{i:06d}', {
+            'user_id': 'bench-user', 'date': created_at[:10], 'prompt': 'How was your day?',
+            'content': 'Today I went for a walk and felt a bit calmer afterwards. ' * 3, 'created_at': created_at
+        }))
+    return moods, journals
+
+
+def via_objects(model, rows):
+    return [model.from_dict(key, value).to_dict() for key, value in rows]
+
+
+def via_rows(model, rows):
+    return [model.row_to_dict(key, value) for key, value in rows]
+
+
+def measure(fn, model, rows, repeat: int):
+    best_build = best_total = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        payload = fn(model, rows)
+        built = time.perf_counter()
+        json.dumps({'success': True, 'count': len(payload), 'items': payload})
+        finished = time.perf_counter()
+        best_build = min(best_build, built - started)
+        best_total = min(best_total, finished - started)
+
+    tracemalloc.start()
+    fn(model, rows)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'build_us_per_row': round(best_build / len(rows) * 1e6, 3),
+        'total_us_per_row': round(best_total / len(rows) * 1e6, 3),
+        'peak_bytes_per_row': peak // len(rows)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Model serialization microbenchmark')
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    moods, journals = make_rows(args.rows)
+    assert via_objects(MoodEntry, moods[:10]) == via_rows(MoodEntry, moods[:10])
+    assert via_objects(JournalEntry, journals[:10]) == via_rows(JournalEntry, journals[:10])
+
+    print(f'{args.rows} rows, best of {args.repeat}')
+    print(f"{'model':<14}{'path':<20}{'build us/row':>14}{'+json us/row':>14}{'peak B/row':>12}")
+    for model, rows in ((MoodEntry, moods), (JournalEntry, journals)):
+        for name, fn in (('from_dict+to_dict', via_objects), ('row_to_dict', via_rows)):
+            result = measure(fn, model, rows, args.repeat)
+            print(f"{model.__name__:<14}{name:<20}{result['build_us_per_row']:>14}"
+                  f"{result['total_us_per_row']:>14}{result['peak_bytes_per_row']:>12}")
+
+
+if __name__ == '__main__':
+    main()
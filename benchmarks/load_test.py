@@ -0,0 +1,284 @@
+# Replays request mixes against the real Flask app, backed by the in-process
+# memory storage backend with injected latency, and reports latency
+# percentiles, throughput and peak RSS per endpoint.
+#
+#     python -m benchmarks.load_test [--latency-ms 5] [--sizes 10,1000,50000]
+#                                    [--baseline benchmarks/results/<previous>.json]
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+
+MOODS = ['Happy', 'Sad', 'Anxious', 'Calm', 'Stressed', 'Tired']
+ENERGY = ['Low', 'Medium', 'High']
+CATEGORIES = ['Stress', 'Mindfulness', 'Relaxation', 'Motivation', 'Energy', 'Gratitude', 'Self-Compassion']
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+WRITER_USERS = 50
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Load test the API against in-memory storage')
+    parser.add_argument('--latency-ms', type=float, default=5.0, help='injected latency per storage call')
+    parser.add_argument('--jitter-ms', type=float, default=2.0, help='extra random latency per storage call')
+    parser.add_argument('--requests', type=int, default=200, help='requests per scenario')
+    parser.add_argument('--full-requests', type=int, default=20, help='requests per full-history scenario')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--sizes', default='10,1000,50000', help='history sizes (entries per user)')
+    parser.add_argument('--scenarios', help='comma-separated subset of scenarios to run')
+    parser.add_argument('--history-cache', action='store_true',
+                        help='keep the history read cache on (off by default, so history reads hit storage)')
+    parser.add_argument('--output', help='results file (default: benchmarks/results/load_test-<commit>.json)')
+    parser.add_argument('--baseline', help='earlier results file to compare against')
+    parser.add_argument('--seed', type=int, default=1)
+    return parser.parse_args()
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return 'unknown'
+
+
+def current_rss_bytes() -> int:
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        # ru_maxrss is the process-wide peak (kilobytes on Linux, bytes on macOS).
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class RssSampler:
+    # Polls resident memory in the background while a scenario runs.
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, current_rss_bytes())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self.peak = current_rss_bytes()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, current_rss_bytes())
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = max(int(round(pct / 100 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(index, len(sorted_values) - 1)]
+
+
+def seeded_created_at(now: datetime, index: int) -> str:
+    return (now - timedelta(minutes=index)).isoformat()
+
+
+def seed_storage(backend, sizes: List[int], now: datetime) -> None:
+    updates = {}
+    for content_index in range(60):
+        updates[f'content/bench-content-{content_index:03d}'] = {
+            'text': f'Benchmark content {content_index}',
+            'type': ['Tip', 'Quote', 'Affirmation'][content_index % 3],
+            'category': CATEGORIES[content_index % len(CATEGORIES)],
+            'tags': ['bench']
+        }
+    for size in sizes:
+        user_id = f'bench-history-{size}'
+        for i in range(size):
+            created_at = seeded_created_at(now, i)
+            updates[f'moods/{user_id}/m{i:07d}'] = {
+                'user_id': user_id, 'date': created_at[:10], 'mood': MOODS[i % len(MOODS)],
+                'energy': ENERGY[i % len(ENERGY)], 'notes': None, 'created_at': created_at
+            }
+            updates[f'journals/{user_id}/j{i:07d}'] = {
+                'user_id': user_id, 'date': created_at[:10], 'prompt': 'How was your day?',
+                'content': 'Went for a walk after work and felt calmer. ' * 4, 'created_at': created_at
+            }
+    backend.update('/', updates)
+
+
+def build_scenarios(sizes: List[int], now: datetime) -> Dict[str, Callable]:
+    from utils.pagination import encode_cursor
+
+    def history_page(client, rng, collection, prefix, user_id, size):
+        # Starts at a random depth of the seeded history, so repeated
+        # requests read different pages instead of one cached page.
+        index = rng.randrange(size)
+        cursor = encode_cursor(seeded_created_at(now, index), f'{prefix}{index:07d}')
+        return client.get(f'/api/{collection}/{user_id}?page_size=50&cursor={cursor}')
+
+    def mood_write(client, rng):
+        return client.post('/api/moods', json={
+            'user_id': f'bench-writer-{rng.randrange(WRITER_USERS)}',
+            'mood': rng.choice(MOODS), 'energy': rng.choice(ENERGY), 'notes': 'load test'
+        })
+
+    def journal_write(client, rng):
+        return client.post('/api/journals', json={
+            'user_id': f'bench-writer-{rng.randrange(WRITER_USERS)}',
+            'content': 'Load test entry about work, sleep and friends.', 'prompt': 'Evening check-in'
+        })
+
+    def content_retrieve(client, rng):
+        return client.get(f'/api/content/retrieve?mood={rng.choice(MOODS)}')
+
+    def content_tips(client, rng):
+        return client.get('/api/content/tips')
+
+    scenarios = {
+        'mood_write': mood_write,
+        'journal_write': journal_write,
+        'content_retrieve': content_retrieve,
+        'content_tips': content_tips
+    }
+    for size in sizes:
+        user_id = f'bench-history-{size}'
+        scenarios[f'mood_history_page_{size}'] = (
+            lambda client, rng, u=user_id, n=size: history_page(client, rng, 'moods', 'm', u, n))
+        scenarios[f'journal_history_page_{size}'] = (
+            lambda client, rng, u=user_id, n=size: history_page(client, rng, 'journals', 'j', u, n))
+        scenarios[f'mood_history_full_{size}'] = lambda client, rng, u=user_id: client.get(f'/api/moods/{u}')
+
+    # Roughly what the pages generate: mostly paged reads and content, some writes.
+    weighted = [(name, 40 / len(sizes)) for name in scenarios if name.startswith(('mood_history_page', 'journal_history_page'))]
+    weighted += [('content_retrieve', 15), ('content_tips', 10), ('mood_write', 15), ('journal_write', 10)]
+    names = [name for name, _ in weighted]
+    weights = [weight for _, weight in weighted]
+    base = dict(scenarios)
+
+    def mixed(client, rng):
+        return base[rng.choices(names, weights)[0]](client, rng)
+
+    scenarios['mixed'] = mixed
+    return scenarios
+
+
+def run_scenario(app, fn: Callable, count: int, concurrency: int, seed: int) -> Dict:
+    local = threading.local()
+
+    def one(index: int):
+        if not hasattr(local, 'client'):
+            local.client = app.test_client()
+        rng = random.Random(seed * 100003 + index)
+        started = time.perf_counter()
+        response = fn(local.client, rng)
+        return time.perf_counter() - started, response.status_code
+
+    one(-1)  # warm-up, not measured
+    with RssSampler() as rss, ThreadPoolExecutor(max_workers=concurrency) as pool:
+        started = time.perf_counter()
+        outcomes = list(pool.map(one, range(count)))
+        elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency * 1000 for latency, _ in outcomes)
+    return {
+        'requests': count,
+        'errors': sum(1 for _, status in outcomes if status >= 400),
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'max_ms': round(latencies[-1], 3) if latencies else 0.0,
+        'throughput_rps': round(count / elapsed, 2) if elapsed else 0.0,
+        'peak_rss_mb': round(rss.peak / (1024 * 1024), 1)
+    }
+
+
+def print_results(results: Dict, baseline: Dict = None) -> None:
+    header = f"{'scenario':<28}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>10}{'RSS MB':>9}{'err':>5}"
+    if baseline:
+        header += f"{'p95 chg':>10}{'req/s chg':>11}"
+    print(header)
+    for name, result in results.items():
+        line = (f"{name:<28}{result['p50_ms']:>10}{result['p95_ms']:>10}{result['p99_ms']:>10}"
+                f"{result['throughput_rps']:>10}{result['peak_rss_mb']:>9}{result['errors']:>5}")
+        previous = (baseline or {}).get(name)
+        if previous:
+            def change(new, old):
+                return f'{(new - old) / old * 100:+.1f}%' if old else 'n/a'
+            line += f"{change(result['p95_ms'], previous['p95_ms']):>10}"
+            line += f"{change(result['throughput_rps'], previous['throughput_rps']):>11}"
+        print(line)
+
+
+def main():
+    args = parse_args()
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+
+    # Storage and caches are configured from the environment at import time.
+    os.environ['STORAGE_BACKEND'] = 'memory'
+    os.environ['MEMORY_STORAGE_LATENCY_MS'] = '0'
+    if not args.history_cache:
+        os.environ['HISTORY_CACHE_MAX_MB'] = '0'
+    from app import app
+    from services.firebase_service import firebase_service
+
+    backend = firebase_service.backend
+    print(f'Seeding {len(sizes)} users with {", ".join(map(str, sizes))} moods and journals...')
+    now = datetime.utcnow()
+    seed_storage(backend, sizes, now)
+    backend.latency_ms, backend.jitter_ms = args.latency_ms, args.jitter_ms
+
+    scenarios = build_scenarios(sizes, now)
+    if args.scenarios:
+        selected = [name.strip() for name in args.scenarios.split(',')]
+        unknown = [name for name in selected if name not in scenarios]
+        if unknown:
+            sys.exit(f"Unknown scenarios: {', '.join(unknown)}. Available: {', '.join(scenarios)}")
+        scenarios = {name: scenarios[name] for name in selected}
+
+    results = {}
+    for name, fn in scenarios.items():
+        count = args.full_requests if name.startswith('mood_history_full') else args.requests
+        results[name] = run_scenario(app, fn, count, args.concurrency, args.seed)
+        print(f"  {name}: p95 {results[name]['p95_ms']} ms, {results[name]['throughput_rps']} req/s")
+
+    commit = git_commit()
+    report = {
+        'meta': {
+            'commit': commit,
+            'timestamp': datetime.utcnow().isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'config': {key: value for key, value in vars(args).items() if key not in ('output', 'baseline')}
+        },
+        'results': results
+    }
+
+    output = args.output or os.path.join(RESULTS_DIR, f'load_test-{commit}.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+    print()
+    print_results(results, baseline)
+    print(f'\nResults written to {output}')
+
+
+if __name__ == '__main__':
+    main()
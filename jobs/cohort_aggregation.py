@@ -0,0 +1,235 @@
+# Platform-wide aggregates for operations reporting: active users per day,
+# mood distribution by age band and journaling streak histograms.
+#
+#     python -m jobs.cohort_aggregation [--workers 8] [--shard-size 200] [--days 90]
+#                                       [--output report.json] [--store]
+#
+# Users are read from `users` one shard (page) at a time, in key order. Each shard is
+# handed to a worker process, which reads those users' moods, journals and
+# activities and returns partial counts that the parent adds up. At most
+# two shards per worker are in flight, so memory stays flat however many
+# users there are.
+import argparse
+import contextlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import date, datetime, timedelta
+from multiprocessing import get_context
+from typing import Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+
+# Storage is configured from the environment when the services are imported,
+# in the parent and again in every worker process. Their start-up messages go
+# to stderr so stdout carries only the report.
+load_dotenv()
+
+with contextlib.redirect_stdout(sys.stderr):
+    from services.firebase_service import firebase_service
+    from services.storage.tree import ORDER_BY_KEY
+    from services.stats_service import entry_day, safe_key, streaks
+
+AGE_BANDS = ((17, 'under-18'), (24, '18-24'), (34, '25-34'), (44, '35-44'), (54, '45-54'), (64, '55-64'))
+STREAK_BUCKETS = ((0, '0'), (1, '1'), (3, '2-3'), (7, '4-7'), (14, '8-14'), (30, '15-30'))
+ACTIVITY_COLLECTIONS = ('moods', 'journals', 'user_activities')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Aggregate mood, journal and activity data across all users')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='worker processes (0 runs every shard in this process)')
+    parser.add_argument('--shard-size', type=int, default=200, help='users per shard')
+    parser.add_argument('--days', type=int, default=90, help='days of active-user counts to report')
+    parser.add_argument('--output', help='write the report to this file instead of stdout')
+    parser.add_argument('--store', action='store_true', help='also save the report under cohort_reports/<date>')
+    return parser.parse_args()
+
+
+def age_band(age) -> str:
+    try:
+        age = int(age)
+    except (TypeError, ValueError):
+        return 'unknown'
+    if age <= 0:
+        return 'unknown'
+    for upper, label in AGE_BANDS:
+        if age <= upper:
+            return label
+    return '65+'
+
+
+def streak_bucket(length: int) -> str:
+    for upper, label in STREAK_BUCKETS:
+        if length <= upper:
+            return label
+    return '31+'
+
+
+def _add(counter: Dict, key: str, amount: int = 1) -> None:
+    counter[key] = counter.get(key, 0) + amount
+
+
+def merge_counts(total: Dict, partial: Dict) -> Dict:
+    # Adds nested dicts of counts; shards hold disjoint users, so sums are exact.
+    for key, value in partial.items():
+        if isinstance(value, dict):
+            merge_counts(total.setdefault(key, {}), value)
+        else:
+            total[key] = total.get(key, 0) + value
+    return total
+
+
+def aggregate_shard(users: List[Tuple[str, Optional[int]]], since: str, today: str) -> Dict:
+    # Runs in a worker process. Only this shard's histories are in memory.
+    today_date = date.fromisoformat(today)
+    partial = {
+        'users': 0,
+        'entries': {},
+        'active_users': {},
+        'age_bands': {},
+        'current_streaks': {},
+        'longest_streaks': {}
+    }
+    for user_id, age in users:
+        band = partial['age_bands'].setdefault(age_band(age), {'users': 0, 'moods': {}})
+        band['users'] += 1
+        partial['users'] += 1
+
+        active_days = set()
+        journal_days = set()
+        for collection in ACTIVITY_COLLECTIONS:
+            entries = firebase_service.get(f'{collection}/{user_id}') or {}
+            _add(partial['entries'], collection, len(entries))
+            for data in entries.values():
+                if not isinstance(data, dict):
+                    continue
+                day = entry_day(data)
+                if day:
+                    active_days.add(day)
+                    if collection == 'journals':
+                        journal_days.add(day)
+                if collection == 'moods':
+                    _add(band['moods'], safe_key(data.get('mood')))
+
+        for day in active_days:
+            if since <= day <= today:
+                _add(partial['active_users'], day)
+
+        user_streaks = streaks(list(journal_days), today_date)
+        _add(partial['current_streaks'], streak_bucket(user_streaks['current_streak']))
+        _add(partial['longest_streaks'], streak_bucket(user_streaks['longest_streak']))
+    return partial
+
+
+def iter_user_shards(shard_size: int):
+    # Pages backwards on the user key, which every user node has and no two
+    # share, so no user is skipped for a missing or shared field. Each page
+    # after the first ends at the previous page's first key and repeats it.
+    end_at = None
+    while True:
+        rows = firebase_service.query('users', ORDER_BY_KEY, end_at=end_at,
+                                      limit_to_last=shard_size + (0 if end_at is None else 1))
+        if end_at is not None:
+            rows = [(user_id, data) for user_id, data in rows if user_id < end_at]
+        if rows:
+            yield [(user_id, data.get('age') if isinstance(data, dict) else None) for user_id, data in rows]
+        if len(rows) < shard_size:
+            break
+        end_at = rows[0][0]
+
+
+def run(workers: int, shard_size: int, since: str, today: str) -> Tuple[Dict, int]:
+    total, shards = aggregate(workers, shard_size, since, today)
+    if total.get('users', 0) != shards['users']:
+        raise RuntimeError(f"Aggregated {total.get('users', 0)} users but listed {shards['users']}")
+    return total, shards['count']
+
+
+def aggregate(workers: int, shard_size: int, since: str, today: str) -> Tuple[Dict, Dict]:
+    # Returns the merged counts and {count, users} for the shards listed, so
+    # run() can check that every listed user made it into the report.
+    total: Dict = {}
+    shards = {'count': 0, 'users': 0}
+    if workers <= 0:
+        for users in iter_user_shards(shard_size):
+            merge_counts(total, aggregate_shard(users, since, today))
+            shards['count'] += 1
+            shards['users'] += len(users)
+        return total, shards
+
+    # Spawned rather than forked, so each worker opens its own storage
+    # connections instead of inheriting the parent's sockets.
+    with ProcessPoolExecutor(max_workers=workers, mp_context=get_context('spawn')) as pool:
+        pending = set()
+        for users in iter_user_shards(shard_size):
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    merge_counts(total, future.result())
+            pending.add(pool.submit(aggregate_shard, users, since, today))
+            shards['count'] += 1
+            shards['users'] += len(users)
+        for future in pending:
+            merge_counts(total, future.result())
+    return total, shards
+
+
+def build_report(total: Dict, since: str, today: str, shards: int, elapsed: float) -> Dict:
+    def ordered(counter: Dict, labels: List[str]) -> Dict:
+        return {label: counter.get(label, 0) for label in labels}
+
+    band_labels = [label for _, label in AGE_BANDS] + ['65+', 'unknown']
+    streak_labels = [label for _, label in STREAK_BUCKETS] + ['31+']
+    start = date.fromisoformat(since)
+    days = [(start + timedelta(days=offset)).isoformat()
+            for offset in range((date.fromisoformat(today) - start).days + 1)]
+    active_users = total.get('active_users', {})
+    entries = total.get('entries', {})
+
+    return {
+        'generated_at': datetime.utcnow().isoformat(),
+        'since': since,
+        'until': today,
+        'users': total.get('users', 0),
+        'mood_entries': entries.get('moods', 0),
+        'journal_entries': entries.get('journals', 0),
+        'activity_entries': entries.get('user_activities', 0),
+        'active_users': {day: active_users.get(day, 0) for day in days},
+        'age_bands': {label: total['age_bands'][label] for label in band_labels if label in total.get('age_bands', {})},
+        'journal_streaks': {
+            'current': ordered(total.get('current_streaks', {}), streak_labels),
+            'longest': ordered(total.get('longest_streaks', {}), streak_labels)
+        },
+        'run': {'shards': shards, 'seconds': round(elapsed, 2)}
+    }
+
+
+def main():
+    args = parse_args()
+    workers = args.workers
+    if workers > 0 and firebase_service.backend.name == 'memory':
+        # Worker processes would each see their own empty in-memory tree.
+        print('Memory storage is per process; running shards in this process.', file=sys.stderr)
+        workers = 0
+
+    today = date.today().isoformat()
+    since = (date.today() - timedelta(days=max(args.days, 1) - 1)).isoformat()
+    started = time.perf_counter()
+    total, shards = run(workers, max(args.shard_size, 1), since, today)
+    report = build_report(total, since, today, shards, time.perf_counter() - started)
+
+    if args.store:
+        firebase_service.set(f'cohort_reports/{today}', report)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Aggregated {report['users']} users in {shards} shards "
+              f"({report['run']['seconds']}s); report written to {args.output}", file=sys.stderr)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
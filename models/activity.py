@@ -1,6 +1,7 @@
 from typing import List, Optional
 
 class Activity:
+    __slots__ = ('activity_id', 'name', 'type', 'duration', 'description')
 
     def __init__(
         self,
@@ -32,4 +33,13 @@ class Activity:
             type=data.get('type'),
             duration=data.get('duration'),
             description=data.get('description')
-        )
\ No newline at end of file
+        )
+
+    @staticmethod
+    def row_to_dict(activity_id: str, data: dict) -> dict:
+        return {
+            'name': data.get('name'),
+            'type': data.get('type'),
+            'duration': data.get('duration'),
+            'description': data.get('description')
+        }
@@ -1,6 +1,7 @@
 from typing import List, Optional
 
 class Content:
+    __slots__ = ('content_id', 'text', 'type', 'category', 'tags', 'author')
 
     def __init__(
         self,
@@ -20,6 +21,7 @@ class Content:
     
     def to_dict(self) -> dict:
         return {
+            'content_id': self.content_id,
             'text': self.text,
             'type': self.type,
             'category': self.category,
@@ -36,4 +38,15 @@ class Content:
             category=data.get('category'),
             tags=data.get('tags', []),
             author=data.get('author')
-        )
\ No newline at end of file
+        )
+
+    @staticmethod
+    def row_to_dict(content_id: str, data: dict) -> dict:
+        return {
+            'content_id': content_id,
+            'text': data.get('text'),
+            'type': data.get('type'),
+            'category': data.get('category'),
+            'tags': data.get('tags') or [],
+            'author': data.get('author')
+        }
@@ -2,6 +2,8 @@ from datetime import datetime
 from typing import Optional
 
 class JournalEntry:
+    __slots__ = ('journal_id', 'user_id', 'date', 'content', 'prompt', 'created_at', 'sentiment')
+
     def __init__(
         self,
         journal_id: str,
@@ -9,7 +11,8 @@ class JournalEntry:
         date: str,
         content: str,
         prompt: Optional[str] = None,
-        created_at: Optional[str] = None
+        created_at: Optional[str] = None,
+        sentiment: Optional[dict] = None
     ):
         self.journal_id = journal_id
         self.user_id = user_id
@@ -17,6 +20,8 @@ class JournalEntry:
         self.content = content
         self.prompt = prompt
         self.created_at = created_at or datetime.utcnow().isoformat()
+        # Written back by the background sentiment task.
+        self.sentiment = sentiment
     
     def to_dict(self) -> dict:
         return {
@@ -25,7 +30,8 @@ class JournalEntry:
             'date': self.date,
             'content': self.content,
             'prompt': self.prompt,
-            'created_at': self.created_at
+            'created_at': self.created_at,
+            'sentiment': self.sentiment
         }
     
     @staticmethod
@@ -36,5 +42,18 @@ class JournalEntry:
             date=data.get('date'),
             content=data.get('content'),
             prompt=data.get('prompt'),
-            created_at=data.get('created_at')
-        )
\ No newline at end of file
+            created_at=data.get('created_at'),
+            sentiment=data.get('sentiment')
+        )
+
+    @staticmethod
+    def row_to_dict(journal_id: str, data: dict) -> dict:
+        return {
+            'journal_id': journal_id,
+            'user_id': data.get('user_id'),
+            'date': data.get('date'),
+            'content': data.get('content'),
+            'prompt': data.get('prompt'),
+            'created_at': data.get('created_at') or datetime.utcnow().isoformat(),
+            'sentiment': data.get('sentiment')
+        }
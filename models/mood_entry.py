@@ -2,6 +2,7 @@ from datetime import datetime
 from typing import Optional
 
 class MoodEntry:
+    __slots__ = ('entry_id', 'user_id', 'date', 'mood', 'energy', 'notes', 'created_at')
 
     def __init__(
         self,
@@ -41,4 +42,17 @@ class MoodEntry:
             energy=data.get('energy'),
             notes=data.get('notes'),
             created_at=data.get('created_at')
-        )
\ No newline at end of file
+        )
+
+    @staticmethod
+    def row_to_dict(entry_id: str, data: dict) -> dict:
+        # Storage row straight to its API shape, identical to
+        # from_dict(...).to_dict() but without building the model object.
+        return {
+            'user_id': data.get('user_id'),
+            'date': data.get('date'),
+            'mood': data.get('mood'),
+            'energy': data.get('energy'),
+            'notes': data.get('notes'),
+            'created_at': data.get('created_at') or datetime.utcnow().isoformat()
+        }
@@ -2,6 +2,7 @@ from datetime import datetime
 from typing import Optional, List
 
 class User:
+    __slots__ = ('user_id', 'email', 'password_hash', 'username', 'age', 'goals', 'created_at')
 
     def __init__(
         self,
@@ -41,4 +42,15 @@ class User:
             age=data.get('age'),
             goals=data.get('goals', []),
             created_at=data.get('created_at')
-        )
\ No newline at end of file
+        )
+
+    @staticmethod
+    def row_to_dict(user_id: str, data: dict) -> dict:
+        return {
+            'email': data.get('email'),
+            'password_hash': data.get('password_hash'),
+            'username': data.get('username'),
+            'age': data.get('age'),
+            'goals': data.get('goals') or [],
+            'created_at': data.get('created_at') or datetime.utcnow().isoformat()
+        }
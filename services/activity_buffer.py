@@ -0,0 +1,295 @@
+import atexit
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Tuple
+from services.collection_versions import collection_versions
+from services.firebase_service import firebase_service
+from services.metrics import metrics
+from services.storage.tree import ORDER_BY_KEY
+from services.storage.transport import StorageUnavailableError, record_request_failure
+from services import events
+
+ACTIVITY_BUFFER_ENABLED = os.getenv('ACTIVITY_BUFFER_ENABLED', 'false').lower() == 'true'
+ACTIVITY_BUFFER_FLUSH_RECORDS = int(os.getenv('ACTIVITY_BUFFER_FLUSH_RECORDS', '200'))
+ACTIVITY_BUFFER_FLUSH_SECONDS = float(os.getenv('ACTIVITY_BUFFER_FLUSH_SECONDS', '1'))
+ACTIVITY_BUFFER_CAPACITY = int(os.getenv('ACTIVITY_BUFFER_CAPACITY', '10000'))
+ACTIVITY_BUFFER_BLOCK_SECONDS = float(os.getenv('ACTIVITY_BUFFER_BLOCK_SECONDS', '0.5'))
+ACTIVITY_BUFFER_SPOOL = os.getenv('ACTIVITY_BUFFER_SPOOL', '')
+ACTIVITY_BUFFER_FSYNC = os.getenv('ACTIVITY_BUFFER_FSYNC', 'false').lower() == 'true'
+
+
+class ActivityBufferFullError(StorageUnavailableError):
+    pass
+
+
+# Write-behind buffer for activity logs. Records get their final push id up
+# front and are written in the background as multi-path updates of at most
+# `flush_records` records, once that many are waiting or every
+# `flush_seconds`, and on shutdown. With a spool file every record is
+# appended there before it is acknowledged. Records are written in spool
+# order, so after each flush the offset of the last written record is saved
+# next to the spool, and the spool is emptied whenever everything in it has
+# been written. Records past the saved offset at startup are recovered by
+# the background thread and written on its first flush. When `capacity` records are
+# waiting, callers wait up to `block_seconds` for room and are then turned
+# away with a 503.
+class ActivityBuffer:
+
+    def __init__(self, enabled: bool = ACTIVITY_BUFFER_ENABLED,
+                 flush_records: int = ACTIVITY_BUFFER_FLUSH_RECORDS,
+                 flush_seconds: float = ACTIVITY_BUFFER_FLUSH_SECONDS,
+                 capacity: int = ACTIVITY_BUFFER_CAPACITY,
+                 block_seconds: float = ACTIVITY_BUFFER_BLOCK_SECONDS,
+                 spool_path: str = ACTIVITY_BUFFER_SPOOL,
+                 fsync: bool = ACTIVITY_BUFFER_FSYNC):
+        self.enabled = enabled
+        self.flush_records = max(flush_records, 1)
+        self.flush_seconds = flush_seconds
+        self.capacity = max(capacity, self.flush_records)
+        self.block_seconds = block_seconds
+        self.spool_path = spool_path
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._room = threading.Condition(self._lock)
+        self._flush_lock = threading.Lock()
+        # Ordered {path: (user_id, activity_id, data, end offset in the spool)};
+        # dicts keep insertion order.
+        self._pending: Dict[str, Tuple[str, str, Dict, int]] = {}
+        self._in_flight = 0
+        self._retry_at = 0.0
+        self._spool = None
+        self._spool_end = 0
+        # Spool bytes left from an earlier run, read by the background thread.
+        self._recover_end = 0
+        self._thread = None
+        self._closed = False
+        self.flushed = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.rejected = 0
+
+    def _start(self) -> None:
+        # Called with the lock held, on first use.
+        if self._thread is not None:
+            return
+        if self.spool_path:
+            self._spool = open(self.spool_path, 'ab')
+            self._recover_end = self._spool_end = self._trim_torn_line()
+        self._thread = threading.Thread(target=self._run, name='activity-buffer', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def add(self, user_id: str, activity_data: Dict) -> str:
+        activity_id = firebase_service.new_key()
+        path = f'user_activities/{user_id}/{activity_id}'
+        with self._lock:
+            if self._closed:
+                raise ActivityBufferFullError('Activity buffer is shut down')
+            self._start()
+            deadline = time.monotonic() + self.block_seconds
+            while self._waiting() >= self.capacity:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.rejected += 1
+                    error = ActivityBufferFullError('Activity buffer is full, try again shortly',
+                                                    max(self.flush_seconds, 1.0))
+                    record_request_failure(error)
+                    raise error
+                self._room.wait(remaining)
+
+            if self._spool is not None:
+                line = (json.dumps({'user_id': user_id, 'id': activity_id, 'data': activity_data}) + '\n').encode('utf-8')
+                self._spool.write(line)
+                self._spool.flush()
+                if self.fsync:
+                    os.fsync(self._spool.fileno())
+                self._spool_end += len(line)
+            self._pending[path] = (user_id, activity_id, activity_data, self._spool_end)
+            if len(self._pending) >= self.flush_records:
+                self._wake.notify()
+        return activity_id
+
+    def _waiting(self) -> int:
+        return len(self._pending) + self._in_flight
+
+    def _run(self) -> None:
+        if self._recover_end:
+            self._recover()
+        while True:
+            with self._lock:
+                # Size-triggered wake-ups are ignored for a while after a
+                # failed flush, so an outage is not retried on every add.
+                deadline = time.monotonic() + self.flush_seconds
+                while not self._closed and (len(self._pending) < self.flush_records
+                                            or time.monotonic() < self._retry_at):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._wake.wait(remaining)
+                if self._closed:
+                    return
+            self.flush()
+
+    def flush(self) -> int:
+        # Writes everything pending, one batch at a time. A failed batch goes
+        # back to the front of the queue and is retried on the next flush.
+        written = 0
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    batch = dict(list(self._pending.items())[:self.flush_records])
+                    if not batch:
+                        self._empty_spool()
+                        break
+                    for path in batch:
+                        del self._pending[path]
+                    self._in_flight = len(batch)
+                updates = {path: record[2] for path, record in batch.items()}
+                for user_id in {record[0] for record in batch.values()}:
+                    collection_versions.stamp('user_activities', user_id, updates)
+                try:
+                    firebase_service.update('/', updates)
+                except Exception as e:
+                    print(f"Error flushing {len(batch)} buffered activities: {str(e)}")
+                    with self._lock:
+                        self._pending = {**batch, **self._pending}
+                        self._in_flight = 0
+                        self._retry_at = time.monotonic() + self.flush_seconds
+                        self.failed_flushes += 1
+                    break
+
+                with self._lock:
+                    self._in_flight = 0
+                    self.flushed += len(batch)
+                    self.flushes += 1
+                    self._room.notify_all()
+                # Batches are taken from the front, so everything up to the
+                # end of this one has been written.
+                self._save_offset(list(batch.values())[-1][3])
+                written += len(batch)
+                events.publish_many([events.write_event('user_activities', user_id, 'create', activity_id, data)
+                                     for user_id, activity_id, data, _ in batch.values()])
+        return written
+
+    def _offset_path(self) -> str:
+        return self.spool_path + '.offset'
+
+    def _save_offset(self, offset: int) -> None:
+        if self._spool is None:
+            return
+        temp_path = self._offset_path() + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as temp:
+            temp.write(str(offset))
+            temp.flush()
+            if self.fsync:
+                os.fsync(temp.fileno())
+        os.replace(temp_path, self._offset_path())
+
+    def _empty_spool(self) -> None:
+        # Called with the lock held once nothing is waiting. The offset goes
+        # back to zero first: a crash in between replays written records,
+        # which recovery skips, rather than skipping unwritten ones.
+        if self._spool is None or not self._spool_end or self._recover_end:
+            return
+        self._save_offset(0)
+        self._spool.truncate(0)
+        self._spool_end = 0
+
+    def _trim_torn_line(self) -> int:
+        # Called with the lock held. Cuts a final line left half-written by a
+        # crash mid-append, so new records start on a line of their own.
+        size = end = self._spool.seek(0, os.SEEK_END)
+        with open(self.spool_path, 'rb') as spool:
+            while end > 0:
+                start = max(end - 4096, 0)
+                spool.seek(start)
+                newline = spool.read(end - start).rfind(b'\n')
+                if newline >= 0:
+                    end = start + newline + 1
+                    break
+                end = start
+        if end < size:
+            self._spool.truncate(end)
+        return end
+
+    def _recover(self) -> None:
+        # Runs on the background thread before its first flush, so requests
+        # never wait on it.
+        try:
+            with open(self._offset_path(), encoding='utf-8') as offset_file:
+                offset = int(offset_file.read() or 0)
+        except (OSError, ValueError):
+            offset = 0
+        if offset > self._recover_end:
+            offset = 0
+
+        records: Dict[str, Tuple[str, str, Dict, int]] = {}
+        with open(self.spool_path, 'rb') as spool:
+            spool.seek(offset)
+            for line in spool:
+                offset += len(line)
+                if offset > self._recover_end:
+                    break
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                path = f"user_activities/{record['user_id']}/{record['id']}"
+                records[path] = (record['user_id'], record['id'], record['data'], offset)
+
+        # A crash between a flush and saving its offset leaves records that
+        # were already written; skip those so their events are not repeated.
+        # Push ids sort by time, so one key range per user covers them.
+        ids_by_user: Dict[str, List[str]] = {}
+        for user_id, activity_id, _, _ in records.values():
+            ids_by_user.setdefault(user_id, []).append(activity_id)
+        for user_id, ids in ids_by_user.items():
+            try:
+                rows = firebase_service.query(f'user_activities/{user_id}', ORDER_BY_KEY,
+                                              start_at=min(ids), end_at=max(ids))
+            except Exception as e:
+                print(f"Error checking spooled activities of {user_id}: {str(e)}")
+                continue
+            for key, _ in rows:
+                records.pop(f'user_activities/{user_id}/{key}', None)
+
+        with self._lock:
+            # Ahead of anything added since startup, as in the spool.
+            self._pending = {**records, **self._pending}
+            self._recover_end = 0
+            if len(self._pending) >= self.flush_records:
+                self._wake.notify()
+        if ids_by_user:
+            print(f"♻️ Recovered {len(records)} buffered activities from {self.spool_path}")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed or self._thread is None:
+                self._closed = True
+                return
+            self._closed = True
+            self._wake.notify_all()
+        self._thread.join()
+        self.flush()
+        with self._lock:
+            if self._spool is not None:
+                self._spool.close()
+                self._spool = None
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'pending': self._waiting(),
+                'flushed': self.flushed,
+                'flushes': self.flushes,
+                'failed_flushes': self.failed_flushes,
+                'rejected': self.rejected,
+                'capacity': self.capacity
+            }
+
+
+activity_buffer = ActivityBuffer()
+metrics.register_collector('activity_buffer', activity_buffer.stats)
@@ -1,5 +1,9 @@
 from typing import Dict
 from services.firebase_service import firebase_service
+from services.activity_buffer import activity_buffer
+from services.collection_versions import collection_versions
+from services.history_cache import history_cache
+from services import events
 
 class ActivityService:
   
@@ -12,7 +16,21 @@ class ActivityService:
                 from datetime import datetime
                 activity_data['timestamp'] = datetime.now().isoformat()
                 
-            activity_id = firebase_service.create(path, activity_data)
+            if activity_buffer.enabled:
+                # Written in the background; the events go out on flush.
+                activity_id = activity_buffer.add(user_id, activity_data)
+                return {
+                    'success': True,
+                    'message': 'Activity queued',
+                    'id': activity_id,
+                    'data': activity_data,
+                    'buffered': True
+                }
+            
+            activity_id = firebase_service.new_key()
+            firebase_service.update('/', collection_versions.stamp(
+                'user_activities', user_id, {f'{path}/{activity_id}': activity_data}))
+            events.publish('user_activities', user_id, 'create', activity_id, activity_data)
             
             return {
                 'success': True,
@@ -27,23 +45,21 @@ class ActivityService:
             }
 
     @staticmethod
-    def get_user_activities(user_id: str) -> Dict:
+    def get_user_activities(user_id: str, since: str = None, until: str = None,
+                            cursor: str = None, page_size: int = None,
+                            version: str = None) -> Dict:
         try:
-            path = f'user_activities/{user_id}'
-            data = firebase_service.get(path)
-            
-            activities = []
-            if data:
-                for key, value in data.items():
-                    value['id'] = key
-                    activities.append(value)
-                
-                activities.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
+            activities, next_cursor = history_cache.get_or_load(
+                user_id, 'user_activities', (since, until, cursor, page_size),
+                lambda: ActivityService._load_activities(user_id, since, until, cursor, page_size),
+                version=version
+            )
                 
             return {
                 'success': True,
                 'activities': activities,
-                'count': len(activities)
+                'count': len(activities),
+                'next_cursor': next_cursor
             }
         except Exception as e:
             return {
@@ -51,4 +67,19 @@ class ActivityService:
                 'message': f'Error getting user activities: {str(e)}'
             }
 
+    @staticmethod
+    def _load_activities(user_id: str, since: str, until: str, cursor: str, page_size: int):
+        rows, next_cursor = firebase_service.get_page(
+            f'user_activities/{user_id}', 'timestamp',
+            since=since,
+            until=until,
+            cursor=cursor,
+            page_size=page_size
+        )
+        
+        activities = []
+        for key, value in rows:
+            activities.append(dict(value, id=key))
+        return activities, next_cursor
+
 activity_service = ActivityService()
\ No newline at end of file
@@ -0,0 +1,86 @@
+import asyncio
+from datetime import datetime
+from typing import Dict
+from services.aio.firebase_service import firebase_service
+from services.activity_buffer import activity_buffer
+from services.collection_versions import collection_versions
+from services.history_cache import history_cache
+from services import events
+
+class AsyncActivityService:
+  
+    @staticmethod
+    async def log_user_activity(user_id: str, activity_data: Dict) -> Dict:
+        try:
+            path = f'user_activities/{user_id}'
+           
+            if 'timestamp' not in activity_data:
+                activity_data['timestamp'] = datetime.now().isoformat()
+                
+            if activity_buffer.enabled:
+                # May wait briefly for room when the buffer is full.
+                activity_id = await asyncio.to_thread(activity_buffer.add, user_id, activity_data)
+                return {
+                    'success': True,
+                    'message': 'Activity queued',
+                    'id': activity_id,
+                    'data': activity_data,
+                    'buffered': True
+                }
+            
+            activity_id = firebase_service.new_key()
+            await firebase_service.update('/', collection_versions.stamp(
+                'user_activities', user_id, {f'{path}/{activity_id}': activity_data}))
+            await asyncio.to_thread(events.publish, 'user_activities', user_id, 'create', activity_id, activity_data)
+            
+            return {
+                'success': True,
+                'message': 'Activity logged successfully',
+                'id': activity_id,
+                'data': activity_data
+            }
+        except Exception as e:
+            return {
+                'success': False,
+                'message': f'Error logging activity: {str(e)}'
+            }
+
+    @staticmethod
+    async def get_user_activities(user_id: str, since: str = None, until: str = None,
+                                  cursor: str = None, page_size: int = None,
+                                  version: str = None) -> Dict:
+        try:
+            activities, next_cursor = await history_cache.get_or_load_async(
+                user_id, 'user_activities', (since, until, cursor, page_size),
+                lambda: AsyncActivityService._load_activities(user_id, since, until, cursor, page_size),
+                version=version
+            )
+                
+            return {
+                'success': True,
+                'activities': activities,
+                'count': len(activities),
+                'next_cursor': next_cursor
+            }
+        except Exception as e:
+            return {
+                'success': False,
+                'message': f'Error getting user activities: {str(e)}'
+            }
+
+    @staticmethod
+    async def _load_activities(user_id: str, since: str, until: str, cursor: str, page_size: int):
+        rows, next_cursor = await firebase_service.get_page(
+            f'user_activities/{user_id}', 'timestamp',
+            since=since,
+            until=until,
+            cursor=cursor,
+            page_size=page_size
+        )
+        
+        activities = []
+        for key, value in rows:
+            activities.append(dict(value, id=key))
+        return activities, next_cursor
+
+activity_service = AsyncActivityService()
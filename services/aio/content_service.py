@@ -0,0 +1,41 @@
+import asyncio
+from typing import Dict, List
+from services.content_catalog import content_catalog
+from services.content_service import ContentService, RELATED_CONTENT_COUNT
+
+class AsyncContentService:
+    # Content is served from the in-process catalog, so only a reload touches
+    # storage. That reload runs on a worker thread; cached reads stay inline.
+
+    @staticmethod
+    async def _run(func, *args) -> Dict:
+        if content_catalog.is_fresh():
+            return func(*args)
+        return await asyncio.to_thread(func, *args)
+
+    @staticmethod
+    async def get_content_by_type(content_type: str) -> Dict:
+        return await AsyncContentService._run(ContentService.get_content_by_type, content_type)
+
+    @staticmethod
+    async def retrieve_relevant_content(user_mood: str = None, user_goals: List[str] = None,
+                                        user_id: str = None) -> Dict:
+        if user_id and not user_goals:
+            # Reads the user's goals from storage.
+            return await asyncio.to_thread(ContentService.retrieve_relevant_content, user_mood, user_goals, user_id)
+        return await AsyncContentService._run(ContentService.retrieve_relevant_content, user_mood, user_goals, user_id)
+
+    @staticmethod
+    async def get_related_content(user_id: str, count: int = RELATED_CONTENT_COUNT, content_type: str = None) -> Dict:
+        # Reads the user's latest journal entries from storage.
+        return await asyncio.to_thread(ContentService.get_related_content, user_id, count, content_type)
+
+    @staticmethod
+    async def get_wellness_tips(user_mood: str = None) -> Dict:
+        return await AsyncContentService._run(ContentService.get_wellness_tips, user_mood)
+
+    @staticmethod
+    async def get_motivational_quote(category: str = None) -> Dict:
+        return ContentService.get_motivational_quote(category)
+
+content_service = AsyncContentService()
@@ -0,0 +1,51 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, List
+from services.aio.user_service import user_service
+from services.aio.mood_service import mood_service
+from services.aio.journal_service import journal_service
+from services.aio.content_service import content_service
+from services.stats_service import stats_service
+from services.dashboard_service import DASHBOARD_TIMEOUT, DASHBOARD_JOURNAL_COUNT, collect_field
+
+ASYNC_DASHBOARD_LOADERS: Dict[str, Callable[[str], Awaitable[Dict]]] = {
+    'profile': lambda user_id: user_service.get_user_profile(user_id),
+    'stats': lambda user_id: asyncio.to_thread(stats_service.get_user_stats, user_id),
+    'latest_mood': lambda user_id: mood_service.get_user_moods(user_id, page_size=1),
+    'journals': lambda user_id: journal_service.get_user_journals(user_id, page_size=DASHBOARD_JOURNAL_COUNT),
+    'tips': lambda user_id: content_service.get_wellness_tips(),
+    'quote': lambda user_id: content_service.get_motivational_quote()
+}
+
+
+class AsyncDashboardService:
+
+    @staticmethod
+    async def _load(field: str, user_id: str, timeout: float) -> Dict:
+        try:
+            return await asyncio.wait_for(ASYNC_DASHBOARD_LOADERS[field](user_id), timeout)
+        except asyncio.TimeoutError:
+            return {'success': False, 'message': 'Timed out'}
+
+    @staticmethod
+    async def get_dashboard(user_id: str, fields: List[str], timeout: float = DASHBOARD_TIMEOUT) -> Dict:
+        try:
+            results = await asyncio.gather(*(
+                AsyncDashboardService._load(field, user_id, timeout) for field in fields
+            ))
+
+            dashboard, errors = {}, {}
+            for field, result in zip(fields, results):
+                collect_field(field, result, dashboard, errors)
+
+            return {
+                'success': True,
+                'dashboard': dashboard,
+                'errors': errors
+            }
+        except Exception as e:
+            return {
+                'success': False,
+                'message': f'Error loading dashboard: {str(e)}'
+            }
+
+dashboard_service = AsyncDashboardService()
@@ -0,0 +1,39 @@
+from typing import AsyncIterator, Dict, List
+from services.aio.firebase_service import firebase_service
+from services.export_service import EXPORT_PAGE_SIZE, EXPORT_TYPES, ExportWriter
+
+class AsyncExportService:
+
+    @staticmethod
+    async def iter_records(user_id: str, types: List[str]) -> AsyncIterator[Dict]:
+        for record_type in types:
+            collection, order_by, to_dict = EXPORT_TYPES[record_type]
+            cursor = None
+            while True:
+                rows, cursor = await firebase_service.get_page(
+                    f'{collection}/{user_id}', order_by,
+                    cursor=cursor,
+                    page_size=EXPORT_PAGE_SIZE
+                )
+                for key, value in rows:
+                    yield {'type': record_type, 'id': key, 'data': to_dict(key, value)}
+                if not cursor:
+                    break
+
+    @staticmethod
+    async def stream_export(user_id: str, types: List[str], fmt: str = 'ndjson',
+                            compress: bool = False) -> AsyncIterator[bytes]:
+        writer = ExportWriter(user_id, fmt, compress)
+        writer.open()
+        try:
+            async for record in AsyncExportService.iter_records(user_id, types):
+                chunk = writer.write(record)
+                if chunk:
+                    yield chunk
+        except Exception as e:
+            print(f"Error exporting data for {user_id}: {str(e)}")
+            yield writer.close(error=f'Export failed: {str(e)}')
+            return
+        yield writer.close()
+
+export_service = AsyncExportService()
@@ -0,0 +1,110 @@
+import time
+from typing import Optional, Dict, Any, Callable, List, Tuple
+from services.metrics import metrics
+from services.firebase_service import firebase_service as sync_firebase_service
+from services.storage.async_backends import AsyncStorageBackend, create_async_backend
+from services.storage.push_id import generate_push_id
+from services.storage.transport import TransportPolicy
+from utils.pagination import page_bounds, refetch_count, trim_page
+
+class AsyncFirebaseService:
+    _instance = None
+    _backend = None
+    transport = TransportPolicy()
+    
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(AsyncFirebaseService, cls).__new__(cls)
+        return cls._instance
+    
+    @property
+    def backend(self) -> AsyncStorageBackend:
+        # Created on first use so the HTTP client binds to the serving event loop.
+        if AsyncFirebaseService._backend is None:
+            AsyncFirebaseService._backend = create_async_backend(sync_firebase_service.backend)
+        return AsyncFirebaseService._backend
+    
+    async def _call(self, op: str, path: str, fn: Callable, *args, payload: Any = None, **kwargs) -> Any:
+        if not metrics.enabled:
+            return await self.transport.call_async(op, fn, *args, **kwargs)
+        started = time.perf_counter()
+        try:
+            result = await self.transport.call_async(op, fn, *args, **kwargs)
+        except Exception:
+            metrics.observe_storage(self.backend.name, op, path, time.perf_counter() - started, failed=True)
+            raise
+        metrics.observe_storage(self.backend.name, op, path, time.perf_counter() - started,
+                                result=result, payload=payload)
+        return result
+    
+    def new_key(self) -> str:
+        return generate_push_id()
+    
+    async def create(self, path: str, data: Dict[str, Any]) -> str:
+        try:
+            return await self._call('create', path, self.backend.create, path, data, payload=data)
+        except Exception as e:
+            print(f"Error creating record at {path}: {str(e)}")
+            raise
+    
+    async def set(self, path: str, data: Dict[str, Any]) -> None:
+        try:
+            await self._call('set', path, self.backend.set, path, data, payload=data)
+        except Exception as e:
+            print(f"Error setting data at {path}: {str(e)}")
+            raise
+    
+    async def get(self, path: str) -> Optional[Dict]:
+        try:
+            return await self._call('get', path, self.backend.get, path)
+        except Exception as e:
+            print(f"Error getting data from {path}: {str(e)}")
+            raise
+    
+    async def query(self, path: str, order_by: str, start_at: Optional[str] = None,
+                    end_at: Optional[str] = None, limit_to_last: Optional[int] = None) -> List[Tuple[str, Dict]]:
+        try:
+            return await self._call('query', path, self.backend.query, path, order_by, start_at=start_at,
+                                    end_at=end_at, limit_to_last=limit_to_last)
+        except Exception as e:
+            print(f"Error querying data from {path}: {str(e)}")
+            raise
+
+    async def get_page(self, path: str, order_by: str, since: Optional[str] = None,
+                       until: Optional[str] = None, cursor: Optional[str] = None,
+                       page_size: Optional[int] = None) -> Tuple[List[Tuple[str, Dict]], Optional[str]]:
+        end_at, fetch_count, after = page_bounds(until, cursor, page_size)
+        while True:
+            rows = await self.query(path, order_by, start_at=since, end_at=end_at, limit_to_last=fetch_count)
+            fetch_count = refetch_count(rows, order_by, after, fetch_count, page_size)
+            if fetch_count is None:
+                return trim_page(rows, order_by, after, page_size)
+
+    async def transaction(self, path: str, update_fn: Callable[[Any], Any]) -> Any:
+        try:
+            return await self._call('transaction', path, self.backend.transaction, path, update_fn)
+        except Exception as e:
+            print(f"Error running transaction at {path}: {str(e)}")
+            raise
+
+    async def update(self, path: str, data: Dict[str, Any]) -> None:
+        try:
+            await self._call('update', path, self.backend.update, path, data, payload=data)
+        except Exception as e:
+            print(f"Error updating data at {path}: {str(e)}")
+            raise
+    
+    async def delete(self, path: str) -> None:
+        try:
+            await self._call('delete', path, self.backend.delete, path)
+        except Exception as e:
+            print(f"Error deleting data at {path}: {str(e)}")
+            raise
+
+    async def close(self) -> None:
+        if AsyncFirebaseService._backend is not None:
+            await AsyncFirebaseService._backend.close()
+            AsyncFirebaseService._backend = None
+
+firebase_service = AsyncFirebaseService()
+metrics.register_collector('async_storage_breaker', AsyncFirebaseService.transport.breaker.stats)
@@ -0,0 +1,13 @@
+import asyncio
+from typing import Dict, List
+from services.generation_service import GenerationService
+
+class AsyncGenerationService:
+    # Model calls and cache coalescing block, so they run on a worker thread.
+
+    @staticmethod
+    async def generate_wellness_content(user_id: str, mood: str = None, goals: List[str] = None,
+                                        template: str = 'wellness') -> Dict:
+        return await asyncio.to_thread(GenerationService.generate_wellness_content, user_id, mood, goals, template)
+
+generation_service = AsyncGenerationService()
@@ -0,0 +1,100 @@
+import asyncio
+from typing import Dict
+from models.journal_entry import JournalEntry
+from services.aio.firebase_service import firebase_service
+from services.collection_versions import collection_versions
+from services.history_cache import history_cache
+from services import events
+from services.metrics import metrics
+
+class AsyncJournalService:
+    
+    @staticmethod
+    async def create_journal_entry(user_id: str, date: str, content: str, 
+                                   prompt: str = None) -> Dict:
+        try:
+            journal_id = firebase_service.new_key()
+            
+            journal_entry = JournalEntry(
+                journal_id=journal_id,
+                user_id=user_id,
+                date=date,
+                content=content,
+                prompt=prompt
+            )
+            
+            path = f'journals/{user_id}/{journal_id}'
+            entry_data = journal_entry.to_dict()
+            await firebase_service.update('/', collection_versions.stamp('journals', user_id, {path: entry_data}))
+            await asyncio.to_thread(events.publish, 'journals', user_id, 'create', journal_id, entry_data)
+            
+            return {
+                'success': True,
+                'message': 'Journal entry created successfully',
+                'journal_id': journal_id,
+                'journal_entry': entry_data
+            }
+        except Exception as e:
+            return {
+                'success': False,
+                'message': f'Error creating journal entry: {str(e)}'
+            }
+    
+
+    @staticmethod
+    async def get_user_journals(user_id: str, limit: int = None, since: str = None,
+                                until: str = None, cursor: str = None, page_size: int = None,
+                                version: str = None) -> Dict:
+        try:
+            journal_list, next_cursor = await history_cache.get_or_load_async(
+                user_id, 'journals', (since, until, cursor, page_size or limit),
+                lambda: AsyncJournalService._load_journals(user_id, since, until, cursor, page_size or limit),
+                version=version
+            )
+            
+            return {
+                'success': True,
+                'count': len(journal_list),
+                'journals': journal_list,
+                'next_cursor': next_cursor
+            }
+        except Exception as e:
+            return {
+                'success': False,
+                'message': f'Error getting journals: {str(e)}'
+            }
+ 
+    @staticmethod
+    async def delete_journal_entry(user_id: str, journal_id: str) -> Dict:
+        try:
+            path = f'journals/{user_id}/{journal_id}'
+            journal_data = await firebase_service.get(path)
+            await firebase_service.update('/', collection_versions.stamp('journals', user_id, {path: None}))
+            await asyncio.to_thread(events.publish, 'journals', user_id, 'delete', journal_id, journal_data)
+            
+            return {
+                'success': True,
+                'message': 'Journal entry deleted successfully'
+            }
+        except Exception as e:
+            return {
+                'success': False,
+                'message': f'Error deleting journal entry: {str(e)}'
+            }
+
+    @staticmethod
+    async def _load_journals(user_id: str, since: str, until: str, cursor: str, page_size: int):
+        rows, next_cursor = await firebase_service.get_page(
+            f'journals/{user_id}', 'created_at',
+            since=since,
+            until=until,
+            cursor=cursor,
+            page_size=page_size
+        )
+        
+        with metrics.phase('serialize'):
+            journal_list = [JournalEntry.row_to_dict(journal_id, journal_data) for journal_id, journal_data in rows]
+        metrics.materialized('journal', len(journal_list))
+        return journal_list, next_cursor
+
+journal_service = AsyncJournalService()
@@ -0,0 +1,84 @@
+import asyncio
+from typing import Dict
+from models.mood_entry import MoodEntry
+from services.aio.firebase_service import firebase_service
+from services.collection_versions import collection_versions
+from services.history_cache import history_cache
+from services import events
+from services.metrics import metrics
+
+class AsyncMoodService:
+    
+    @staticmethod
+    async def create_mood_entry(user_id: str, date: str, mood: str, 
+                                energy: str, notes: str = None) -> Dict:
+        
+        try:
+            entry_id = firebase_service.new_key()
+            
+            mood_entry = MoodEntry(
+                entry_id=entry_id,
+                user_id=user_id,
+                date=date,
+                mood=mood,
+                energy=energy,
+                notes=notes
+            )
+            
+            path = f'moods/{user_id}/{entry_id}'
+            entry_data = mood_entry.to_dict()
+            await firebase_service.update('/', collection_versions.stamp('moods', user_id, {path: entry_data}))
+            # Subscribers may do blocking storage work, so keep them off the event loop.
+            await asyncio.to_thread(events.publish, 'moods', user_id, 'create', entry_id, entry_data)
+            
+            return {
+                'success': True,
+                'message': 'Mood entry created successfully',
+                'entry_id': entry_id,
+                'mood_entry': entry_data
+            }
+        except Exception as e:
+            return {
+                'success': False,
+                'message': f'Error creating mood entry: {str(e)}'
+            }
+    
+    @staticmethod
+    async def get_user_moods(user_id: str, limit: int = None, since: str = None,
+                             until: str = None, cursor: str = None, page_size: int = None,
+                             version: str = None) -> Dict:
+        try:
+            mood_list, next_cursor = await history_cache.get_or_load_async(
+                user_id, 'moods', (since, until, cursor, page_size or limit),
+                lambda: AsyncMoodService._load_moods(user_id, since, until, cursor, page_size or limit),
+                version=version
+            )
+            
+            return {
+                'success': True,
+                'count': len(mood_list),
+                'moods': mood_list,
+                'next_cursor': next_cursor
+            }
+        except Exception as e:
+            return {
+                'success': False,
+                'message': f'Error getting moods: {str(e)}'
+            }
+
+    @staticmethod
+    async def _load_moods(user_id: str, since: str, until: str, cursor: str, page_size: int):
+        rows, next_cursor = await firebase_service.get_page(
+            f'moods/{user_id}', 'created_at',
+            since=since,
+            until=until,
+            cursor=cursor,
+            page_size=page_size
+        )
+        
+        with metrics.phase('serialize'):
+            mood_list = [MoodEntry.row_to_dict(entry_id, entry_data) for entry_id, entry_data in rows]
+        metrics.materialized('mood', len(mood_list))
+        return mood_list, next_cursor
+    
+mood_service = AsyncMoodService()
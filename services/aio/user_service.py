@@ -0,0 +1,56 @@
+from typing import Optional, Dict, List
+from models.user import User
+from services.aio.firebase_service import firebase_service
+
+class AsyncUserService:
+    
+    @staticmethod
+    async def create_user_profile(user_id: str, email: str, username: str, 
+                                  age: int, goals: List[str] = None) -> Dict:
+        try:
+            user = User(
+                user_id=user_id,
+                email=email,
+                password_hash="",  
+                username=username,
+                age=age,
+                goals=goals or []
+            )
+            
+            path = f'users/{user_id}'
+            await firebase_service.set(path, user.to_dict())
+            
+            return {
+                'success': True,
+                'message': 'User profile created successfully',
+                'user': user.to_dict()
+            }
+        except Exception as e:
+            return {
+                'success': False,
+                'message': f'Error creating user profile: {str(e)}'
+            }
+    
+    @staticmethod
+    async def get_user_profile(user_id: str) -> Optional[Dict]:
+        try:
+            path = f'users/{user_id}'
+            data = await firebase_service.get(path)
+            
+            if data:
+                return {
+                    'success': True,
+                    'user': User.row_to_dict(user_id, data)
+                }
+            else:
+                return {
+                    'success': False,
+                    'message': 'User not found'
+                }
+        except Exception as e:
+            return {
+                'success': False,
+                'message': f'Error getting user: {str(e)}'
+            }
+    
+user_service = AsyncUserService()
@@ -0,0 +1,172 @@
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, List, Set
+from models.journal_entry import JournalEntry
+from models.mood_entry import MoodEntry
+from services.collection_versions import collection_versions
+from services.firebase_service import firebase_service
+from services import events
+from utils.validators import validate_required_fields
+
+MAX_BATCH_SIZE = 500
+IDEMPOTENCY_WINDOW_DAYS = int(os.getenv('IDEMPOTENCY_WINDOW_DAYS', '7'))
+BATCH_MAX_WORKERS = int(os.getenv('BATCH_MAX_WORKERS', '8'))
+
+# entry type -> (collection, required fields), matching the single-entry routes
+ENTRY_TYPES = {
+    'mood': ('moods', ['mood', 'energy']),
+    'journal': ('journals', ['content']),
+    'activity': ('user_activities', ['activity_name', 'duration', 'date']),
+}
+
+_executor = ThreadPoolExecutor(max_workers=BATCH_MAX_WORKERS, thread_name_prefix='batch')
+
+
+class BatchService:
+
+    @staticmethod
+    def ingest_entries(user_id: str, entries: List[Dict]) -> Dict:
+        try:
+            seen_keys = BatchService._recent_idempotency_keys(user_id)
+            seen_keys |= BatchService._existing_records(user_id, entries, seen_keys)
+
+            updates = {}
+            results = []
+            for index, entry in enumerate(entries):
+                result = BatchService._stage_entry(user_id, entry, seen_keys, updates)
+                result['index'] = index
+                results.append(result)
+
+            # Every record, idempotency marker and collection version goes out
+            # in one multi-path write.
+            if updates:
+                for collection in {ENTRY_TYPES[result['type']][0] for result in results
+                                   if result['success'] and not result.get('duplicate')}:
+                    collection_versions.stamp(collection, user_id, updates)
+                firebase_service.update('/', updates)
+                written = []
+                for result in results:
+                    if result['success'] and not result.get('duplicate'):
+                        collection = ENTRY_TYPES[result['type']][0]
+                        record = updates[f"{collection}/{user_id}/{result['id']}"]
+                        written.append(events.write_event(collection, user_id, 'create', result['id'], record))
+                events.publish_many(written)
+
+            created = sum(1 for result in results if result['success'] and not result.get('duplicate'))
+            return {
+                'success': True,
+                'message': f'{created} of {len(entries)} entries created',
+                'created': created,
+                'results': results
+            }
+        except Exception as e:
+            return {
+                'success': False,
+                'message': f'Error ingesting entries: {str(e)}'
+            }
+
+    @staticmethod
+    def _stage_entry(user_id: str, entry: Dict, seen_keys: Set[str], updates: Dict) -> Dict:
+        if not isinstance(entry, dict) or entry.get('type') not in ENTRY_TYPES:
+            return {
+                'success': False,
+                'message': f"Entry type must be one of: {', '.join(ENTRY_TYPES)}"
+            }
+
+        entry_type = entry['type']
+        collection, required = ENTRY_TYPES[entry_type]
+        data = entry.get('data')
+        if not isinstance(data, dict) or not validate_required_fields(data, required):
+            return {
+                'success': False,
+                'type': entry_type,
+                'message': 'Missing required fields'
+            }
+
+        idempotency_key = entry.get('idempotency_key')
+        if idempotency_key:
+            # Derived ids make a replayed entry land on the same record even
+            # after its idempotency marker has aged out of the window.
+            record_id = BatchService._record_id(user_id, str(idempotency_key))
+            if record_id in seen_keys:
+                return {
+                    'success': True,
+                    'type': entry_type,
+                    'id': record_id,
+                    'duplicate': True
+                }
+            seen_keys.add(record_id)
+            updates[f'idempotency_keys/{user_id}/{record_id}'] = {
+                'type': entry_type,
+                'created_at': datetime.utcnow().isoformat()
+            }
+        else:
+            record_id = firebase_service.new_key()
+
+        updates[f'{collection}/{user_id}/{record_id}'] = BatchService._build_record(
+            entry_type, user_id, record_id, data
+        )
+        return {
+            'success': True,
+            'type': entry_type,
+            'id': record_id,
+            'duplicate': False
+        }
+
+    @staticmethod
+    def _build_record(entry_type: str, user_id: str, record_id: str, data: Dict) -> Dict:
+        date = data.get('date', datetime.now().strftime('%Y-%m-%d'))
+
+        if entry_type == 'mood':
+            return MoodEntry(
+                entry_id=record_id,
+                user_id=user_id,
+                date=date,
+                mood=data['mood'],
+                energy=data['energy'],
+                notes=data.get('notes'),
+                created_at=data.get('created_at')
+            ).to_dict()
+
+        if entry_type == 'journal':
+            return JournalEntry(
+                journal_id=record_id,
+                user_id=user_id,
+                date=date,
+                content=data['content'],
+                prompt=data.get('prompt'),
+                created_at=data.get('created_at')
+            ).to_dict()
+
+        activity_data = {key: value for key, value in data.items() if key != 'user_id'}
+        if 'timestamp' not in activity_data:
+            activity_data['timestamp'] = datetime.now().isoformat()
+        return activity_data
+
+    @staticmethod
+    def _record_id(user_id: str, idempotency_key: str) -> str:
+        return hashlib.sha256(f'{user_id}:{idempotency_key}'.encode('utf-8')).hexdigest()[:20]
+
+    @staticmethod
+    def _existing_records(user_id: str, entries: List[Dict], seen_keys: Set[str]) -> Set[str]:
+        # Keyed entries replayed after their marker aged out of the window:
+        # their derived ids are looked up, so the stored record is neither
+        # overwritten nor counted again.
+        paths = {}
+        for entry in entries:
+            if isinstance(entry, dict) and entry.get('type') in ENTRY_TYPES and entry.get('idempotency_key'):
+                record_id = BatchService._record_id(user_id, str(entry['idempotency_key']))
+                if record_id not in seen_keys:
+                    paths[record_id] = f"{ENTRY_TYPES[entry['type']][0]}/{user_id}/{record_id}"
+        found = _executor.map(firebase_service.get, paths.values())
+        return {record_id for record_id, record in zip(paths, found) if record is not None}
+
+    @staticmethod
+    def _recent_idempotency_keys(user_id: str) -> Set[str]:
+        window_start = (datetime.utcnow() - timedelta(days=IDEMPOTENCY_WINDOW_DAYS)).isoformat()
+        rows = firebase_service.query(f'idempotency_keys/{user_id}', 'created_at', start_at=window_start)
+        return {key for key, _ in rows}
+
+batch_service = BatchService()
@@ -0,0 +1,51 @@
+from typing import Any, Dict
+from services.firebase_service import firebase_service
+from services.aio.firebase_service import firebase_service as async_firebase_service
+from services.metrics import metrics
+
+# Version of each user's moods, journals and activities, stored next to the
+# data at `<collection>_meta/<user_id>/version`. Writers stamp a fresh key
+# into the same multi-path update that changes the collection, so every
+# worker reads the same version and a tag can never outlive the data it was
+# issued for. Collections written before versions existed report "0" until
+# their next write.
+class CollectionVersions:
+
+    def __init__(self):
+        self.stamped = 0
+        self.reads = 0
+
+    @staticmethod
+    def path(collection: str, user_id: str) -> str:
+        return f'{collection}_meta/{user_id}/version'
+
+    def stamp(self, collection: str, user_id: str, updates: Dict[str, Any]) -> Dict[str, Any]:
+        # Adds the new version to a multi-path update and returns it.
+        updates[self.path(collection, user_id)] = firebase_service.new_key()
+        self.stamped += 1
+        return updates
+
+    def bump(self, collection: str, user_id: str) -> None:
+        # For writes that cannot carry the version, such as transactions:
+        # called after the write, so a reader may see new data under the old
+        # version for a moment, but never old data under a new one.
+        firebase_service.set(self.path(collection, user_id), firebase_service.new_key())
+        self.stamped += 1
+
+    def get(self, user_id: str, collection: str) -> str:
+        self.reads += 1
+        return firebase_service.get(self.path(collection, user_id)) or '0'
+
+    async def get_async(self, user_id: str, collection: str) -> str:
+        self.reads += 1
+        return await async_firebase_service.get(self.path(collection, user_id)) or '0'
+
+    def stats(self) -> Dict:
+        return {
+            'stamped': self.stamped,
+            'reads': self.reads
+        }
+
+
+collection_versions = CollectionVersions()
+metrics.register_collector('collection_versions', collection_versions.stats)
@@ -0,0 +1,130 @@
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+from models.content import Content
+from services.firebase_service import firebase_service
+from services.storage.transport import StorageUnavailableError
+
+CONTENT_CATALOG_TTL = int(os.getenv('CONTENT_CATALOG_TTL', '300'))
+CONTENT_CATALOG_WATCH = os.getenv('CONTENT_CATALOG_WATCH', 'false').lower() == 'true'
+
+
+# Process-wide copy of the `content` tree, indexed by type, category and tag.
+# It reloads after `ttl_seconds`, or on the next read after the database
+# reports a change when watching is enabled.
+class ContentCatalog:
+
+    def __init__(self, path: str = 'content', ttl_seconds: int = CONTENT_CATALOG_TTL,
+                 watch: bool = CONTENT_CATALOG_WATCH):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.watch = watch
+        self._lock = threading.Lock()
+        self._listener = None
+        self._skip_initial_event = False
+        self._loaded_at: Optional[float] = None
+        # Bumped on every load, so derived data can tell when to rebuild.
+        self.version = 0
+        self._items: Dict[str, Dict] = {}
+        self._by_type: Dict[str, List[Dict]] = {}
+        self._by_category: Dict[str, List[Dict]] = {}
+        self._by_tag: Dict[str, List[Dict]] = {}
+
+    def is_fresh(self) -> bool:
+        if self._loaded_at is None:
+            return False
+        return time.monotonic() - self._loaded_at < self.ttl_seconds
+
+    def _ensure_loaded(self) -> None:
+        if self.is_fresh():
+            return
+        with self._lock:
+            if not self.is_fresh():
+                try:
+                    self._load()
+                except StorageUnavailableError as e:
+                    if not self._items:
+                        raise
+                    # Keep serving the catalog we have and try again once the
+                    # storage breaker would let a call through.
+                    print(f"Serving stale content catalog: {str(e)}")
+                    self._loaded_at = time.monotonic() - self.ttl_seconds + e.retry_after
+
+    def _load(self) -> None:
+        data = firebase_service.get(self.path) or {}
+
+        items = {}
+        by_type, by_category, by_tag = {}, {}, {}
+        for content_id, content_data in data.items():
+            if not isinstance(content_data, dict):
+                continue
+            item = Content.row_to_dict(content_id, content_data)
+            items[content_id] = item
+
+            by_type.setdefault((item['type'] or '').lower(), []).append(item)
+            by_category.setdefault((item['category'] or '').lower(), []).append(item)
+            for tag in item['tags'] or []:
+                by_tag.setdefault(str(tag).lower(), []).append(item)
+
+        # Swap the indexes in one go so readers never see a half-built catalog.
+        self._items, self._by_type, self._by_category, self._by_tag = items, by_type, by_category, by_tag
+        self._loaded_at = time.monotonic()
+        self.version += 1
+
+        if self.watch and self._listener is None:
+            self._skip_initial_event = True
+            try:
+                self._listener = firebase_service.listen(self.path, self._on_change)
+            except NotImplementedError:
+                # The sqlite and memory backends have no listeners.
+                print(f"⚠️ Content catalog reloads every {self.ttl_seconds}s instead of watching "
+                      f"{firebase_service.backend.name} storage")
+                self.watch = False
+
+    def _on_change(self, event) -> None:
+        # The first event replays the tree we have just loaded.
+        if self._skip_initial_event:
+            self._skip_initial_event = False
+            return
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        self._loaded_at = None
+
+    def refresh(self) -> None:
+        with self._lock:
+            self._load()
+
+    def current_version(self) -> int:
+        self._ensure_loaded()
+        return self.version
+
+    def get(self, content_id: str) -> Optional[Dict]:
+        self._ensure_loaded()
+        return self._items.get(content_id)
+
+    def get_all(self) -> List[Dict]:
+        self._ensure_loaded()
+        return list(self._items.values())
+
+    def get_by_type(self, content_type: str) -> List[Dict]:
+        self._ensure_loaded()
+        return self._by_type.get((content_type or '').lower(), [])
+
+    def get_by_categories(self, categories: List[str]) -> List[Dict]:
+        self._ensure_loaded()
+        if len(categories) == 1:
+            return self._by_category.get(categories[0].lower(), [])
+
+        items = []
+        for category in categories:
+            items.extend(self._by_category.get(category.lower(), []))
+        return items
+
+    def get_by_tag(self, tag: str) -> List[Dict]:
+        self._ensure_loaded()
+        return self._by_tag.get((tag or '').lower(), [])
+
+
+content_catalog = ContentCatalog()
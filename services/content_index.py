@@ -0,0 +1,194 @@
+import math
+import os
+import threading
+import zlib
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from services.content_catalog import content_catalog
+from services.metrics import metrics
+from utils.text import tokenize
+
+CONTENT_INDEX_DIMENSIONS = int(os.getenv('CONTENT_INDEX_DIMENSIONS', '512'))
+CONTENT_INDEX_QUERY_TERMS = int(os.getenv('CONTENT_INDEX_QUERY_TERMS', '32'))
+CONTENT_INDEX_MIN_SCORE = float(os.getenv('CONTENT_INDEX_MIN_SCORE', '0.05'))
+
+INITIAL_CAPACITY = 256
+
+
+def item_text(item: Dict) -> str:
+    tags = ' '.join(str(tag) for tag in item.get('tags') or [])
+    return f"{item.get('text') or ''} {item.get('category') or ''} {tags}"
+
+
+def fingerprint(item: Dict) -> Tuple:
+    return (item.get('text'), item.get('type'), item.get('category'),
+            tuple(str(tag) for tag in item.get('tags') or []))
+
+
+def hashed_terms(text: str, dimensions: int) -> Dict[int, float]:
+    # Sublinear term frequencies folded into `dimensions` buckets. Each term
+    # also hashes to a sign, so terms sharing a bucket tend to cancel out
+    # instead of adding up to a false match. CRC-32 rather than hash(), which
+    # is salted per process for strings.
+    vector: Dict[int, float] = {}
+    for term, count in Counter(tokenize(text)).items():
+        bucket, sign = divmod(zlib.crc32(term.encode('utf-8')), 2)
+        dimension = bucket % dimensions
+        vector[dimension] = vector.get(dimension, 0.0) + (1 - 2 * sign) * (1 + math.log(count))
+    return vector
+
+
+# Hashed TF-IDF vectors of the content catalog, for finding the items closest
+# to what a user wrote. Item vectors are unit-length term frequencies, kept as
+# the columns of a (dimensions x capacity) float32 matrix; inverse document
+# frequencies are applied to the query, so adding or changing an item only
+# touches its own column and the document counts. A query reads only the rows
+# of its strongest `query_terms` buckets, which keeps a lookup well under a
+# millisecond with tens of thousands of items. When the catalog reloads, only
+# items whose text, type, category or tags changed are re-vectorized, into a
+# copy that replaces the current matrix in one go, so queries never see a
+# half-updated index.
+class ContentIndex:
+
+    def __init__(self, dimensions: int = CONTENT_INDEX_DIMENSIONS,
+                 query_terms: int = CONTENT_INDEX_QUERY_TERMS,
+                 min_score: float = CONTENT_INDEX_MIN_SCORE):
+        self.dimensions = dimensions
+        self.query_terms = max(query_terms, 1)
+        self.min_score = min_score
+        self._lock = threading.Lock()
+        self._version = None
+        # {content_id: (column, fingerprint, dimensions counted in the document frequencies)}
+        self._columns: Dict[str, Tuple[int, Tuple, np.ndarray]] = {}
+        self._free: List[int] = []
+        # Content types are stored per column as small integer codes.
+        self._type_codes: Dict[str, int] = {}
+        # (matrix, document frequencies, content id and type code per column, columns in use)
+        self._snapshot = (np.zeros((dimensions, 0), dtype=np.float32), np.zeros(dimensions, dtype=np.float32),
+                          [], np.zeros(0, dtype=np.int32), 0)
+        self.rebuilds = 0
+        self.vectorized = 0
+        self.queries = 0
+
+    def _sync(self) -> None:
+        version = content_catalog.current_version()
+        if version == self._version:
+            return
+        with self._lock:
+            if version == self._version:
+                return
+            self._apply({item['content_id']: item for item in content_catalog.get_all()})
+            self._version = version
+            self.rebuilds += 1
+
+    def _apply(self, items: Dict[str, Dict]) -> None:
+        # Called with the lock held.
+        matrix, df, ids, types, used = self._snapshot
+        changed = [content_id for content_id, item in items.items()
+                   if self._columns.get(content_id, (None, None, None))[1] != fingerprint(item)]
+        removed = [content_id for content_id in self._columns if content_id not in items]
+        if not changed and not removed:
+            return
+
+        # Grown with a quarter to spare, as the matrix is most of the memory.
+        needed = len(self._columns) - len(removed) + len(changed)
+        capacity = max(matrix.shape[1], INITIAL_CAPACITY)
+        if capacity < needed:
+            capacity = needed + needed // 4
+        grown = np.zeros((self.dimensions, capacity), dtype=np.float32)
+        grown[:, :matrix.shape[1]] = matrix
+        grown_types = np.full(capacity, -1, dtype=np.int32)
+        grown_types[:len(types)] = types
+        matrix, df, ids, types = grown, df.copy(), ids + [None] * (capacity - len(ids)), grown_types
+
+        for content_id in removed + [content_id for content_id in changed if content_id in self._columns]:
+            # Buckets whose terms cancelled out are zero in the matrix but
+            # were still counted, so the dimensions are taken from the entry.
+            column, _, dimensions = self._columns.pop(content_id)
+            df[dimensions] -= 1
+            matrix[:, column] = 0
+            ids[column] = None
+            types[column] = -1
+            self._free.append(column)
+
+        self._free.sort(reverse=True)
+        for content_id in changed:
+            vector = hashed_terms(item_text(items[content_id]), self.dimensions)
+            self.vectorized += 1
+            norm = math.sqrt(sum(value * value for value in vector.values()))
+            if not norm:
+                continue
+            column = self._free.pop() if self._free else used
+            used = max(used, column + 1)
+            dimensions = np.fromiter(vector.keys(), dtype=np.intp, count=len(vector))
+            matrix[dimensions, column] = np.fromiter(vector.values(), dtype=np.float32, count=len(vector)) / norm
+            df[dimensions] += 1
+            ids[column] = content_id
+            content_type = (items[content_id].get('type') or '').lower()
+            types[column] = self._type_codes.setdefault(content_type, len(self._type_codes))
+            self._columns[content_id] = (column, fingerprint(items[content_id]), dimensions)
+
+        self._snapshot = (matrix, df, ids, types, used)
+
+    def _query_vector(self, text: str, df: np.ndarray, count: int) -> Dict[int, float]:
+        vector = hashed_terms(text, self.dimensions)
+        weighted = {dimension: value * (math.log((1 + count) / (1 + float(df[dimension]))) + 1)
+                    for dimension, value in vector.items()}
+        # Only the strongest terms are looked up.
+        strongest = sorted(weighted, key=lambda dimension: -abs(weighted[dimension]))[:self.query_terms]
+        norm = math.sqrt(sum(weighted[dimension] ** 2 for dimension in strongest))
+        return {dimension: weighted[dimension] / norm for dimension in strongest} if norm else {}
+
+    def search(self, text: str, count: int, content_type: Optional[str] = None) -> List[Dict]:
+        return self.search_batch([text], count, content_type)[0]
+
+    def search_batch(self, texts: List[str], count: int, content_type: Optional[str] = None) -> List[List[Dict]]:
+        # Top `count` items by cosine similarity for each text, scored as one
+        # (texts x buckets) by (buckets x items) product.
+        self._sync()
+        matrix, df, ids, types, used = self._snapshot
+        self.queries += len(texts)
+        vectors = [self._query_vector(text, df, len(self._columns)) for text in texts]
+        dimensions = sorted({dimension for vector in vectors for dimension in vector})
+        if not dimensions or not used or count <= 0:
+            return [[] for _ in texts]
+
+        position = {dimension: i for i, dimension in enumerate(dimensions)}
+        weights = np.zeros((len(texts), len(dimensions)), dtype=np.float32)
+        for row, vector in enumerate(vectors):
+            for dimension, value in vector.items():
+                weights[row, position[dimension]] = value
+        scores = weights @ matrix[dimensions, :used]
+
+        if content_type:
+            scores[:, types[:used] != self._type_codes.get(content_type.lower(), -1)] = 0
+
+        results = []
+        for row in scores:
+            top = np.argpartition(-row, count - 1)[:count] if count < used else np.arange(used)
+            top = top[np.argsort(-row[top], kind='stable')]
+            matches = []
+            for column in top:
+                if row[column] < self.min_score:
+                    break
+                item = content_catalog.get(ids[column])
+                if item is not None:
+                    matches.append(dict(item, score=round(float(row[column]), 4)))
+            results.append(matches)
+        return results
+
+    def stats(self) -> Dict:
+        matrix = self._snapshot[0]
+        return {
+            'items': len(self._columns),
+            'capacity': matrix.shape[1],
+            'dimensions': self.dimensions,
+            'rebuilds': self.rebuilds,
+            'vectorized': self.vectorized,
+            'queries': self.queries
+        }
+
+
+content_index = ContentIndex()
+metrics.register_collector('content_index', content_index.stats)
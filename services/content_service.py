@@ -1,34 +1,28 @@
+import os
 from typing import Dict, List
-from models.content import Content
+from services.content_catalog import content_catalog
+from services.content_index import content_index
 from services.firebase_service import firebase_service
+from services.journal_service import journal_service
+from services.recommendation_service import recommendation_engine
 import random
 
+RELATED_CONTENT_COUNT = int(os.getenv('RELATED_CONTENT_COUNT', '3'))
+RELATED_JOURNAL_COUNT = int(os.getenv('RELATED_JOURNAL_COUNT', '3'))
+MAX_RELATED_CONTENT_COUNT = 20
+
 class ContentService:
 
     @staticmethod
     def get_content_by_type(content_type: str) -> Dict:
         try:
-            path = 'content'
-            data = firebase_service.get(path)
+            filtered_content = content_catalog.get_by_type(content_type)
             
-            if data:
-                filtered_content = []
-                for content_id, content_data in data.items():
-                    if content_data.get('type', '').lower() == content_type.lower():
-                        content = Content.from_dict(content_id, content_data)
-                        filtered_content.append(content.to_dict())
-                
-                return {
-                    'success': True,
-                    'count': len(filtered_content),
-                    'content': filtered_content
-                }
-            else:
-                return {
-                    'success': True,
-                    'count': 0,
-                    'content': []
-                }
+            return {
+                'success': True,
+                'count': len(filtered_content),
+                'content': filtered_content
+            }
         except Exception as e:
             return {
                 'success': False,
@@ -37,39 +31,14 @@ class ContentService:
     
 
     @staticmethod
-    def retrieve_relevant_content(user_mood: str = None, user_goals: List[str] = None) -> Dict:
+    def retrieve_relevant_content(user_mood: str = None, user_goals: List[str] = None,
+                                  user_id: str = None) -> Dict:
         try:
-            path = 'content'
-            data = firebase_service.get(path)
-            
-            if not data:
-                return {
-                    'success': True,
-                    'content': []
-                }
-            
-           
-            mood_category_map = {
-                'Anxious': ['Stress', 'Mindfulness'],
-                'Stressed': ['Stress', 'Relaxation'],
-                'Tired': ['Motivation', 'Energy'],
-                'Happy': ['Gratitude', 'Motivation'],
-                'Sad': ['Motivation', 'Self-Compassion'],
-                'Calm': ['Mindfulness', 'Gratitude']
-            }
-            
-            relevant_categories = mood_category_map.get(user_mood, ['Motivation'])
-            
-            relevant_content = []
-            for content_id, content_data in data.items():
-                category = content_data.get('category', '')
-                if category in relevant_categories:
-                    content = Content.from_dict(content_id, content_data)
-                    relevant_content.append(content.to_dict())
-            
-            if len(relevant_content) > 5:
-                relevant_content = random.sample(relevant_content, 5)
-            
+            # Without explicit goals, a known user's profile goals are used.
+            if user_id and not user_goals:
+                user_goals = firebase_service.get(f'users/{user_id}/goals') or []
+            relevant_content = recommendation_engine.recommend(user_mood, user_goals, user_id)
+
             return {
                 'success': True,
                 'count': len(relevant_content),
@@ -81,6 +50,32 @@ class ContentService:
                 'message': f'Error retrieving relevant content: {str(e)}'
             }
 
+    @staticmethod
+    def find_related_content(journal_texts: List[str], count: int = RELATED_CONTENT_COUNT,
+                             content_type: str = None) -> Dict:
+        try:
+            related_content = content_index.search(' '.join(journal_texts), count, content_type)
+
+            return {
+                'success': True,
+                'count': len(related_content),
+                'content': related_content
+            }
+        except Exception as e:
+            return {
+                'success': False,
+                'message': f'Error finding related content: {str(e)}'
+            }
+
+    @staticmethod
+    def get_related_content(user_id: str, count: int = RELATED_CONTENT_COUNT, content_type: str = None) -> Dict:
+        # Content closest to what the user wrote in their latest entries.
+        journals_result = journal_service.get_user_journals(user_id, page_size=RELATED_JOURNAL_COUNT)
+        if not journals_result['success']:
+            return journals_result
+        return ContentService.find_related_content(
+            [journal['content'] or '' for journal in journals_result.get('journals', [])], count, content_type)
+
     @staticmethod
     def get_wellness_tips(user_mood: str = None) -> Dict:
         try:
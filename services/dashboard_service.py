@@ -0,0 +1,104 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Callable, Dict, List, Optional, Tuple
+from services.user_service import user_service
+from services.mood_service import mood_service
+from services.journal_service import journal_service
+from services.content_service import content_service
+from services.stats_service import stats_service
+
+DASHBOARD_MAX_WORKERS = int(os.getenv('DASHBOARD_MAX_WORKERS', '16'))
+DASHBOARD_TIMEOUT = float(os.getenv('DASHBOARD_TIMEOUT', '10'))
+DASHBOARD_JOURNAL_COUNT = 5
+
+
+def _latest(entries: List[Dict]) -> Optional[Dict]:
+    return entries[0] if entries else None
+
+
+# Each field maps to the service call that loads it and a function that
+# picks the payload out of the service's result.
+DASHBOARD_FIELDS: Dict[str, Tuple[Callable[[str], Dict], Callable[[Dict], object]]] = {
+    'profile': (
+        lambda user_id: user_service.get_user_profile(user_id),
+        lambda result: result['user']
+    ),
+    'stats': (
+        lambda user_id: stats_service.get_user_stats(user_id),
+        lambda result: result['stats']
+    ),
+    'latest_mood': (
+        lambda user_id: mood_service.get_user_moods(user_id, page_size=1),
+        lambda result: _latest(result['moods'])
+    ),
+    'journals': (
+        lambda user_id: journal_service.get_user_journals(user_id, page_size=DASHBOARD_JOURNAL_COUNT),
+        lambda result: result['journals']
+    ),
+    'tips': (
+        lambda user_id: content_service.get_wellness_tips(),
+        lambda result: result['tips']
+    ),
+    'quote': (
+        lambda user_id: content_service.get_motivational_quote(),
+        lambda result: result['quote']
+    )
+}
+
+# Shared across requests so the number of concurrent storage reads stays
+# bounded no matter how many dashboards load at once.
+_executor = ThreadPoolExecutor(max_workers=DASHBOARD_MAX_WORKERS, thread_name_prefix='dashboard')
+
+
+def parse_fields(value: Optional[str]) -> Optional[List[str]]:
+    # Returns None when any requested field is unknown.
+    if not value:
+        return list(DASHBOARD_FIELDS)
+    fields = [field.strip() for field in value.split(',') if field.strip()]
+    if not fields or any(field not in DASHBOARD_FIELDS for field in fields):
+        return None
+    return list(dict.fromkeys(fields))
+
+
+def collect_field(field: str, result: Dict, dashboard: Dict, errors: Dict) -> None:
+    if result.get('success'):
+        dashboard[field] = DASHBOARD_FIELDS[field][1](result)
+    else:
+        dashboard[field] = None
+        errors[field] = result.get('message', 'Request failed')
+
+
+class DashboardService:
+
+    @staticmethod
+    def get_dashboard(user_id: str, fields: List[str], timeout: float = DASHBOARD_TIMEOUT) -> Dict:
+        try:
+            futures = {
+                field: _executor.submit(DASHBOARD_FIELDS[field][0], user_id)
+                for field in fields
+            }
+
+            # One deadline for the whole page, so it waits on the slowest read only once.
+            deadline = time.monotonic() + timeout
+            dashboard, errors = {}, {}
+            for field, future in futures.items():
+                try:
+                    result = future.result(timeout=max(deadline - time.monotonic(), 0))
+                except FutureTimeoutError:
+                    future.cancel()
+                    result = {'success': False, 'message': 'Timed out'}
+                collect_field(field, result, dashboard, errors)
+
+            return {
+                'success': True,
+                'dashboard': dashboard,
+                'errors': errors
+            }
+        except Exception as e:
+            return {
+                'success': False,
+                'message': f'Error loading dashboard: {str(e)}'
+            }
+
+dashboard_service = DashboardService()
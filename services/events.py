@@ -0,0 +1,54 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# In-process notifications for writes to per-user collections ("moods",
+# "journals", "user_activities"). Services publish after a write succeeds;
+# caches and derived data subscribe. A failing subscriber is logged and
+# never fails the write that triggered it. A multi-record write publishes
+# its events together, so batch subscribers can handle them in one go.
+
+# (callback, takes the whole batch)
+_subscribers: List[Tuple[Callable, bool]] = []
+
+
+def subscribe(callback: Callable[[Dict[str, Any]], None]) -> Callable[[Dict[str, Any]], None]:
+    _subscribers.append((callback, False))
+    return callback
+
+
+def subscribe_batch(callback: Callable[[List[Dict[str, Any]]], None]) -> Callable[[List[Dict[str, Any]]], None]:
+    # Called once per publish with every event of that write.
+    _subscribers.append((callback, True))
+    return callback
+
+
+def write_event(collection: str, user_id: str, op: str, record_id: Optional[str] = None,
+                data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    return {
+        'collection': collection,
+        'user_id': user_id,
+        'op': op,
+        'id': record_id,
+        'data': data
+    }
+
+
+def publish(collection: str, user_id: str, op: str, record_id: Optional[str] = None,
+            data: Optional[Dict[str, Any]] = None) -> None:
+    publish_many([write_event(collection, user_id, op, record_id, data)])
+
+
+def publish_many(batch: List[Dict[str, Any]]) -> None:
+    if not batch:
+        return
+    for callback, batched in list(_subscribers):
+        if batched:
+            try:
+                callback(batch)
+            except Exception as e:
+                print(f"Error handling {len(batch)} write events: {str(e)}")
+            continue
+        for event in batch:
+            try:
+                callback(event)
+            except Exception as e:
+                print(f"Error handling {event['op']} event for {event['collection']}/{event['user_id']}: {str(e)}")
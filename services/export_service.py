@@ -0,0 +1,123 @@
+import json
+import zlib
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+from models.journal_entry import JournalEntry
+from models.mood_entry import MoodEntry
+from services.firebase_service import firebase_service
+from utils.pagination import MAX_PAGE_SIZE
+
+EXPORT_PAGE_SIZE = MAX_PAGE_SIZE
+EXPORT_CHUNK_BYTES = 64 * 1024
+EXPORT_FORMATS = ('ndjson', 'json')
+
+# Exported record type -> (collection, order field, row serializer).
+EXPORT_TYPES = {
+    'mood': ('moods', 'created_at', MoodEntry.row_to_dict),
+    'journal': ('journals', 'created_at', JournalEntry.row_to_dict),
+    'activity': ('user_activities', 'timestamp', lambda key, value: dict(value, id=key))
+}
+
+
+def parse_types(value: Optional[str]) -> Optional[List[str]]:
+    # Returns None when any requested type is unknown.
+    if not value:
+        return list(EXPORT_TYPES)
+    types = [item.strip() for item in value.split(',') if item.strip()]
+    if not types or any(item not in EXPORT_TYPES for item in types):
+        return None
+    return list(dict.fromkeys(types))
+
+
+# Encodes records into output chunks of roughly EXPORT_CHUNK_BYTES, either
+# as NDJSON lines or as one {"user_id", "records": [...]} document, and
+# optionally gzips them. Only the current chunk is ever held in memory.
+class ExportWriter:
+
+    def __init__(self, user_id: str, fmt: str = 'ndjson', compress: bool = False):
+        self.user_id = user_id
+        self.fmt = fmt
+        self.count = 0
+        self._parts: List[str] = []
+        self._size = 0
+        self._compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+
+    def open(self) -> None:
+        if self.fmt == 'json':
+            header = {'user_id': self.user_id, 'exported_at': datetime.utcnow().isoformat()}
+            self._append(json.dumps(header)[:-1] + ', "records": [')
+
+    def write(self, record: Dict) -> bytes:
+        encoded = json.dumps(record)
+        if self.fmt == 'json':
+            self._append(encoded if self.count == 0 else ', ' + encoded)
+        else:
+            self._append(encoded + '\n')
+        self.count += 1
+        return self._drain(force=False)
+
+    def close(self, error: Optional[str] = None) -> bytes:
+        # A failure mid-stream can no longer change the status code, so it
+        # is reported inside the body instead.
+        if self.fmt == 'json':
+            footer = {'count': self.count}
+            if error:
+                footer['error'] = error
+            self._append('], ' + json.dumps(footer)[1:])
+        elif error:
+            self._append(json.dumps({'type': 'error', 'message': error}) + '\n')
+        return self._drain(force=True)
+
+    def _append(self, text: str) -> None:
+        self._parts.append(text)
+        self._size += len(text)
+
+    def _drain(self, force: bool) -> bytes:
+        if not force and self._size < EXPORT_CHUNK_BYTES:
+            return b''
+        data = ''.join(self._parts).encode('utf-8')
+        self._parts, self._size = [], 0
+        if self._compressor is not None:
+            data = self._compressor.compress(data)
+            if force:
+                data += self._compressor.flush()
+        return data
+
+
+class ExportService:
+
+    @staticmethod
+    def iter_records(user_id: str, types: List[str]) -> Iterator[Dict]:
+        # Pages straight from storage, newest first, bypassing the history
+        # cache so a full export never lands in it.
+        for record_type in types:
+            collection, order_by, to_dict = EXPORT_TYPES[record_type]
+            cursor = None
+            while True:
+                rows, cursor = firebase_service.get_page(
+                    f'{collection}/{user_id}', order_by,
+                    cursor=cursor,
+                    page_size=EXPORT_PAGE_SIZE
+                )
+                for key, value in rows:
+                    yield {'type': record_type, 'id': key, 'data': to_dict(key, value)}
+                if not cursor:
+                    break
+
+    @staticmethod
+    def stream_export(user_id: str, types: List[str], fmt: str = 'ndjson',
+                      compress: bool = False) -> Iterator[bytes]:
+        writer = ExportWriter(user_id, fmt, compress)
+        writer.open()
+        try:
+            for record in ExportService.iter_records(user_id, types):
+                chunk = writer.write(record)
+                if chunk:
+                    yield chunk
+        except Exception as e:
+            print(f"Error exporting data for {user_id}: {str(e)}")
+            yield writer.close(error=f'Export failed: {str(e)}')
+            return
+        yield writer.close()
+
+export_service = ExportService()
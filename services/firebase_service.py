@@ -1,7 +1,11 @@
-import firebase_admin
-from firebase_admin import credentials, db
-from typing import Optional, Dict, Any
-import os
+import threading
+import time
+from typing import Optional, Dict, Any, Callable, List, Tuple
+from services.metrics import metrics
+from services.storage import StorageBackend, create_backend
+from services.storage.push_id import generate_push_id
+from services.storage.transport import TransportPolicy
+from utils.pagination import page_bounds, refetch_count, trim_page
 
 class FirebaseService:
     _instance = None
@@ -14,64 +18,127 @@ class FirebaseService:
     
     def __init__(self):
         if not FirebaseService._initialized:
-            self.initialize_firebase()
+            self._backend: Optional[StorageBackend] = None
+            self._backend_lock = threading.Lock()
+            self.transport = TransportPolicy()
+            metrics.register_collector('storage_breaker', self.transport.breaker.stats)
             FirebaseService._initialized = True
     
-    def initialize_firebase(self):
+    @property
+    def backend(self) -> StorageBackend:
+        # Created on first use rather than at import, so building the app
+        # never waits on credentials or the network. A failed start is
+        # retried on the next call instead of taking the process down.
+        if self._backend is None:
+            with self._backend_lock:
+                if self._backend is None:
+                    self._backend = self.initialize_backend()
+        return self._backend
+    
+    @property
+    def is_initialized(self) -> bool:
+        return self._backend is not None
+    
+    def initialize_backend(self) -> StorageBackend:
         try:
-            cred_path = os.path.join(os.path.dirname(__file__), '..', 'serviceAccountKey.json')
-            
-            if not os.path.exists(cred_path):
-                raise FileNotFoundError(f"Service account key not found at {cred_path}")
-            
-            cred = credentials.Certificate(cred_path)
-            
-            firebase_admin.initialize_app(cred, {
-                'databaseURL': 'https://upliftai-44452-default-rtdb.firebaseio.com/'
-            })
-            
-            print("✅ Firebase Admin SDK initialized successfully")
+            started = time.perf_counter()
+            backend = create_backend()
+            print(f"✅ Storage backend '{backend.name}' initialized successfully "
+                  f"in {(time.perf_counter() - started) * 1000:.0f} ms")
+            return backend
         except Exception as e:
-            print(f"❌ Firebase initialization error: {str(e)}")
+            print(f"❌ Storage initialization error: {str(e)}")
+            raise
+    
+    def _call(self, op: str, path: str, fn: Callable, *args, payload: Any = None, **kwargs) -> Any:
+        # Runs one backend call through the transport policy (breaker and read
+        # retries) and records it against the operation and the top-level
+        # collection, and in the current request's storage phase.
+        if not metrics.enabled:
+            return self.transport.call(op, fn, *args, **kwargs)
+        started = time.perf_counter()
+        try:
+            result = self.transport.call(op, fn, *args, **kwargs)
+        except Exception:
+            metrics.observe_storage(self.backend.name, op, path, time.perf_counter() - started, failed=True)
             raise
+        metrics.observe_storage(self.backend.name, op, path, time.perf_counter() - started,
+                                result=result, payload=payload)
+        return result
+    
+    def new_key(self) -> str:
+        # Push-style key generated locally, so a record can be written with its
+        # final id in a single set() instead of push() followed by set().
+        return generate_push_id()
     
     def create(self, path: str, data: Dict[str, Any]) -> str:
         try:
-            ref = db.reference(path)
-            new_ref = ref.push(data)
-            return new_ref.key
+            return self._call('create', path, self.backend.create, path, data, payload=data)
         except Exception as e:
             print(f"Error creating record at {path}: {str(e)}")
             raise
     
     def set(self, path: str, data: Dict[str, Any]) -> None:
         try:
-            ref = db.reference(path)
-            ref.set(data)
+            self._call('set', path, self.backend.set, path, data, payload=data)
         except Exception as e:
             print(f"Error setting data at {path}: {str(e)}")
             raise
     
     def get(self, path: str) -> Optional[Dict]:
+        # None means the node does not exist; a failed read raises so an
+        # outage is never reported as missing data.
         try:
-            ref = db.reference(path)
-            return ref.get()
+            return self._call('get', path, self.backend.get, path)
         except Exception as e:
             print(f"Error getting data from {path}: {str(e)}")
-            return None
+            raise
     
+    def query(self, path: str, order_by: str, start_at: Optional[str] = None,
+              end_at: Optional[str] = None, limit_to_last: Optional[int] = None) -> List[Tuple[str, Dict]]:
+        try:
+            return self._call('query', path, self.backend.query, path, order_by, start_at=start_at,
+                              end_at=end_at, limit_to_last=limit_to_last)
+        except Exception as e:
+            print(f"Error querying data from {path}: {str(e)}")
+            raise
+
+    def get_page(self, path: str, order_by: str, since: Optional[str] = None,
+                 until: Optional[str] = None, cursor: Optional[str] = None,
+                 page_size: Optional[int] = None) -> Tuple[List[Tuple[str, Dict]], Optional[str]]:
+        # Returns children newest-first. Ordering, range and limit are all
+        # evaluated by the database, so the transfer size follows page_size.
+        end_at, fetch_count, after = page_bounds(until, cursor, page_size)
+        while True:
+            rows = self.query(path, order_by, start_at=since, end_at=end_at, limit_to_last=fetch_count)
+            fetch_count = refetch_count(rows, order_by, after, fetch_count, page_size)
+            if fetch_count is None:
+                return trim_page(rows, order_by, after, page_size)
+
+    def transaction(self, path: str, update_fn: Callable[[Any], Any]) -> Any:
+        try:
+            return self._call('transaction', path, self.backend.transaction, path, update_fn)
+        except Exception as e:
+            print(f"Error running transaction at {path}: {str(e)}")
+            raise
+
+    def listen(self, path: str, callback: Callable[[Any], None]):
+        try:
+            return self.backend.listen(path, callback)
+        except Exception as e:
+            print(f"Error listening to {path}: {str(e)}")
+            raise
+
     def update(self, path: str, data: Dict[str, Any]) -> None:
         try:
-            ref = db.reference(path)
-            ref.update(data)
+            self._call('update', path, self.backend.update, path, data, payload=data)
         except Exception as e:
             print(f"Error updating data at {path}: {str(e)}")
             raise
     
     def delete(self, path: str) -> None:
         try:
-            ref = db.reference(path)
-            ref.delete()
+            self._call('delete', path, self.backend.delete, path)
         except Exception as e:
             print(f"Error deleting data at {path}: {str(e)}")
             raise
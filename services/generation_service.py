@@ -0,0 +1,268 @@
+import json
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+from services.content_service import content_service
+from services.journal_service import journal_service
+from services.llm import create_client
+from services.llm.base import ModelClient
+from services.metrics import metrics
+from utils.text import tokenize
+
+GENERATION_CACHE_TTL = int(os.getenv('GENERATION_CACHE_TTL', '3600'))
+GENERATION_CACHE_MAX_ENTRIES = int(os.getenv('GENERATION_CACHE_MAX_ENTRIES', '1024'))
+RECENT_JOURNAL_COUNT = 3
+JOURNAL_THEME_COUNT = 3
+
+SYSTEM_CONTEXT = """You are a compassionate mental wellness companion for young adults (ages 12-30).
+Your role:
+- Provide empathetic, supportive responses
+- Generate personalized journal prompts
+- Offer evidence-based wellness advice
+- Be encouraging and warm
+- Keep responses concise (under 150 words)
+- Use simple, friendly language"""
+
+TEMPLATES = {
+    'wellness': {
+        'fields': ('prompt', 'affirmation', 'quote'),
+        'task': """Generate a JSON object containing three items for this user:
+1. "prompt": A warm, personalized journal prompt (under 100 words).
+2. "affirmation": A short, powerful daily affirmation (first person "I...", under 20 words).
+3. "quote": A short motivational quote (under 30 words).
+
+Requirements:
+- Acknowledge their {mood} mood with empathy in the prompt.
+- Return ONLY raw JSON. Do not use markdown formatting."""
+    },
+    'journal_prompt': {
+        'fields': ('prompt',),
+        'task': """Generate a JSON object with one item, "prompt": a warm, personalized journal prompt.
+
+Requirements:
+1. Acknowledge their {mood} mood with empathy
+2. Ask 2-3 thoughtful reflection questions
+3. Reference one of the retrieved tips naturally (if available)
+4. Keep it under 100 words
+- Return ONLY raw JSON. Do not use markdown formatting."""
+    }
+}
+
+FALLBACK_PROMPTS = {
+    'anxious': "What's causing your anxiety? Write about how you're feeling and what might help you feel more calm.",
+    'happy': "What made you happy today? Capture this moment and how it made you feel!",
+    'sad': "It's okay to feel sad. What's on your mind? Write about your feelings.",
+    'stressed': "What's stressing you most right now? Let's break it down together.",
+    'tired': "What's draining your energy? What would rest and recovery look like for you?",
+    'calm': "How are you feeling calm today? What's bringing you peace?"
+}
+FALLBACK_AFFIRMATION = 'I am capable of handling whatever comes my way.'
+FALLBACK_QUOTE = "Believe you can and you're halfway there."
+
+
+def journal_themes(contents: List[str], count: int = JOURNAL_THEME_COUNT) -> Tuple[str, ...]:
+    # Reduces recent entries to a few frequent words, so prompts (and cache keys)
+    # carry the gist of what the user wrote rather than the text itself.
+    counter = Counter()
+    for content in contents:
+        counter.update(word for word in tokenize(content, stemmed=False) if len(word) > 3)
+    return tuple(sorted(word for word, _ in counter.most_common(count)))
+
+
+def parse_output(text: str, fields: Tuple[str, ...]) -> Dict:
+    clean_text = text.replace('```json', '').replace('```', '').strip()
+    data = json.loads(clean_text)
+    missing = [field for field in fields if not data.get(field)]
+    if missing:
+        raise ValueError(f"Model output is missing {', '.join(missing)}")
+    return {field: str(data[field]).strip() for field in fields}
+
+
+# TTL + LRU cache of generated content. Concurrent requests for a key that is
+# being generated wait for that one model call instead of starting their own.
+class GenerationCache:
+
+    def __init__(self, ttl_seconds: int = GENERATION_CACHE_TTL, max_entries: int = GENERATION_CACHE_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[Hashable, Tuple[float, Any]]' = OrderedDict()
+        self._inflight: Dict[Hashable, Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def get_or_generate(self, key: Hashable, producer: Callable[[], Any]) -> Tuple[Any, str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1], 'cache'
+            if entry is not None:
+                del self._entries[key]
+
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            return future.result(), 'coalesced'
+
+        try:
+            value = producer()
+        except Exception as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            # Stored before the in-flight slot is released so no request can miss both.
+            if self.max_entries > 0:
+                self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+            self._inflight.pop(key, None)
+        future.set_result(value)
+        return value, 'model'
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'hit_rate': round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'in_flight': len(self._inflight),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds
+            }
+
+
+generation_cache = GenerationCache()
+metrics.register_collector('generation_cache', generation_cache.stats)
+
+
+class GenerationService:
+    _client: Optional[ModelClient] = None
+
+    @staticmethod
+    def get_client() -> ModelClient:
+        if GenerationService._client is None:
+            GenerationService._client = create_client()
+        return GenerationService._client
+
+    @staticmethod
+    def set_client(client: ModelClient) -> None:
+        GenerationService._client = client
+        generation_cache.clear()
+
+    @staticmethod
+    def generate_wellness_content(user_id: str, mood: str = None, goals: List[str] = None,
+                                  template: str = 'wellness') -> Dict:
+        try:
+            mood = (mood or 'neutral').strip().title()
+            fields = TEMPLATES[template]['fields']
+
+            content_result = content_service.retrieve_relevant_content(mood, goals)
+            content = content_result.get('content', []) if content_result['success'] else []
+            journals_result = journal_service.get_user_journals(user_id, page_size=RECENT_JOURNAL_COUNT)
+            journals = journals_result.get('journals', []) if journals_result['success'] else []
+            journal_texts = [journal['content'] or '' for journal in journals]
+            themes = journal_themes(journal_texts)
+
+            # Content about what the user actually wrote, next to the picks for their mood and goals.
+            related_result = content_service.find_related_content(journal_texts)
+            picked = {item['content_id'] for item in content}
+            related = [item for item in related_result.get('content', []) if item['content_id'] not in picked]
+
+            key = (template, mood.lower(), tuple(sorted(picked)),
+                   tuple(sorted(item['content_id'] for item in related)), themes)
+            try:
+                output, source = generation_cache.get_or_generate(
+                    key,
+                    lambda: parse_output(
+                        GenerationService.get_client().generate(
+                            GenerationService._build_prompt(template, mood, content, related, themes)
+                        ),
+                        fields
+                    )
+                )
+            except Exception as e:
+                print(f"Error generating {template} content: {str(e)}")
+                output, source = GenerationService._fallback(mood, fields), 'fallback'
+
+            return {
+                'success': True,
+                **output,
+                'mood': mood,
+                'content_ids': list(key[2]),
+                'related_content_ids': list(key[3]),
+                'source': source
+            }
+        except Exception as e:
+            return {
+                'success': False,
+                'message': f'Error generating content: {str(e)}'
+            }
+
+    @staticmethod
+    def _build_prompt(template: str, mood: str, content: List[Dict], related: List[Dict],
+                      themes: Tuple[str, ...]) -> str:
+        def format_list(items):
+            return '\n'.join(f'- {item}' for item in items[:3]) or 'None'
+
+        # Content is ordered by id so equal cache keys always produce equal prompts.
+        content = sorted(content, key=lambda item: item['content_id'])
+        tips = [item['text'] for item in content if item.get('type') == 'Tip']
+        quotes = [item['text'] for item in content if item.get('type') == 'Quote']
+        related = [item['text'] for item in sorted(related, key=lambda item: item['content_id'])]
+
+        return f"""{SYSTEM_CONTEXT}
+
+CONTEXT:
+USER MOOD: {mood}
+
+RETRIEVED WELLNESS TIPS:
+{format_list(tips)}
+
+RETRIEVED QUOTES:
+{format_list(quotes)}
+
+RELATED TO RECENT JOURNAL ENTRIES:
+{format_list(related)}
+
+RECENT JOURNAL THEMES: {', '.join(themes) or 'None'}
+
+TASK:
+{TEMPLATES[template]['task'].format(mood=mood)}
+"""
+
+    @staticmethod
+    def _fallback(mood: str, fields: Tuple[str, ...]) -> Dict:
+        fallback = {
+            'prompt': FALLBACK_PROMPTS.get(mood.lower(), "How are you feeling today? What's on your mind?"),
+            'affirmation': FALLBACK_AFFIRMATION,
+            'quote': FALLBACK_QUOTE
+        }
+        return {field: fallback[field] for field in fields}
+
+generation_service = GenerationService()
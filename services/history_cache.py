@@ -0,0 +1,153 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+from services import events
+from services.collection_versions import collection_versions
+from services.metrics import metrics
+
+HISTORY_CACHE_MAX_ENTRIES = int(os.getenv('HISTORY_CACHE_MAX_ENTRIES', '2048'))
+HISTORY_CACHE_MAX_MB = int(os.getenv('HISTORY_CACHE_MAX_MB', '64'))
+
+
+def estimate_size(value: Any) -> int:
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value)
+    return sys.getsizeof(value)
+
+
+# Read-through cache for per-user history reads. Each (user_id, collection)
+# bucket holds the results of the queries made against it, filled under the
+# collection version stored next to the data. Every lookup checks that version
+# first and drops a bucket filled under another one, so writes made through
+# other workers are never hidden; writes made here also drop it right away.
+# Callers that have already read the version, such as routes that built an
+# ETag from it, pass it in, so the cached body matches the tag and the
+# version is not read twice.
+# Buckets are evicted LRU once either the bucket count or the approximate
+# memory cap is exceeded.
+class HistoryCache:
+
+    def __init__(self, max_entries: int = HISTORY_CACHE_MAX_ENTRIES,
+                 max_bytes: int = HISTORY_CACHE_MAX_MB * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._buckets: 'OrderedDict[Tuple[str, str], Dict]' = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.evictions = 0
+
+    def get_or_load(self, user_id: str, collection: str, params: Hashable, loader: Callable[[], Any],
+                    version: Optional[str] = None) -> Any:
+        if self.max_bytes <= 0:
+            return loader()
+        if version is None:
+            version = collection_versions.get(user_id, collection)
+        hit, value = self._lookup(user_id, collection, params, version)
+        if hit:
+            return value
+        value = loader()
+        self._store(user_id, collection, params, value, version)
+        return value
+
+    async def get_or_load_async(self, user_id: str, collection: str, params: Hashable,
+                                loader: Callable[[], Awaitable[Any]], version: Optional[str] = None) -> Any:
+        if self.max_bytes <= 0:
+            return await loader()
+        if version is None:
+            version = await collection_versions.get_async(user_id, collection)
+        hit, value = self._lookup(user_id, collection, params, version)
+        if hit:
+            return value
+        value = await loader()
+        self._store(user_id, collection, params, value, version)
+        return value
+
+    def _lookup(self, user_id: str, collection: str, params: Hashable, version: str) -> Tuple[bool, Any]:
+        key = (user_id, collection)
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is not None and bucket['version'] != version:
+                self._drop(key)
+                self.stale += 1
+                bucket = None
+            if bucket is not None and params in bucket['results']:
+                self._buckets.move_to_end(key)
+                self.hits += 1
+                return True, bucket['results'][params]
+            self.misses += 1
+            return False, None
+
+    def _store(self, user_id: str, collection: str, params: Hashable, value: Any, version: str) -> None:
+        # The version was read before the load, so a write that raced with
+        # it changed the stored version and the fill is never served.
+        key = (user_id, collection)
+        size = estimate_size(value)
+
+        with self._lock:
+            if size > self.max_bytes:
+                return
+            bucket = self._buckets.get(key)
+            if bucket is not None and bucket['version'] != version:
+                self._drop(key)
+            bucket = self._buckets.setdefault(key, {'size': 0, 'results': {}, 'version': version})
+            self._buckets.move_to_end(key)
+            if params in bucket['results']:
+                old_size = estimate_size(bucket['results'][params])
+                bucket['size'] -= old_size
+                self._bytes -= old_size
+            bucket['results'][params] = value
+            bucket['size'] += size
+            self._bytes += size
+            self._evict()
+
+    def _evict(self) -> None:
+        while self._buckets and (len(self._buckets) > self.max_entries or self._bytes > self.max_bytes):
+            _, bucket = self._buckets.popitem(last=False)
+            self._bytes -= bucket['size']
+            self.evictions += 1
+
+    def _drop(self, key: Tuple[str, str]) -> None:
+        # Called with the lock held.
+        bucket = self._buckets.pop(key, None)
+        if bucket is not None:
+            self._bytes -= bucket['size']
+
+    def invalidate(self, user_id: str, collection: str) -> None:
+        with self._lock:
+            self._drop((user_id, collection))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'stale': self.stale,
+                'evictions': self.evictions,
+                'entries': len(self._buckets),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes
+            }
+
+
+history_cache = HistoryCache()
+metrics.register_collector('history_cache', history_cache.stats)
+
+
+@events.subscribe
+def _invalidate_on_write(event: Dict) -> None:
+    history_cache.invalidate(event['user_id'], event['collection'])
@@ -0,0 +1,314 @@
+from datetime import date
+from typing import Dict, List, Optional
+import numpy as np
+from services.firebase_service import firebase_service
+from services.history_cache import history_cache
+from services.stats_service import ENERGY_LEVELS
+
+# Valence used for mood averages and correlations. Moods outside this scale
+# are still counted in the distributions but carry no score.
+MOOD_SCORES = {'Happy': 5, 'Energetic': 4, 'Calm': 4, 'Tired': 2, 'Anxious': 2, 'Stressed': 2, 'Sad': 1}
+WEEKDAYS = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+
+INSIGHTS_DEFAULT_DAYS = 30
+INSIGHTS_MAX_DAYS = 366
+INSIGHTS_MAX_LAG = 7
+INSIGHTS_PERIODS = 12
+# Entry dates come from clients, so the analysed span is limited to this many
+# days up to today; entries dated outside it are left out.
+INSIGHTS_MAX_HISTORY_DAYS = 3660
+MIN_CORRELATION_DAYS = 5
+
+
+def day_numbers(values: List[str]) -> np.ndarray:
+    # Days since 1970-01-01 for ISO date strings, -1 where a value is not a date.
+    days = np.full(len(values), -1, dtype=np.int64)
+    candidates = [i for i, value in enumerate(values) if len(value) == 10 and value[4] == '-' and value[7] == '-']
+    if not candidates:
+        return days
+    try:
+        days[candidates] = np.array([values[i] for i in candidates], dtype='datetime64[D]').astype(np.int64)
+    except ValueError:
+        for i in candidates:
+            try:
+                days[i] = np.datetime64(values[i], 'D').astype(np.int64)
+            except ValueError:
+                pass
+    return days
+
+
+def load_mood_columns(user_id: str) -> Dict:
+    data = firebase_service.get(f'moods/{user_id}') or {}
+    names = list(MOOD_SCORES)
+    index = {name: i for i, name in enumerate(names)}
+    days, codes, energy = [], [], []
+    for entry in data.values():
+        if not isinstance(entry, dict):
+            continue
+        mood = str(entry.get('mood') or 'Unknown').strip().title()
+        if mood not in index:
+            index[mood] = len(names)
+            names.append(mood)
+        days.append(str(entry.get('date') or entry.get('created_at') or '')[:10])
+        codes.append(index[mood])
+        energy.append(ENERGY_LEVELS.get(entry.get('energy'), np.nan))
+
+    day = day_numbers(days)
+    keep = day >= 0
+    code = np.array(codes, dtype=np.int64)[keep]
+    scores = np.array([MOOD_SCORES.get(name, np.nan) for name in names], dtype=np.float64)
+    return {
+        'day': day[keep],
+        'code': code,
+        'score': scores[code],
+        'energy': np.array(energy, dtype=np.float64)[keep],
+        'names': names
+    }
+
+
+def load_activity_columns(user_id: str) -> Dict:
+    data = firebase_service.get(f'user_activities/{user_id}') or {}
+    names: List[str] = []
+    index: Dict[str, int] = {}
+    days, types, minutes = [], [], []
+    for entry in data.values():
+        if not isinstance(entry, dict):
+            continue
+        activity = str(entry.get('type') or entry.get('activity_name') or 'Other').strip() or 'Other'
+        if activity not in index:
+            index[activity] = len(names)
+            names.append(activity)
+        days.append(str(entry.get('date') or entry.get('timestamp') or '')[:10])
+        types.append(index[activity])
+        try:
+            minutes.append(max(float(entry.get('duration')), 0.0))
+        except (TypeError, ValueError):
+            minutes.append(0.0)
+
+    day = day_numbers(days)
+    keep = day >= 0
+    return {
+        'day': day[keep],
+        'type': np.array(types, dtype=np.int64)[keep],
+        'minutes': np.array(minutes, dtype=np.float64)[keep],
+        'names': names
+    }
+
+
+def within(columns: Dict, first_day: int, last_day: int) -> Dict:
+    keep = (columns['day'] >= first_day) & (columns['day'] <= last_day)
+    return {key: value[keep] if isinstance(value, np.ndarray) else value for key, value in columns.items()}
+
+
+def _value(value, digits: int = 2) -> Optional[float]:
+    return None if value is None or np.isnan(value) else round(float(value), digits)
+
+
+def _day_label(day: int) -> str:
+    return str(np.datetime64(int(day), 'D'))
+
+
+def _mean(sums: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    return np.divide(sums, counts, out=np.full(sums.shape, np.nan), where=counts > 0)
+
+
+def _sums(index: np.ndarray, values: np.ndarray, size: int):
+    # Sums and counts of the non-NaN values per bucket.
+    scored = ~np.isnan(values)
+    return (np.bincount(index[scored], weights=values[scored], minlength=size),
+            np.bincount(index[scored], minlength=size).astype(np.float64))
+
+
+def rolling_mean(sums: np.ndarray, counts: np.ndarray, window: int) -> np.ndarray:
+    # Trailing mean over `window` days of entries, not of daily means, so
+    # busy days weigh more and gaps do not shrink the window.
+    total_sums = np.concatenate(([0.0], np.cumsum(sums)))
+    total_counts = np.concatenate(([0.0], np.cumsum(counts)))
+    upper = np.arange(1, len(sums) + 1)
+    lower = np.maximum(upper - window, 0)
+    return _mean(total_sums[upper] - total_sums[lower], total_counts[upper] - total_counts[lower])
+
+
+def grouped(keys: np.ndarray, moods: Dict) -> List:
+    # Mean mood, mean energy and entry count per distinct key, oldest first.
+    unique, inverse = np.unique(keys, return_inverse=True)
+    size = len(unique)
+    mood = _mean(*_sums(inverse, moods['score'], size))
+    energy = _mean(*_sums(inverse, moods['energy'], size))
+    entries = np.bincount(inverse, minlength=size)
+    return [(unique[i], mood[i], energy[i], int(entries[i])) for i in range(max(size - INSIGHTS_PERIODS, 0), size)]
+
+
+def correlate(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    # Pearson correlation of each row of x with y.
+    x_centered = x - x.mean(axis=1, keepdims=True)
+    y_centered = y - y.mean()
+    denominator = np.sqrt((x_centered ** 2).sum(axis=1) * (y_centered ** 2).sum())
+    return np.divide(x_centered @ y_centered, denominator,
+                     out=np.full(x.shape[0], np.nan), where=denominator > 0)
+
+
+def compute_insights(moods: Dict, activities: Dict, days: int = INSIGHTS_DEFAULT_DAYS,
+                     lag: int = 1, today: date = None) -> Dict:
+    today_day = int(np.datetime64(today or date.today(), 'D').astype(np.int64))
+    moods = within(moods, today_day - INSIGHTS_MAX_HISTORY_DAYS + 1, today_day)
+    if len(moods['day']):
+        # The daily series runs from the first mood to today, whatever dates
+        # the activities carry.
+        activities = within(activities, int(moods['day'].min()), today_day)
+    if not len(moods['day']):
+        return {
+            'mood_entries': 0,
+            'activity_entries': int(len(activities['day'])),
+            'moving_average': None,
+            'daily': [],
+            'weekly': [],
+            'monthly': [],
+            'weekday': [],
+            'activity_correlations': []
+        }
+
+    start = int(moods['day'].min())
+    span = today_day - start + 1
+
+    # Daily series over the whole history.
+    mood_index = moods['day'] - start
+    mood_sums, mood_counts = _sums(mood_index, moods['score'], span)
+    energy_sums, energy_counts = _sums(mood_index, moods['energy'], span)
+    entries = np.bincount(mood_index, minlength=span)
+    daily_mood = _mean(mood_sums, mood_counts)
+    daily_energy = _mean(energy_sums, energy_counts)
+    mood_7d = rolling_mean(mood_sums, mood_counts, 7)
+    mood_30d = rolling_mean(mood_sums, mood_counts, 30)
+    energy_7d = rolling_mean(energy_sums, energy_counts, 7)
+    energy_30d = rolling_mean(energy_sums, energy_counts, 30)
+
+    recent = range(max(span - days, 0), span)
+    daily = [{
+        'date': _day_label(start + i),
+        'mood': _value(daily_mood[i]),
+        'energy': _value(daily_energy[i]),
+        'entries': int(entries[i]),
+        'mood_7d': _value(mood_7d[i]),
+        'energy_7d': _value(energy_7d[i])
+    } for i in recent]
+
+    # 1970-01-05 was a Monday, so (day + 3) // 7 numbers Monday-based weeks.
+    weekly = [{
+        'week_start': _day_label(week * 7 - 3),
+        'mood': _value(mood),
+        'energy': _value(energy),
+        'entries': count
+    } for week, mood, energy, count in grouped((moods['day'] + 3) // 7, moods)]
+
+    months = moods['day'].astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+    monthly = [{
+        'month': str(np.datetime64(int(month), 'M')),
+        'mood': _value(mood),
+        'energy': _value(energy),
+        'entries': count
+    } for month, mood, energy, count in grouped(months, moods)]
+
+    weekday_index = (moods['day'] + 3) % 7
+    weekday_mood = _mean(*_sums(weekday_index, moods['score'], 7))
+    weekday_energy = _mean(*_sums(weekday_index, moods['energy'], 7))
+    names = moods['names']
+    distribution = np.bincount(weekday_index * len(names) + moods['code'],
+                               minlength=7 * len(names)).reshape(7, len(names))
+    weekday = [{
+        'weekday': WEEKDAYS[i],
+        'mood': _value(weekday_mood[i]),
+        'energy': _value(weekday_energy[i]),
+        'entries': int(distribution[i].sum()),
+        'moods': {names[k]: int(distribution[i, k]) for k in np.flatnonzero(distribution[i])}
+    } for i in range(7)]
+
+    return {
+        'mood_entries': int(len(moods['day'])),
+        'activity_entries': int(len(activities['day'])),
+        'first_day': _day_label(start),
+        'moving_average': {
+            'mood_7d': _value(mood_7d[-1]),
+            'mood_30d': _value(mood_30d[-1]),
+            'energy_7d': _value(energy_7d[-1]),
+            'energy_30d': _value(energy_30d[-1])
+        },
+        'daily': daily,
+        'weekly': weekly,
+        'monthly': monthly,
+        'weekday': weekday,
+        'activity_correlations': activity_correlations(activities, daily_mood, daily_energy, start, lag)
+    }
+
+
+def activity_correlations(activities: Dict, daily_mood: np.ndarray, daily_energy: np.ndarray,
+                          start: int, lag: int) -> List[Dict]:
+    # Minutes of each activity on day d against mood and energy on day d + lag,
+    # over the days that have a mood score `lag` days later.
+    names = activities['names']
+    span = len(daily_mood)
+    if not names or span <= lag:
+        return []
+
+    minutes = np.bincount(activities['type'] * span + (activities['day'] - start),
+                          weights=activities['minutes'], minlength=len(names) * span).reshape(len(names), span)
+    later_mood = daily_mood[lag:]
+    later_energy = daily_energy[lag:]
+    scored = ~np.isnan(later_mood)
+    sample_days = int(scored.sum())
+    if sample_days < MIN_CORRELATION_DAYS:
+        return []
+
+    x = minutes[:, :span - lag][:, scored]
+    y = later_mood[scored]
+    mood_r = correlate(x, y)
+    energy_scored = ~np.isnan(later_energy)
+    energy_r = (correlate(minutes[:, :span - lag][:, energy_scored], later_energy[energy_scored])
+                if energy_scored.sum() >= MIN_CORRELATION_DAYS else np.full(len(names), np.nan))
+
+    active = x > 0
+    active_days = active.sum(axis=1)
+    inactive_days = sample_days - active_days
+    mood_active = np.divide(active @ y, active_days, out=np.full(len(names), np.nan), where=active_days > 0)
+    mood_inactive = np.divide((~active) @ y, inactive_days, out=np.full(len(names), np.nan), where=inactive_days > 0)
+    total_minutes = minutes.sum(axis=1)
+
+    results = [{
+        'activity': names[i],
+        'total_minutes': _value(total_minutes[i], 1),
+        'active_days': int(active_days[i]),
+        'sample_days': sample_days,
+        'mood_correlation': _value(mood_r[i], 3),
+        'energy_correlation': _value(energy_r[i], 3),
+        'mood_when_active': _value(mood_active[i]),
+        'mood_when_inactive': _value(mood_inactive[i])
+    } for i in range(len(names))]
+    results.sort(key=lambda item: -abs(item['mood_correlation'] or 0))
+    return results
+
+
+class InsightsService:
+
+    @staticmethod
+    def get_insights(user_id: str, days: int = INSIGHTS_DEFAULT_DAYS, lag: int = 1) -> Dict:
+        try:
+            # Columns are cached with the user's history reads and dropped on
+            # any write to the collection, so repeat requests skip storage.
+            moods = history_cache.get_or_load(user_id, 'moods', ('insights',),
+                                              lambda: load_mood_columns(user_id))
+            activities = history_cache.get_or_load(user_id, 'user_activities', ('insights',),
+                                                   lambda: load_activity_columns(user_id))
+            insights = compute_insights(moods, activities, days, lag)
+            return {
+                'success': True,
+                'user_id': user_id,
+                'lag_days': lag,
+                'insights': insights
+            }
+        except Exception as e:
+            return {
+                'success': False,
+                'message': f'Error computing insights: {str(e)}'
+            }
+
+insights_service = InsightsService()
@@ -1,6 +1,10 @@
 from typing import Dict
 from models.journal_entry import JournalEntry
 from services.firebase_service import firebase_service
+from services.collection_versions import collection_versions
+from services.history_cache import history_cache
+from services import events
+from services.metrics import metrics
 
 class JournalService:
     
@@ -8,7 +12,7 @@ class JournalService:
     def create_journal_entry(user_id: str, date: str, content: str, 
                             prompt: str = None) -> Dict:
         try:
-            journal_id = firebase_service.create(f'journals/{user_id}', {})
+            journal_id = firebase_service.new_key()
             
             journal_entry = JournalEntry(
                 journal_id=journal_id,
@@ -19,13 +23,15 @@ class JournalService:
             )
             
             path = f'journals/{user_id}/{journal_id}'
-            firebase_service.set(path, journal_entry.to_dict())
+            entry_data = journal_entry.to_dict()
+            firebase_service.update('/', collection_versions.stamp('journals', user_id, {path: entry_data}))
+            events.publish('journals', user_id, 'create', journal_id, entry_data)
             
             return {
                 'success': True,
                 'message': 'Journal entry created successfully',
                 'journal_id': journal_id,
-                'journal_entry': journal_entry.to_dict()
+                'journal_entry': entry_data
             }
         except Exception as e:
             return {
@@ -35,33 +41,22 @@ class JournalService:
     
 
     @staticmethod
-    def get_user_journals(user_id: str, limit: int = None) -> Dict:
+    def get_user_journals(user_id: str, limit: int = None, since: str = None,
+                          until: str = None, cursor: str = None, page_size: int = None,
+                          version: str = None) -> Dict:
         try:
-            path = f'journals/{user_id}'
-            data = firebase_service.get(path)
+            journal_list, next_cursor = history_cache.get_or_load(
+                user_id, 'journals', (since, until, cursor, page_size or limit),
+                lambda: JournalService._load_journals(user_id, since, until, cursor, page_size or limit),
+                version=version
+            )
             
-            if data:
-                journal_list = []
-                for journal_id, journal_data in data.items():
-                    journal_entry = JournalEntry.from_dict(journal_id, journal_data)
-                    journal_list.append(journal_entry.to_dict())
-                
-                journal_list.sort(key=lambda x: x['created_at'], reverse=True)
-                
-                if limit:
-                    journal_list = journal_list[:limit]
-                
-                return {
-                    'success': True,
-                    'count': len(journal_list),
-                    'journals': journal_list
-                }
-            else:
-                return {
-                    'success': True,
-                    'count': 0,
-                    'journals': []
-                }
+            return {
+                'success': True,
+                'count': len(journal_list),
+                'journals': journal_list,
+                'next_cursor': next_cursor
+            }
         except Exception as e:
             return {
                 'success': False,
@@ -72,7 +67,9 @@ class JournalService:
     def delete_journal_entry(user_id: str, journal_id: str) -> Dict:
         try:
             path = f'journals/{user_id}/{journal_id}'
-            firebase_service.delete(path)
+            journal_data = firebase_service.get(path)
+            firebase_service.update('/', collection_versions.stamp('journals', user_id, {path: None}))
+            events.publish('journals', user_id, 'delete', journal_id, journal_data)
             
             return {
                 'success': True,
@@ -84,4 +81,19 @@ class JournalService:
                 'message': f'Error deleting journal entry: {str(e)}'
             }
 
+    @staticmethod
+    def _load_journals(user_id: str, since: str, until: str, cursor: str, page_size: int):
+        rows, next_cursor = firebase_service.get_page(
+            f'journals/{user_id}', 'created_at',
+            since=since,
+            until=until,
+            cursor=cursor,
+            page_size=page_size
+        )
+        
+        with metrics.phase('serialize'):
+            journal_list = [JournalEntry.row_to_dict(journal_id, journal_data) for journal_id, journal_data in rows]
+        metrics.materialized('journal', len(journal_list))
+        return journal_list, next_cursor
+
 journal_service = JournalService()
\ No newline at end of file
@@ -0,0 +1,17 @@
+import os
+from services.llm.base import ModelClient
+
+MODEL_CLIENTS = ('gemini', 'stub')
+
+
+def create_client(name: str = None) -> ModelClient:
+    name = (name or os.getenv('GENERATION_MODEL_CLIENT', 'gemini')).lower()
+
+    if name == 'gemini':
+        from services.llm.gemini_client import GeminiClient
+        return GeminiClient()
+    if name == 'stub':
+        from services.llm.stub_client import StubClient
+        return StubClient()
+
+    raise ValueError(f"Unknown model client '{name}', expected one of {', '.join(MODEL_CLIENTS)}")
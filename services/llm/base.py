@@ -0,0 +1,11 @@
+from abc import ABC, abstractmethod
+
+
+class ModelClient(ABC):
+    # Text-in, text-out language model used by the generation service.
+
+    name = 'base'
+
+    @abstractmethod
+    def generate(self, prompt: str) -> str:
+        pass
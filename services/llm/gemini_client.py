@@ -0,0 +1,48 @@
+import os
+import requests
+from services.llm.base import ModelClient
+
+DEFAULT_GEMINI_MODEL = 'gemini-2.0-flash'
+GEMINI_API_URL = 'https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent'
+
+
+class GeminiClient(ModelClient):
+    name = 'gemini'
+
+    def __init__(self, api_key: str = None, model: str = None, timeout: float = None):
+        self.api_key = api_key or os.getenv('GEMINI_API_KEY')
+        if not self.api_key:
+            raise ValueError('GEMINI_API_KEY is not set')
+        self.url = GEMINI_API_URL.format(model=model or os.getenv('GEMINI_MODEL', DEFAULT_GEMINI_MODEL))
+        self.timeout = timeout or float(os.getenv('GEMINI_TIMEOUT', '30'))
+        self.session = requests.Session()
+
+    def generate(self, prompt: str) -> str:
+        response = self.session.post(
+            self.url,
+            params={'key': self.api_key},
+            json={
+                'contents': [{'parts': [{'text': prompt}]}],
+                'generationConfig': {
+                    'temperature': 0.7,
+                    'maxOutputTokens': 500,
+                    'topP': 0.95,
+                    'topK': 40
+                },
+                'safetySettings': [
+                    {'category': 'HARM_CATEGORY_HARASSMENT', 'threshold': 'BLOCK_MEDIUM_AND_ABOVE'},
+                    {'category': 'HARM_CATEGORY_HATE_SPEECH', 'threshold': 'BLOCK_MEDIUM_AND_ABOVE'}
+                ]
+            },
+            timeout=self.timeout
+        )
+        if not response.ok:
+            message = response.json().get('error', {}).get('message', response.reason)
+            raise RuntimeError(f'Gemini API error: {message}')
+
+        candidates = response.json().get('candidates') or [{}]
+        parts = candidates[0].get('content', {}).get('parts') or [{}]
+        text = parts[0].get('text')
+        if not text:
+            raise RuntimeError('No response text from Gemini API')
+        return text.strip()
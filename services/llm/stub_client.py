@@ -0,0 +1,26 @@
+import hashlib
+import json
+import time
+from services.llm.base import ModelClient
+
+
+class StubClient(ModelClient):
+    # Deterministic offline client for local runs and tests. The same prompt
+    # always produces the same answer, and `latency` simulates a real model.
+
+    name = 'stub'
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = 0
+
+    def generate(self, prompt: str) -> str:
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        digest = hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:8]
+        return json.dumps({
+            'prompt': f'What is one thing on your mind right now? ({digest})',
+            'affirmation': 'I am doing the best I can, and that is enough.',
+            'quote': 'Progress, not perfection.'
+        })
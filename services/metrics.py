@@ -0,0 +1,206 @@
+import contextvars
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+# Encoding every storage payload to measure it costs about as much as the
+# serialization being measured, so it is off unless asked for.
+METRICS_STORAGE_PAYLOAD = os.getenv('METRICS_STORAGE_PAYLOAD', 'false').lower() == 'true'
+
+SECONDS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+# Per-request phase totals (storage, serialize, render), shared by reference
+# so the Flask thread or Quart task that owns the request sees every add.
+_request_phases: contextvars.ContextVar[Optional[Dict[str, float]]] = contextvars.ContextVar(
+    'request_phases', default=None)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = key + extra
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Histogram:
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+
+# Counters and histograms keyed by metric name and label set, rendered in the
+# Prometheus text exposition format. Collectors add gauges computed at scrape
+# time from components that already keep their own stats.
+class MetricsRegistry:
+
+    def __init__(self, enabled: bool = METRICS_ENABLED):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._help: Dict[str, Tuple[str, str]] = {}
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, _Histogram]] = {}
+        self._bucket_sets: Dict[str, Tuple[float, ...]] = {}
+        self._collectors: Dict[str, Callable[[], Dict]] = {}
+
+    def counter(self, name: str, help_text: str) -> None:
+        self._help[name] = ('counter', help_text)
+        self._counters.setdefault(name, {})
+
+    def histogram(self, name: str, help_text: str, buckets: Tuple[float, ...] = SECONDS_BUCKETS) -> None:
+        self._help[name] = ('histogram', help_text)
+        self._histograms.setdefault(name, {})
+        self._bucket_sets[name] = buckets
+
+    def register_collector(self, prefix: str, collect: Callable[[], Dict]) -> None:
+        self._collectors[prefix] = collect
+
+    def inc(self, name: str, labels: Dict[str, str], value: float = 1) -> None:
+        if not self.enabled:
+            return
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters[name]
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, labels: Dict[str, str], value: float) -> None:
+        if not self.enabled:
+            return
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms[name]
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = _Histogram(self._bucket_sets[name])
+            histogram.observe(value)
+
+    def reset(self) -> None:
+        with self._lock:
+            for series in self._counters.values():
+                series.clear()
+            for series in self._histograms.values():
+                series.clear()
+
+    def render(self) -> str:
+        lines: List[str] = []
+        with self._lock:
+            for name, series in self._counters.items():
+                lines.append(f'# HELP {name} {self._help[name][1]}')
+                lines.append(f'# TYPE {name} counter')
+                for key, value in series.items():
+                    lines.append(f'{name}{_format_labels(key)} {_format_value(value)}')
+
+            for name, series in self._histograms.items():
+                lines.append(f'# HELP {name} {self._help[name][1]}')
+                lines.append(f'# TYPE {name} histogram')
+                for key, histogram in series.items():
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        cumulative += count
+                        lines.append(f'{name}_bucket{_format_labels(key, (("le", _format_value(bound)),))} {cumulative}')
+                    lines.append(f'{name}_bucket{_format_labels(key, (("le", "+Inf"),))} {histogram.count}')
+                    lines.append(f'{name}_sum{_format_labels(key)} {_format_value(histogram.sum)}')
+                    lines.append(f'{name}_count{_format_labels(key)} {histogram.count}')
+
+        for prefix, collect in list(self._collectors.items()):
+            try:
+                values = collect()
+            except Exception as e:
+                print(f"Error collecting {prefix} metrics: {str(e)}")
+                continue
+            for field, value in values.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    lines.append(f'# TYPE {prefix}_{field} gauge')
+                    lines.append(f'{prefix}_{field} {_format_value(value)}')
+
+        return '\n'.join(lines) + '\n'
+
+    # Request phases
+
+    def start_request(self) -> contextvars.Token:
+        return _request_phases.set({})
+
+    def end_request(self, token: contextvars.Token) -> Dict[str, float]:
+        phases = _request_phases.get() or {}
+        _request_phases.reset(token)
+        return phases
+
+    def add_phase(self, phase: str, seconds: float) -> None:
+        phases = _request_phases.get()
+        if phases is not None:
+            phases[phase] = phases.get(phase, 0.0) + seconds
+
+    @contextmanager
+    def phase(self, phase: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_phase(phase, time.perf_counter() - started)
+
+    def materialized(self, model: str, count: int) -> None:
+        self.inc('records_materialized_total', {'model': model}, count)
+
+    def observe_storage(self, backend: str, op: str, path: str, seconds: float,
+                        result=None, payload=None, failed: bool = False) -> None:
+        if not self.enabled:
+            return
+        labels = {'backend': backend, 'op': op, 'collection': collection_of(path)}
+        self.inc('storage_operations_total', labels)
+        self.observe('storage_operation_seconds', labels, seconds)
+        self.add_phase('storage', seconds)
+        if failed:
+            self.inc('storage_errors_total', labels)
+            return
+        if op == 'query' and isinstance(result, list):
+            self.inc('storage_records_total', labels, len(result))
+        if METRICS_STORAGE_PAYLOAD:
+            body = payload if payload is not None else result
+            if body is not None:
+                self.observe('storage_payload_bytes', labels, len(json.dumps(body, default=str)))
+
+
+def collection_of(path: str) -> str:
+    # Only the top-level node is used as a label so user ids never become
+    # series of their own.
+    return path.strip('/').split('/', 1)[0] or '/'
+
+
+metrics = MetricsRegistry()
+metrics.counter('http_requests_total', 'API requests by route, method and status.')
+metrics.histogram('http_request_duration_seconds', 'API request latency by route.')
+metrics.histogram('http_request_phase_seconds', 'Time per request spent in storage, serialize and render.')
+metrics.histogram('http_response_bytes', 'API response body size by route.', BYTES_BUCKETS)
+metrics.counter('storage_operations_total', 'Storage facade calls by operation and collection.')
+metrics.counter('storage_errors_total', 'Storage facade calls that raised.')
+metrics.histogram('storage_operation_seconds', 'Storage facade call latency.')
+metrics.counter('storage_records_total', 'Records returned by storage queries.')
+metrics.histogram('storage_payload_bytes', 'JSON size of storage payloads (METRICS_STORAGE_PAYLOAD).', BYTES_BUCKETS)
+metrics.counter('records_materialized_total', 'Records converted to API dicts by model.')
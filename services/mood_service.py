@@ -1,6 +1,10 @@
 from typing import Dict
 from models.mood_entry import MoodEntry
 from services.firebase_service import firebase_service
+from services.collection_versions import collection_versions
+from services.history_cache import history_cache
+from services import events
+from services.metrics import metrics
 
 class MoodService:
     
@@ -9,7 +13,7 @@ class MoodService:
                          energy: str, notes: str = None) -> Dict:
         
         try:
-            entry_id = firebase_service.create(f'moods/{user_id}', {})
+            entry_id = firebase_service.new_key()
             
             mood_entry = MoodEntry(
                 entry_id=entry_id,
@@ -21,13 +25,15 @@ class MoodService:
             )
             
             path = f'moods/{user_id}/{entry_id}'
-            firebase_service.set(path, mood_entry.to_dict())
+            entry_data = mood_entry.to_dict()
+            firebase_service.update('/', collection_versions.stamp('moods', user_id, {path: entry_data}))
+            events.publish('moods', user_id, 'create', entry_id, entry_data)
             
             return {
                 'success': True,
                 'message': 'Mood entry created successfully',
                 'entry_id': entry_id,
-                'mood_entry': mood_entry.to_dict()
+                'mood_entry': entry_data
             }
         except Exception as e:
             return {
@@ -36,37 +42,41 @@ class MoodService:
             }
     
     @staticmethod
-    def get_user_moods(user_id: str, limit: int = None) -> Dict:
+    def get_user_moods(user_id: str, limit: int = None, since: str = None,
+                       until: str = None, cursor: str = None, page_size: int = None,
+                       version: str = None) -> Dict:
         try:
-            path = f'moods/{user_id}'
-            data = firebase_service.get(path)
+            mood_list, next_cursor = history_cache.get_or_load(
+                user_id, 'moods', (since, until, cursor, page_size or limit),
+                lambda: MoodService._load_moods(user_id, since, until, cursor, page_size or limit),
+                version=version
+            )
             
-            if data:
-                mood_list = []
-                for entry_id, entry_data in data.items():
-                    mood_entry = MoodEntry.from_dict(entry_id, entry_data)
-                    mood_list.append(mood_entry.to_dict())
-                
-                mood_list.sort(key=lambda x: x['created_at'], reverse=True)
-                
-                if limit:
-                    mood_list = mood_list[:limit]
-                
-                return {
-                    'success': True,
-                    'count': len(mood_list),
-                    'moods': mood_list
-                }
-            else:
-                return {
-                    'success': True,
-                    'count': 0,
-                    'moods': []
-                }
+            return {
+                'success': True,
+                'count': len(mood_list),
+                'moods': mood_list,
+                'next_cursor': next_cursor
+            }
         except Exception as e:
             return {
                 'success': False,
                 'message': f'Error getting moods: {str(e)}'
             }
+
+    @staticmethod
+    def _load_moods(user_id: str, since: str, until: str, cursor: str, page_size: int):
+        rows, next_cursor = firebase_service.get_page(
+            f'moods/{user_id}', 'created_at',
+            since=since,
+            until=until,
+            cursor=cursor,
+            page_size=page_size
+        )
+        
+        with metrics.phase('serialize'):
+            mood_list = [MoodEntry.row_to_dict(entry_id, entry_data) for entry_id, entry_data in rows]
+        metrics.materialized('mood', len(mood_list))
+        return mood_list, next_cursor
     
 mood_service = MoodService()
\ No newline at end of file
@@ -0,0 +1,220 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from services.content_catalog import content_catalog
+from services.metrics import metrics
+
+RECOMMENDATION_COUNT = int(os.getenv('RECOMMENDATION_COUNT', '5'))
+RECOMMENDATION_CANDIDATES = int(os.getenv('RECOMMENDATION_CANDIDATES', '25'))
+RECOMMENDATION_HISTORY = int(os.getenv('RECOMMENDATION_HISTORY', '5'))
+RECOMMENDATION_MAX_USERS = int(os.getenv('RECOMMENDATION_MAX_USERS', '10000'))
+
+MOOD_CATEGORIES = {
+    'anxious': ['Stress', 'Mindfulness'],
+    'stressed': ['Stress', 'Relaxation'],
+    'tired': ['Motivation', 'Energy'],
+    'happy': ['Gratitude', 'Motivation'],
+    'sad': ['Motivation', 'Self-Compassion'],
+    'calm': ['Mindfulness', 'Gratitude']
+}
+DEFAULT_CATEGORIES = ['Motivation']
+
+# The goals offered on the onboarding page. Any other goal is matched on its
+# own words against categories and tags.
+GOAL_CATEGORIES = {
+    'reduce stress': ['Stress', 'Relaxation'],
+    'improve sleep': ['Sleep', 'Relaxation'],
+    'boost confidence': ['Confidence', 'Self-Compassion', 'Motivation'],
+    'manage anxiety': ['Anxiety', 'Stress', 'Mindfulness'],
+    'increase focus': ['Focus', 'Mindfulness'],
+    'better relationships': ['Relationships', 'Gratitude'],
+    'positive thinking': ['Positivity', 'Gratitude', 'Motivation'],
+    'emotional balance': ['Balance', 'Mindfulness', 'Self-Compassion'],
+    'self discovery': ['Self-Discovery', 'Mindfulness'],
+    'overcome grief': ['Grief', 'Self-Compassion']
+}
+
+MOOD_WEIGHT = 1.0
+MOOD_TAG_WEIGHT = 0.5
+GOAL_WEIGHT = 1.5
+GOAL_TAG_WEIGHT = 0.75
+EXPOSURE_PENALTY = 2.0
+CATEGORY_REPEAT_PENALTY = 0.5
+TYPE_REPEAT_PENALTY = 0.25
+
+# (item, mood score, goal score)
+Candidate = Tuple[Dict, float, float]
+
+
+def normalize(value: Optional[str]) -> str:
+    return ' '.join(str(value or '').replace('_', ' ').lower().split())
+
+
+def goal_terms(goal: str) -> Tuple[List[str], List[str]]:
+    # Categories the goal maps to, and the words to look for in tags.
+    words = [word for word in goal.split() if len(word) > 3]
+    categories = [normalize(category) for category in GOAL_CATEGORIES.get(goal, [])] or [goal] + words
+    return categories, sorted(set(words + categories))
+
+
+# Picks content for a mood and a set of goals. For each (mood, goal) pair the
+# catalog is scored once, through its category and tag indexes, and the best
+# `candidates` items are kept until the catalog reloads. A request only merges
+# the small lists for its goals and picks from them greedily: items the user
+# was served recently are pushed down, as are items whose category or type
+# has already been picked. Nothing is random, so the same state gives the
+# same answer, which keeps generated content cacheable.
+class RecommendationEngine:
+
+    def __init__(self, count: int = RECOMMENDATION_COUNT, candidates: int = RECOMMENDATION_CANDIDATES,
+                 history: int = RECOMMENDATION_HISTORY, max_users: int = RECOMMENDATION_MAX_USERS):
+        self.count = count
+        self.candidates = candidates
+        self.history = max(history, 1)
+        self.max_users = max_users
+        self._lock = threading.Lock()
+        self._version = None
+        self._sets: Dict[Tuple[str, str], List[Candidate]] = {}
+        # Per user: [requests served, {content_id: request it was last served in}],
+        # LRU by user.
+        self._served: 'OrderedDict[str, List]' = OrderedDict()
+        self.builds = 0
+
+    def candidate_set(self, mood: str, goal: str = '') -> List[Candidate]:
+        version = content_catalog.current_version()
+        key = (normalize(mood), normalize(goal))
+        with self._lock:
+            if self._version != version:
+                self._sets = {}
+                self._version = version
+            cached = self._sets.get(key)
+        if cached is not None:
+            return cached
+
+        candidates = self._build(*key)
+        with self._lock:
+            if self._version == version:
+                self._sets[key] = candidates
+            self.builds += 1
+        return candidates
+
+    def _build(self, mood: str, goal: str) -> List[Candidate]:
+        mood_categories = [normalize(category) for category in MOOD_CATEGORIES.get(mood, DEFAULT_CATEGORIES)]
+        mood_tags = set(mood_categories + ([mood] if mood else []))
+        categories, tags = goal_terms(goal) if goal else ([], [])
+
+        items: Dict[str, Dict] = {}
+        for item in content_catalog.get_by_categories(mood_categories + categories):
+            items[item['content_id']] = item
+        for tag in sorted(mood_tags) + tags:
+            for item in content_catalog.get_by_tag(tag):
+                items[item['content_id']] = item
+
+        scored = []
+        for item in items.values():
+            category = normalize(item['category'])
+            item_tags = {normalize(tag) for tag in item['tags']}
+            if category in mood_categories:
+                mood_score = MOOD_WEIGHT
+            else:
+                mood_score = MOOD_TAG_WEIGHT if item_tags & mood_tags else 0.0
+            if category in categories:
+                goal_score = GOAL_WEIGHT
+            else:
+                goal_score = GOAL_TAG_WEIGHT if item_tags.intersection(tags) else 0.0
+            scored.append((item, mood_score, goal_score))
+
+        scored.sort(key=lambda candidate: (-(candidate[1] + candidate[2]), candidate[0]['content_id']))
+
+        # At most one request's worth per category, so a crowded category
+        # cannot push the others out of the set.
+        candidates, per_category = [], {}
+        for candidate in scored:
+            category = normalize(candidate[0]['category'])
+            if per_category.get(category, 0) < self.count:
+                per_category[category] = per_category.get(category, 0) + 1
+                candidates.append(candidate)
+                if len(candidates) >= self.candidates:
+                    break
+        return candidates
+
+    def recommend(self, mood: Optional[str] = None, goals: Optional[List[str]] = None,
+                  user_id: Optional[str] = None, count: Optional[int] = None) -> List[Dict]:
+        count = count or self.count
+        goals = sorted({normalize(goal) for goal in goals or [] if normalize(goal)})
+
+        # An item matching several goals collects a goal score from each.
+        merged: Dict[str, List] = {}
+        for goal in goals or ['']:
+            for item, mood_score, goal_score in self.candidate_set(mood, goal):
+                entry = merged.setdefault(item['content_id'], [item, mood_score, 0.0])
+                entry[2] += goal_score
+        if not merged:
+            merged = {item['content_id']: [item, mood_score, goal_score]
+                      for item, mood_score, goal_score in self.candidate_set('', '')}
+
+        exposure = self._exposure(user_id)
+        remaining = [(item, mood_score + goal_score - exposure.get(content_id, 0.0))
+                     for content_id, (item, mood_score, goal_score) in merged.items()]
+        picked: List[Dict] = []
+        categories: Dict[str, int] = {}
+        types: Dict[str, int] = {}
+        while remaining and len(picked) < count:
+            def adjusted(entry):
+                item, score = entry
+                return (-(score - CATEGORY_REPEAT_PENALTY * categories.get(normalize(item['category']), 0)
+                          - TYPE_REPEAT_PENALTY * types.get(normalize(item['type']), 0)),
+                        item['content_id'])
+            best = min(remaining, key=adjusted)
+            remaining.remove(best)
+            item = best[0]
+            picked.append(item)
+            categories[normalize(item['category'])] = categories.get(normalize(item['category']), 0) + 1
+            types[normalize(item['type'])] = types.get(normalize(item['type']), 0) + 1
+
+        if user_id:
+            self._record(user_id, [item['content_id'] for item in picked])
+        return picked
+
+    def _exposure(self, user_id: Optional[str]) -> Dict[str, float]:
+        # Items from the user's last request get the full penalty, fading to
+        # nothing over `history` requests.
+        if not user_id:
+            return {}
+        with self._lock:
+            state = self._served.get(user_id)
+            if state is None:
+                return {}
+            requests, served = state[0], dict(state[1])
+        return {content_id: EXPOSURE_PENALTY * (1 - (requests - served_at) / self.history)
+                for content_id, served_at in served.items()}
+
+    def _record(self, user_id: str, content_ids: List[str]) -> None:
+        with self._lock:
+            state = self._served.get(user_id)
+            if state is None:
+                state = self._served[user_id] = [0, {}]
+            else:
+                self._served.move_to_end(user_id)
+            state[0] += 1
+            served = state[1]
+            for content_id in content_ids:
+                served[content_id] = state[0]
+            for content_id in [content_id for content_id, served_at in served.items()
+                               if state[0] - served_at >= self.history]:
+                del served[content_id]
+            while len(self._served) > self.max_users:
+                self._served.popitem(last=False)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'candidate_sets': len(self._sets),
+                'builds': self.builds,
+                'tracked_users': len(self._served)
+            }
+
+
+recommendation_engine = RecommendationEngine()
+metrics.register_collector('recommendations', recommendation_engine.stats)
@@ -0,0 +1,263 @@
+import math
+import os
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+from models.journal_entry import JournalEntry
+from services.firebase_service import firebase_service
+from services.collection_versions import collection_versions
+from services.history_cache import history_cache
+from services.task_queue import task_queue
+from services import events
+from utils.pagination import encode_cursor, decode_cursor
+from utils.text import tokenize
+
+SEARCH_MAX_WORKERS = int(os.getenv('SEARCH_MAX_WORKERS', '8'))
+SEARCH_DEFAULT_PAGE_SIZE = 20
+SEARCH_MAX_PAGE_SIZE = 50
+MAX_QUERY_TERMS = 10
+SEARCH_INDEX_TASK = 'search_index'
+# Indexes built before each indexed entry had its own node are rebuilt.
+INDEX_FORMAT = 3
+
+# BM25 parameters.
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_executor = ThreadPoolExecutor(max_workers=SEARCH_MAX_WORKERS, thread_name_prefix='search')
+
+
+def entry_terms(data: Dict) -> Tuple[Counter, int]:
+    tokens = tokenize(f"{data.get('prompt') or ''} {data.get('content') or ''}")
+    return Counter(tokens), len(tokens)
+
+
+def posting_updates(user_id: str, journal_id: str, data: Dict, remove: bool = False) -> Tuple[Dict, int]:
+    # Multi-path update that adds (or removes) one entry's postings.
+    terms, length = entry_terms(data)
+    updates = {
+        f'search_index/{user_id}/postings/{term}/{journal_id}': None if remove else {'tf': tf, 'len': length}
+        for term, tf in terms.items()
+    }
+    return updates, length
+
+
+class IndexRebuildingError(RuntimeError):
+    pass
+
+
+def is_built(meta: Optional[Dict]) -> bool:
+    return meta is not None and meta.get('format') == INDEX_FORMAT
+
+
+def bm25(postings: Dict[str, Dict[str, Dict]], doc_count: int, average_length: float) -> Dict[str, float]:
+    scores: Dict[str, float] = {}
+    for term_postings in postings.values():
+        df = len(term_postings)
+        idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+        for journal_id, posting in term_postings.items():
+            tf = posting['tf']
+            norm = 1 - BM25_B + BM25_B * posting['len'] / (average_length or 1)
+            scores[journal_id] = scores.get(journal_id, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * norm)
+    return scores
+
+
+# Per-user inverted index over journal prompts and content, stored next to
+# the data it indexes:
+#   search_index/<user_id>/postings/<term>/<journal_id> = {tf, len}
+#   search_index/<user_id>/docs/<build>/<journal_id> = len
+#   search_index/<user_id>/meta = {format, build, doc_count, total_length}
+# A query reads the meta node and one posting list per term, and indexing an
+# entry touches its own nodes and the counts, so neither costs more as the
+# user's history grows. Indexed entries are listed under the build that
+# counted them, so a rebuild starts a fresh list.
+class SearchService:
+
+    @staticmethod
+    def search_journals(user_id: str, query: str, page_size: int = None, cursor: str = None) -> Dict:
+        try:
+            page_size = min(page_size or SEARCH_DEFAULT_PAGE_SIZE, SEARCH_MAX_PAGE_SIZE)
+            terms = list(dict.fromkeys(tokenize(query)))[:MAX_QUERY_TERMS]
+
+            meta = firebase_service.get(f'search_index/{user_id}/meta')
+            # A rebuild left unfinished by a crashed worker is started over.
+            if not is_built(meta):
+                meta = SearchService.rebuild_index(user_id)
+
+            if not terms or not meta.get('doc_count'):
+                return {'success': True, 'count': 0, 'results': [], 'next_cursor': None}
+
+            postings = dict(zip(terms, _executor.map(
+                lambda term: SearchService._load_postings(user_id, term), terms
+            )))
+            scores = bm25(
+                {term: term_postings for term, term_postings in postings.items() if term_postings},
+                meta['doc_count'],
+                meta['total_length'] / meta['doc_count']
+            )
+
+            ranked = sorted(((round(score, 6), journal_id) for journal_id, score in scores.items()),
+                            key=lambda item: (-item[0], item[1]))
+            if cursor:
+                after_score, after_id = decode_cursor(cursor)
+                after = (-float(after_score), after_id)
+                ranked = [item for item in ranked if (-item[0], item[1]) > after]
+
+            page = ranked[:page_size]
+            next_cursor = None
+            if len(ranked) > page_size:
+                last_score, last_id = page[-1]
+                next_cursor = encode_cursor(repr(last_score), last_id)
+
+            entries = _executor.map(lambda item: firebase_service.get(f'journals/{user_id}/{item[1]}'), page)
+            results = []
+            for (score, journal_id), journal_data in zip(page, entries):
+                if journal_data:
+                    results.append(dict(JournalEntry.row_to_dict(journal_id, journal_data), score=score))
+
+            return {
+                'success': True,
+                'count': len(results),
+                'results': results,
+                'next_cursor': next_cursor
+            }
+        except Exception as e:
+            return {
+                'success': False,
+                'message': f'Error searching journals: {str(e)}'
+            }
+
+    @staticmethod
+    def rebuild_index(user_id: str) -> Dict:
+        # Full pass for users whose journals predate the index. Afterwards
+        # every create and delete keeps it up to date. A marker goes in
+        # first, and index tasks that find it are retried once the rebuild
+        # is done, so entries written while the history is read are not lost.
+        path = f'search_index/{user_id}/meta'
+        token = firebase_service.new_key()
+        marker = firebase_service.transaction(path, lambda current: current if is_built(current) else {'building': token})
+        if is_built(marker):
+            return marker
+
+        updates = {}
+        docs = {}
+        for journal_id, data in (firebase_service.get(f'journals/{user_id}') or {}).items():
+            if not isinstance(data, dict):
+                continue
+            entry_updates, docs[journal_id] = posting_updates(user_id, journal_id, data)
+            updates.update(entry_updates)
+        # Replaces the lists of earlier builds.
+        updates[f'search_index/{user_id}/docs'] = {token: docs} if docs else None
+        firebase_service.update('/', collection_versions.stamp('search_index', user_id, updates))
+        history_cache.invalidate(user_id, 'search_index')
+
+        meta = {
+            'format': INDEX_FORMAT,
+            'build': token,
+            'doc_count': len(docs),
+            'total_length': sum(docs.values()),
+            'updated_at': datetime.utcnow().isoformat()
+        }
+        # Only completes its own marker: another rebuild may have finished or
+        # taken over, or a write may have called this one off.
+        result = firebase_service.transaction(
+            path,
+            lambda current: meta if current is not None and current.get('building') == token else current
+        )
+        return result if is_built(result) else meta
+
+    @staticmethod
+    def record_event(event: Dict) -> None:
+        # Indexing takes several round trips, so it runs on the task queue
+        # after the write has been answered.
+        if event['collection'] != 'journals' or not event['id']:
+            return
+        if event['op'] not in ('create', 'delete'):
+            return
+        payload = {'user_id': event['user_id'], 'journal_id': event['id'], 'op': event['op']}
+        if event['op'] == 'delete':
+            # The entry is gone by the time the task runs.
+            payload['data'] = event['data'] or {}
+        if task_queue.enabled:
+            task_queue.enqueue(SEARCH_INDEX_TASK, payload)
+            return
+        try:
+            SearchService.index_journal(payload)
+        except IndexRebuildingError:
+            # With no queue to retry on, the rebuild is called off and the
+            # next search starts over.
+            firebase_service.transaction(f"search_index/{payload['user_id']}/meta",
+                                         lambda current: current if is_built(current) else None)
+        SearchService.drop_cached_postings(payload, None)
+
+    @staticmethod
+    def index_journal(payload: Dict) -> None:
+        # Task handler, possibly run in another process. Each indexed entry
+        # has a node of its own, so running it twice changes nothing.
+        user_id, journal_id = payload['user_id'], payload['journal_id']
+        path = f'search_index/{user_id}/meta'
+        meta = firebase_service.get(path)
+        if meta is not None and 'building' in meta:
+            raise IndexRebuildingError(f'Search index of {user_id} is being rebuilt')
+        # An index that was never built is created from full history on first search.
+        if not is_built(meta):
+            return
+
+        remove = payload['op'] == 'delete'
+        data = payload.get('data') if remove else firebase_service.get(f'journals/{user_id}/{journal_id}')
+        # A create whose entry has since been deleted is left to the delete task.
+        if not data:
+            return
+        updates, length = posting_updates(user_id, journal_id, data, remove=remove)
+        firebase_service.update('/', collection_versions.stamp('search_index', user_id, updates))
+
+        build = meta['build']
+        doc_path = f'search_index/{user_id}/docs/{build}/{journal_id}'
+        change = {}
+
+        def mark(current):
+            # Already in the wanted state, e.g. when the task is run again.
+            if (current is not None) != remove:
+                return current
+            change['count'], change['length'] = (-1, -current) if remove else (1, length)
+            return None if remove else length
+
+        firebase_service.transaction(doc_path, mark)
+        if not change:
+            return
+
+        def count(current):
+            # Counts belong to the build the entry was listed under.
+            if not is_built(current) or current.get('build') != build:
+                return current
+            change['applied'] = True
+            current['doc_count'] = max(current.get('doc_count', 0) + change['count'], 0)
+            current['total_length'] = max(current.get('total_length', 0) + change['length'], 0)
+            current['updated_at'] = datetime.utcnow().isoformat()
+            return current
+
+        firebase_service.transaction(path, count)
+        if not change.get('applied'):
+            # A rebuild started in the meantime. Its list replaces this one,
+            # and the task is run again against it once it is done.
+            firebase_service.delete(doc_path)
+            raise IndexRebuildingError(f'Search index of {user_id} is being rebuilt')
+
+    @staticmethod
+    def drop_cached_postings(payload: Dict, result: Any) -> None:
+        # Runs in this process, so posting lists cached here are read again.
+        history_cache.invalidate(payload['user_id'], 'search_index')
+
+    @staticmethod
+    def _load_postings(user_id: str, term: str) -> Optional[Dict[str, Dict]]:
+        # Dropped once an index task for the user has run.
+        return history_cache.get_or_load(
+            user_id, 'search_index', ('search', term),
+            lambda: firebase_service.get(f'search_index/{user_id}/postings/{term}')
+        )
+
+search_service = SearchService()
+task_queue.register(SEARCH_INDEX_TASK, SearchService.index_journal, concurrency=2,
+                    on_result=SearchService.drop_cached_postings)
+events.subscribe(SearchService.record_event)
@@ -0,0 +1,140 @@
+import math
+import re
+from datetime import datetime
+from typing import Dict, List, Optional
+from services.collection_versions import collection_versions
+from services.firebase_service import firebase_service
+from services.task_queue import task_queue
+from services import events
+from utils.text import stem
+
+SENTIMENT_TASK = 'journal_sentiment'
+LEXICON_VERSION = 1
+
+# Word valences from -3 to 3, written in their unstemmed form and stemmed
+# below with the same stemmer as the entries, so "calmer", "calmly" and
+# "calm" score alike.
+_VALENCES = {
+    3: """amazing awesome blissful brilliant delighted ecstatic excellent fantastic
+          incredible joyful love loved lovely marvelous overjoyed thrilled wonderful""",
+    2: """accomplished beautiful blessed calm cheerful confident content energized
+          enjoy enjoyed excited fun glad good grateful great happy healthy hopeful
+          inspired laugh laughed motivated peaceful pleased proud refreshed
+          relaxed relieved rested safe strong thankful win""",
+    1: """better comfortable fine focused free interesting nice okay ready smile
+          smiled steady supported understood useful""",
+    -1: """bored busy confused distracted meh restless slow tense tired uneasy
+           unsure weird worn""",
+    -2: """afraid alone angry annoyed anxious ashamed bad cried cry disappointed
+           drained exhausted frustrated guilty hate hurt irritated jealous lonely
+           lost nervous overwhelmed pain sad scared sick stress stressed sore
+           struggle upset worried worry""",
+    -3: """awful depressed despair devastated furious hopeless horrible miserable
+           panic terrible terrified worthless""",
+}
+LEXICON = {stem(word): valence for valence, listed in _VALENCES.items() for word in listed.split()}
+
+NEGATIONS = frozenset('not no never nothing nobody none neither nor without cant cannot dont doesnt didnt '
+                      'isnt wasnt arent werent wont wouldnt couldnt shouldnt hardly barely'.split())
+INTENSIFIERS = {
+    **dict.fromkeys('very really so extremely incredibly super totally truly deeply absolutely'.split(), 1.5),
+    **dict.fromkeys('slightly somewhat bit kinda sorta little'.split(), 0.5)
+}
+# A valence within this many words of a negation is flipped and damped.
+NEGATION_WINDOW = 3
+NEGATION_FACTOR = -0.75
+# Squashes the summed valence into (-1, 1); larger values need more words
+# to approach the ends.
+NORMALIZATION_ALPHA = 15
+NEUTRAL_THRESHOLD = 0.05
+
+_WORD = re.compile(r'[a-z0-9]+')
+# A negation does not reach past the end of its clause.
+_CLAUSE = re.compile(r'[.,;:!?\n]+|\bbut\b')
+
+
+def clauses(text: str) -> List[List[str]]:
+    # Words of each clause. Unlike utils.text.tokenize, keeps stopwords:
+    # "not" and "so" matter here.
+    text = (text or '').lower().replace("'", '').replace('\u2019', '')
+    return [_WORD.findall(clause) for clause in _CLAUSE.split(text)]
+
+
+def score(text: str) -> Dict:
+    total = 0.0
+    positive = negative = 0
+    for tokens in clauses(text):
+        for i, token in enumerate(tokens):
+            valence = LEXICON.get(stem(token))
+            if valence is None:
+                continue
+            if i > 0 and tokens[i - 1] in INTENSIFIERS:
+                valence *= INTENSIFIERS[tokens[i - 1]]
+            if any(previous in NEGATIONS for previous in tokens[max(i - NEGATION_WINDOW, 0):i]):
+                valence *= NEGATION_FACTOR
+            total += valence
+            if valence > 0:
+                positive += 1
+            else:
+                negative += 1
+
+    compound = total / math.sqrt(total * total + NORMALIZATION_ALPHA)
+    if compound >= NEUTRAL_THRESHOLD:
+        label = 'positive'
+    elif compound <= -NEUTRAL_THRESHOLD:
+        label = 'negative'
+    else:
+        label = 'neutral'
+    return {
+        'score': round(compound, 3),
+        'label': label,
+        'positive': positive,
+        'negative': negative,
+        'lexicon_version': LEXICON_VERSION
+    }
+
+
+# Scores the text of each journal entry against a small built-in lexicon after it has
+# been stored, and writes the result back to the entry as `sentiment`. The
+# request that created the entry does not wait for it; readers see the
+# field once the task has run.
+class SentimentService:
+
+    @staticmethod
+    def score_journal(payload: Dict) -> Optional[Dict]:
+        # Task handler, possibly run in another process. Returns the updated
+        # entry, or None if it no longer exists.
+        user_id, journal_id = payload['user_id'], payload['journal_id']
+        path = f'journals/{user_id}/{journal_id}'
+        result = {}
+
+        def update(current):
+            # An entry deleted in the meantime is left deleted.
+            if current is None:
+                return None
+            result['sentiment'] = score(current.get('content') or '')
+            result['sentiment']['scored_at'] = datetime.utcnow().isoformat()
+            return {**current, 'sentiment': result['sentiment']}
+
+        updated = firebase_service.transaction(path, update)
+        if 'sentiment' not in result:
+            return None
+        collection_versions.bump('journals', user_id)
+        return updated
+
+    @staticmethod
+    def publish_update(payload: Dict, updated: Optional[Dict]) -> None:
+        # Runs in this process, so caches and streams here see the change.
+        if updated is not None:
+            events.publish('journals', payload['user_id'], 'update', payload['journal_id'], updated)
+
+    @staticmethod
+    def record_event(event: Dict) -> None:
+        if event['collection'] == 'journals' and event['op'] == 'create' and event['id']:
+            task_queue.enqueue(SENTIMENT_TASK, {'user_id': event['user_id'], 'journal_id': event['id']})
+
+
+sentiment_service = SentimentService()
+task_queue.register(SENTIMENT_TASK, SentimentService.score_journal, concurrency=2,
+                    on_result=SentimentService.publish_update)
+events.subscribe(SentimentService.record_event)
@@ -0,0 +1,120 @@
+import asyncio
+import os
+import time
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Dict, List, Tuple
+from services.metrics import metrics
+
+STARTUP_WARM_UP = os.getenv('STARTUP_WARM_UP', 'false').lower() == 'true'
+
+# Read on warm-up to open a storage connection. The node does not need to
+# exist; an empty answer is just as good.
+WARM_UP_PATH = '_warmup'
+
+
+# Wall-clock time spent in each startup phase of this worker: importing the
+# app, building it and, when enabled, warming up. It is printed once the app
+# is ready and exported as `startup_*` gauges, so slow cold starts during
+# scale-out show up next to the request metrics.
+class StartupReport:
+
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+        self.errors: Dict[str, str] = {}
+        self._active = set()
+
+    @contextmanager
+    def phase(self, name: str):
+        # A phase nested in one of the same name, such as the Flask app's
+        # imports inside the ASGI app's, is only counted once.
+        if name in self._active:
+            yield
+            return
+        self._active.add(name)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._active.discard(name)
+            self.record(name, time.perf_counter() - started)
+
+    def record(self, name: str, seconds: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def run_step(self, name: str, step: Callable[[], object]) -> bool:
+        # A failed warm-up step is reported but never stops the worker: the
+        # same work is retried on first use.
+        with self.phase(name):
+            try:
+                step()
+                return True
+            except Exception as e:
+                self.errors[name] = str(e)
+                print(f"⚠️ Warm-up step '{name}' failed: {str(e)}")
+                return False
+
+    async def run_step_async(self, name: str, step: Callable[[], Awaitable[object]]) -> bool:
+        with self.phase(name):
+            try:
+                await step()
+                return True
+            except Exception as e:
+                self.errors[name] = str(e)
+                print(f"⚠️ Warm-up step '{name}' failed: {str(e)}")
+                return False
+
+    def summary(self) -> str:
+        total = sum(self.phases.values())
+        parts = ', '.join(f'{name} {seconds * 1000:.0f} ms' for name, seconds in self.phases.items())
+        failed = f" ({len(self.errors)} warm-up step(s) failed)" if self.errors else ''
+        return f"🚀 Ready in {total * 1000:.0f} ms: {parts}{failed}"
+
+    def stats(self) -> Dict:
+        return {
+            **{f'{name}_seconds': round(seconds, 4) for name, seconds in self.phases.items()},
+            'total_seconds': round(sum(self.phases.values()), 4),
+            'warm_up_errors': len(self.errors)
+        }
+
+
+startup_report = StartupReport()
+metrics.register_collector('startup', startup_report.stats)
+
+
+def warm_up_steps() -> List[Tuple[str, Callable[[], object]]]:
+    from services.content_catalog import content_catalog
+    from services.firebase_service import firebase_service
+    from services.generation_service import GenerationService
+
+    # (name, step, needs storage)
+    return [
+        ('storage', lambda: firebase_service.backend, True),
+        ('connections', lambda: firebase_service.get(WARM_UP_PATH), True),
+        ('content_catalog', content_catalog.refresh, True),
+        ('generation_client', GenerationService.get_client, False)
+    ]
+
+
+def warm_up() -> bool:
+    # Does the work the first requests would otherwise pay for: starting the
+    # storage backend, opening a connection, loading the content catalog and
+    # creating the model client. Once a storage step fails the rest of them
+    # are skipped.
+    ok = storage_ok = True
+    for name, step, needs_storage in warm_up_steps():
+        if needs_storage and not storage_ok:
+            continue
+        if not startup_report.run_step(name, step):
+            ok = False
+            storage_ok = storage_ok and not needs_storage
+    return ok
+
+
+async def warm_up_async() -> bool:
+    # The ASGI app also opens its async storage client, which has to be
+    # created on the serving event loop.
+    from services.aio.firebase_service import firebase_service
+
+    if not await asyncio.to_thread(warm_up):
+        return False
+    return await startup_report.run_step_async('async_connections', lambda: firebase_service.get(WARM_UP_PATH))
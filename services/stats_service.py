@@ -0,0 +1,255 @@
+import copy
+import re
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional
+from services.firebase_service import firebase_service
+from services import events
+
+ENERGY_LEVELS = {'Low': 1, 'Medium': 2, 'High': 3}
+ENERGY_TREND_DAYS = 7
+TRACKED_COLLECTIONS = ('journals', 'moods', 'user_activities')
+
+# Characters Realtime Database does not allow in keys.
+_INVALID_KEY_CHARS = re.compile(r'[.$#\[\]/]')
+
+
+def safe_key(value: Any) -> str:
+    return _INVALID_KEY_CHARS.sub('_', str(value or '').strip()) or 'Unknown'
+
+
+def entry_day(data: Dict) -> Optional[str]:
+    for field in ('date', 'created_at', 'timestamp'):
+        value = str(data.get(field) or '')[:10]
+        try:
+            datetime.strptime(value, '%Y-%m-%d')
+            return value
+        except ValueError:
+            continue
+    return None
+
+
+def _increment(counter: Dict, key: str, amount: float) -> None:
+    value = counter.get(key, 0) + amount
+    if value > 0:
+        counter[key] = value
+    else:
+        counter.pop(key, None)
+
+
+def _minutes(value: Any) -> int:
+    try:
+        return max(int(float(value)), 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def apply_entry(stats: Dict, collection: str, data: Dict, sign: int) -> Dict:
+    # Adds (sign=1) or removes (sign=-1) one entry's contribution.
+    day = entry_day(data)
+
+    if collection == 'journals':
+        stats['journal_count'] = max(stats.get('journal_count', 0) + sign, 0)
+        if day:
+            _increment(stats.setdefault('journal_days', {}), day, sign)
+
+    elif collection == 'moods':
+        stats['mood_count'] = max(stats.get('mood_count', 0) + sign, 0)
+        _increment(stats.setdefault('mood_counts', {}), safe_key(data.get('mood')), sign)
+        level = ENERGY_LEVELS.get(data.get('energy'))
+        if level and day:
+            energy_day = stats.setdefault('energy_days', {}).setdefault(day, {'total': 0, 'count': 0})
+            energy_day['total'] += sign * level
+            energy_day['count'] += sign
+            if energy_day['count'] <= 0:
+                del stats['energy_days'][day]
+
+    elif collection == 'user_activities':
+        stats['activity_count'] = max(stats.get('activity_count', 0) + sign, 0)
+        activity_type = safe_key(data.get('type') or data.get('activity_name'))
+        _increment(stats.setdefault('activity_minutes', {}), activity_type, sign * _minutes(data.get('duration')))
+
+    stats['updated_at'] = datetime.utcnow().isoformat()
+    return stats
+
+
+def streaks(days: List[str], today: date) -> Dict:
+    ordinals = sorted({date.fromisoformat(day).toordinal() for day in days})
+
+    longest = run = 0
+    previous = None
+    for ordinal in ordinals:
+        run = run + 1 if previous is not None and ordinal == previous + 1 else 1
+        longest = max(longest, run)
+        previous = ordinal
+
+    # A streak is still current if the last entry was today or yesterday.
+    current = run if ordinals and ordinals[-1] >= today.toordinal() - 1 else 0
+    return {
+        'current_streak': current,
+        'longest_streak': longest
+    }
+
+
+def energy_trend(energy_days: Dict, today: date) -> Dict:
+    window = ENERGY_TREND_DAYS * 2
+    trend = []
+    recent, previous = [0, 0], [0, 0]
+    for offset in range(window - 1, -1, -1):
+        day = (today - timedelta(days=offset)).isoformat()
+        bucket = energy_days.get(day)
+        if not bucket or bucket['count'] <= 0:
+            continue
+        trend.append({'date': day, 'average': round(bucket['total'] / bucket['count'], 2)})
+        totals = recent if offset < ENERGY_TREND_DAYS else previous
+        totals[0] += bucket['total']
+        totals[1] += bucket['count']
+
+    recent_average = round(recent[0] / recent[1], 2) if recent[1] else None
+    previous_average = round(previous[0] / previous[1], 2) if previous[1] else None
+
+    direction = None
+    if recent_average is not None and previous_average is not None:
+        if recent_average - previous_average > 0.1:
+            direction = 'up'
+        elif previous_average - recent_average > 0.1:
+            direction = 'down'
+        else:
+            direction = 'flat'
+
+    return {
+        'trend': trend,
+        'recent_average': recent_average,
+        'previous_average': previous_average,
+        'direction': direction
+    }
+
+
+class StatsService:
+
+    @staticmethod
+    def get_user_stats(user_id: str) -> Dict:
+        try:
+            stats = firebase_service.get(f'user_stats/{user_id}')
+            # A rebuild left unfinished by a crashed worker is started over.
+            if stats is None or 'building' in stats:
+                stats = StatsService.rebuild_user_stats(user_id)
+
+            return {
+                'success': True,
+                'stats': StatsService._summarize(stats or {})
+            }
+        except Exception as e:
+            return {
+                'success': False,
+                'message': f'Error getting stats: {str(e)}'
+            }
+
+    @staticmethod
+    def rebuild_user_stats(user_id: str) -> Dict:
+        # One full pass over the user's history, only for users whose stats
+        # predate incremental tracking. Afterwards every write updates them.
+        # A marker goes in first: writes whose events arrive while the
+        # history is read are kept as pending changes, and applied at the end
+        # unless the history already had them.
+        path = f'user_stats/{user_id}'
+        firebase_service.transaction(
+            path,
+            lambda current: current if current is not None else {'building': datetime.utcnow().isoformat()}
+        )
+
+        history = {}
+        stats = {}
+        for collection in TRACKED_COLLECTIONS:
+            records = firebase_service.get(f'{collection}/{user_id}') or {}
+            history[collection] = {key: data for key, data in records.items() if isinstance(data, dict)}
+            for data in history[collection].values():
+                apply_entry(stats, collection, data, 1)
+        stats['updated_at'] = datetime.utcnow().isoformat()
+
+        def finish(current):
+            # Another rebuild may have finished first.
+            if current is not None and 'building' not in current:
+                return current
+            result = copy.deepcopy(stats)
+            present = {collection: set(records) for collection, records in history.items()}
+            # Creates first, so a record added and removed during the rebuild
+            # cancels out.
+            pending = ((current or {}).get('pending') or {}).values()
+            for change in sorted(pending, key=lambda change: change['op'] != 'create'):
+                ids = present[change['collection']]
+                if change['op'] == 'create' and change['id'] not in ids:
+                    ids.add(change['id'])
+                    apply_entry(result, change['collection'], change['data'], 1)
+                elif change['op'] == 'delete' and change['id'] in ids:
+                    ids.discard(change['id'])
+                    apply_entry(result, change['collection'], change['data'], -1)
+            return result
+
+        return firebase_service.transaction(path, finish)
+
+    @staticmethod
+    def record_events(batch: List[Dict]) -> None:
+        # All of a write's changes for one user go into one transaction, so
+        # a batch of 500 entries costs one round trip instead of 500. This
+        # runs right after the write, rather than on the task queue, so a
+        # rebuild in progress always sees the change as pending.
+        changes = {}
+        for event in batch:
+            if event['collection'] not in TRACKED_COLLECTIONS or not event['data']:
+                continue
+            if event['op'] not in ('create', 'delete') or not event['id']:
+                continue
+            changes.setdefault(event['user_id'], []).append(event)
+
+        for user_id, user_changes in changes.items():
+            def update(current, user_changes=user_changes):
+                # Stats that were never built are created from full history on first read.
+                if current is None:
+                    return None
+                if 'building' in current:
+                    pending = current.setdefault('pending', {})
+                    for event in user_changes:
+                        pending[safe_key(f"{event['collection']}_{event['id']}_{event['op']}")] = {
+                            'collection': event['collection'],
+                            'id': event['id'],
+                            'op': event['op'],
+                            'data': event['data']
+                        }
+                    return current
+                for event in user_changes:
+                    apply_entry(current, event['collection'], event['data'], 1 if event['op'] == 'create' else -1)
+                return current
+
+            firebase_service.transaction(f'user_stats/{user_id}', update)
+
+    @staticmethod
+    def _summarize(stats: Dict) -> Dict:
+        today = date.today()
+        journal_days = stats.get('journal_days', {})
+        mood_counts = stats.get('mood_counts', {})
+        activity_minutes = stats.get('activity_minutes', {})
+
+        return {
+            'journal': {
+                'total_entries': stats.get('journal_count', 0),
+                'days_journaled': len(journal_days),
+                'last_entry_date': max(journal_days) if journal_days else None,
+                **streaks(list(journal_days), today)
+            },
+            'mood': {
+                'total_entries': stats.get('mood_count', 0),
+                'distribution': mood_counts,
+                'most_common': max(mood_counts, key=mood_counts.get) if mood_counts else None
+            },
+            'energy': energy_trend(stats.get('energy_days', {}), today),
+            'activity': {
+                'total_entries': stats.get('activity_count', 0),
+                'total_minutes': sum(activity_minutes.values()),
+                'minutes_by_type': activity_minutes
+            },
+            'updated_at': stats.get('updated_at')
+        }
+
+stats_service = StatsService()
+
+events.subscribe_batch(StatsService.record_events)
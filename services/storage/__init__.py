@@ -0,0 +1,21 @@
+import os
+from services.storage.base import StorageBackend
+
+STORAGE_BACKENDS = ('firebase', 'sqlite', 'memory')
+
+
+def create_backend(name: str = None) -> StorageBackend:
+    name = (name or os.getenv('STORAGE_BACKEND', 'firebase')).lower()
+
+    # Imported on demand so a local backend does not need firebase_admin.
+    if name == 'firebase':
+        from services.storage.firebase_backend import FirebaseBackend
+        return FirebaseBackend()
+    if name == 'sqlite':
+        from services.storage.sqlite_backend import SQLiteBackend
+        return SQLiteBackend()
+    if name == 'memory':
+        from services.storage.memory_backend import MemoryBackend
+        return MemoryBackend()
+
+    raise ValueError(f"Unknown storage backend '{name}', expected one of {', '.join(STORAGE_BACKENDS)}")
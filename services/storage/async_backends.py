@@ -0,0 +1,194 @@
+import asyncio
+import calendar
+import json
+import os
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from services.storage.base import StorageBackend
+from services.storage.tree import child_field
+from services.storage.transport import STORAGE_CONNECT_TIMEOUT
+
+ASYNC_STORAGE_MAX_CONNECTIONS = int(os.getenv('ASYNC_STORAGE_MAX_CONNECTIONS', '100'))
+ASYNC_STORAGE_TIMEOUT = float(os.getenv('ASYNC_STORAGE_TIMEOUT', '10'))
+TRANSACTION_MAX_RETRIES = 25
+
+
+class AsyncStorageBackend(ABC):
+    # Awaitable counterpart of StorageBackend, used by services.aio.
+
+    name = 'base'
+
+    @abstractmethod
+    async def create(self, path: str, data: Dict[str, Any]) -> str:
+        pass
+
+    @abstractmethod
+    async def set(self, path: str, data: Any) -> None:
+        pass
+
+    @abstractmethod
+    async def get(self, path: str) -> Optional[Any]:
+        pass
+
+    @abstractmethod
+    async def update(self, path: str, data: Dict[str, Any]) -> None:
+        pass
+
+    @abstractmethod
+    async def delete(self, path: str) -> None:
+        pass
+
+    @abstractmethod
+    async def query(self, path: str, order_by: str, start_at: Optional[str] = None,
+                    end_at: Optional[str] = None, limit_to_last: Optional[int] = None) -> List[Tuple[str, Dict]]:
+        pass
+
+    @abstractmethod
+    async def transaction(self, path: str, update_fn: Callable[[Any], Any]) -> Any:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+
+class ThreadedAsyncBackend(AsyncStorageBackend):
+    # Runs a synchronous backend on the default executor. Used for local
+    # backends such as SQLite, where calls are short and never wait on a network.
+
+    def __init__(self, backend: StorageBackend):
+        self.backend = backend
+        self.name = backend.name
+
+    async def create(self, path: str, data: Dict[str, Any]) -> str:
+        return await asyncio.to_thread(self.backend.create, path, data)
+
+    async def set(self, path: str, data: Any) -> None:
+        await asyncio.to_thread(self.backend.set, path, data)
+
+    async def get(self, path: str) -> Optional[Any]:
+        return await asyncio.to_thread(self.backend.get, path)
+
+    async def update(self, path: str, data: Dict[str, Any]) -> None:
+        await asyncio.to_thread(self.backend.update, path, data)
+
+    async def delete(self, path: str) -> None:
+        await asyncio.to_thread(self.backend.delete, path)
+
+    async def query(self, path: str, order_by: str, start_at: Optional[str] = None,
+                    end_at: Optional[str] = None, limit_to_last: Optional[int] = None) -> List[Tuple[str, Dict]]:
+        return await asyncio.to_thread(self.backend.query, path, order_by, start_at, end_at, limit_to_last)
+
+    async def transaction(self, path: str, update_fn: Callable[[Any], Any]) -> Any:
+        return await asyncio.to_thread(self.backend.transaction, path, update_fn)
+
+
+class AsyncFirebaseBackend(AsyncStorageBackend):
+    # Realtime Database over its REST API on a shared, pooled httpx client,
+    # authenticated with the same service account as the Admin SDK.
+
+    name = 'firebase'
+
+    def __init__(self, cred_path: str = None, database_url: str = None,
+                 max_connections: int = ASYNC_STORAGE_MAX_CONNECTIONS, timeout: float = ASYNC_STORAGE_TIMEOUT):
+        import httpx
+        from firebase_admin import credentials
+        from services.storage.firebase_backend import DEFAULT_CREDENTIALS_PATH, DEFAULT_DATABASE_URL
+
+        cred_path = cred_path or os.getenv('FIREBASE_CREDENTIALS', DEFAULT_CREDENTIALS_PATH)
+        if not os.path.exists(cred_path):
+            raise FileNotFoundError(f"Service account key not found at {cred_path}")
+
+        self.credential = credentials.Certificate(cred_path)
+        self.database_url = (database_url or os.getenv('FIREBASE_DATABASE_URL', DEFAULT_DATABASE_URL)).rstrip('/')
+        self._client = httpx.AsyncClient(
+            timeout=httpx.Timeout(timeout, connect=STORAGE_CONNECT_TIMEOUT),
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        )
+        self._token = None
+        self._token_expiry = 0.0
+        self._token_lock = asyncio.Lock()
+
+    async def _auth_headers(self) -> Dict[str, str]:
+        if self._token is None or time.time() > self._token_expiry - 60:
+            async with self._token_lock:
+                if self._token is None or time.time() > self._token_expiry - 60:
+                    # Token refresh is a blocking HTTP call inside google-auth.
+                    token = await asyncio.to_thread(self.credential.get_access_token)
+                    self._token = token.access_token
+                    self._token_expiry = (calendar.timegm(token.expiry.utctimetuple())
+                                          if token.expiry else time.time() + 3000)
+        return {'Authorization': f'Bearer {self._token}'}
+
+    def _url(self, path: str) -> str:
+        return f"{self.database_url}/{path.strip('/')}.json"
+
+    async def _request(self, method: str, path: str, params: Dict = None, data: Any = None,
+                       headers: Dict = None, expected: Tuple[int, ...] = ()):
+        request_headers = await self._auth_headers()
+        request_headers.update(headers or {})
+        response = await self._client.request(
+            method, self._url(path),
+            params=params,
+            content=json.dumps(data) if method in ('POST', 'PUT', 'PATCH') else None,
+            headers=request_headers
+        )
+        if response.status_code not in expected:
+            response.raise_for_status()
+        return response
+
+    async def create(self, path: str, data: Dict[str, Any]) -> str:
+        response = await self._request('POST', path, data=data)
+        return response.json()['name']
+
+    async def set(self, path: str, data: Any) -> None:
+        await self._request('PUT', path, params={'print': 'silent'}, data=data)
+
+    async def get(self, path: str) -> Optional[Any]:
+        response = await self._request('GET', path)
+        return response.json()
+
+    async def update(self, path: str, data: Dict[str, Any]) -> None:
+        await self._request('PATCH', path, params={'print': 'silent'}, data=data)
+
+    async def delete(self, path: str) -> None:
+        await self._request('DELETE', path, params={'print': 'silent'})
+
+    async def query(self, path: str, order_by: str, start_at: Optional[str] = None,
+                    end_at: Optional[str] = None, limit_to_last: Optional[int] = None) -> List[Tuple[str, Dict]]:
+        params = {'orderBy': json.dumps(order_by)}
+        if start_at is not None:
+            params['startAt'] = json.dumps(start_at)
+        if end_at is not None:
+            params['endAt'] = json.dumps(end_at)
+        if limit_to_last:
+            params['limitToLast'] = limit_to_last
+
+        response = await self._request('GET', path, params=params)
+        data = response.json() or {}
+        # The REST API filters on the server but returns an unordered object.
+        return sorted(data.items(), key=lambda item: (str(child_field(item[0], item[1], order_by) or ''), item[0]))
+
+    async def transaction(self, path: str, update_fn: Callable[[Any], Any]) -> Any:
+        for _ in range(TRANSACTION_MAX_RETRIES):
+            current = await self._request('GET', path, headers={'X-Firebase-ETag': 'true'})
+            new_value = update_fn(current.json())
+            response = await self._request(
+                'PUT', path,
+                params={'print': 'silent'},
+                data=new_value,
+                headers={'if-match': current.headers['ETag']},
+                expected=(412,)
+            )
+            if response.status_code != 412:
+                return new_value
+        raise RuntimeError(f'Transaction at {path} aborted after {TRANSACTION_MAX_RETRIES} retries')
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+def create_async_backend(sync_backend: StorageBackend) -> AsyncStorageBackend:
+    if sync_backend.name == 'firebase':
+        return AsyncFirebaseBackend()
+    return ThreadedAsyncBackend(sync_backend)
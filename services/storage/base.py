@@ -0,0 +1,41 @@
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class StorageBackend(ABC):
+    # Path-addressed JSON tree with Firebase Realtime Database semantics:
+    # "moods/<user_id>/<entry_id>" style paths, push keys, multi-path updates.
+
+    name = 'base'
+
+    @abstractmethod
+    def create(self, path: str, data: Dict[str, Any]) -> str:
+        pass
+
+    @abstractmethod
+    def set(self, path: str, data: Any) -> None:
+        pass
+
+    @abstractmethod
+    def get(self, path: str) -> Optional[Any]:
+        pass
+
+    @abstractmethod
+    def update(self, path: str, data: Dict[str, Any]) -> None:
+        pass
+
+    @abstractmethod
+    def delete(self, path: str) -> None:
+        pass
+
+    @abstractmethod
+    def query(self, path: str, order_by: str, start_at: Optional[str] = None,
+              end_at: Optional[str] = None, limit_to_last: Optional[int] = None) -> List[Tuple[str, Dict]]:
+        pass
+
+    @abstractmethod
+    def transaction(self, path: str, update_fn: Callable[[Any], Any]) -> Any:
+        pass
+
+    def listen(self, path: str, callback: Callable[[Any], None]):
+        raise NotImplementedError(f'{self.name} storage does not support listeners')
@@ -0,0 +1,82 @@
+import firebase_admin
+from firebase_admin import credentials, db
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import os
+from services.storage.base import StorageBackend
+from services.storage.tree import ORDER_BY_KEY
+from services.storage.transport import STORAGE_POOL_SIZE, STORAGE_CONNECT_TIMEOUT, STORAGE_READ_TIMEOUT
+
+DEFAULT_CREDENTIALS_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'serviceAccountKey.json')
+DEFAULT_DATABASE_URL = 'https://upliftai-44452-default-rtdb.firebaseio.com/'
+
+
+class FirebaseBackend(StorageBackend):
+    name = 'firebase'
+
+    def __init__(self, cred_path: str = None, database_url: str = None):
+        self.cred_path = cred_path or os.getenv('FIREBASE_CREDENTIALS', DEFAULT_CREDENTIALS_PATH)
+        self.database_url = database_url or os.getenv('FIREBASE_DATABASE_URL', DEFAULT_DATABASE_URL)
+        self.initialize_firebase()
+
+    def initialize_firebase(self):
+        if not os.path.exists(self.cred_path):
+            raise FileNotFoundError(f"Service account key not found at {self.cred_path}")
+
+        cred = credentials.Certificate(self.cred_path)
+
+        firebase_admin.initialize_app(cred, {
+            'databaseURL': self.database_url,
+            'httpTimeout': (STORAGE_CONNECT_TIMEOUT, STORAGE_READ_TIMEOUT)
+        })
+        self.configure_transport()
+
+    def configure_transport(self):
+        # The SDK mounts a 10-connection adapter that retries every method,
+        # pushes included, up to four times with backoff. Replace it with a
+        # pool sized for this worker's threads and leave retries to the
+        # transport policy in FirebaseService, which only retries reads.
+        from requests.adapters import HTTPAdapter
+
+        session = getattr(getattr(db.reference('/'), '_client', None), 'session', None)
+        if session is None:
+            print("⚠️ Could not configure the Realtime Database connection pool")
+            return
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=STORAGE_POOL_SIZE, max_retries=0)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+
+    def create(self, path: str, data: Dict[str, Any]) -> str:
+        new_ref = db.reference(path).push(data)
+        return new_ref.key
+
+    def set(self, path: str, data: Any) -> None:
+        db.reference(path).set(data)
+
+    def get(self, path: str) -> Optional[Any]:
+        return db.reference(path).get()
+
+    def update(self, path: str, data: Dict[str, Any]) -> None:
+        db.reference(path).update(data)
+
+    def delete(self, path: str) -> None:
+        db.reference(path).delete()
+
+    def query(self, path: str, order_by: str, start_at: Optional[str] = None,
+              end_at: Optional[str] = None, limit_to_last: Optional[int] = None) -> List[Tuple[str, Dict]]:
+        reference = db.reference(path)
+        query = reference.order_by_key() if order_by == ORDER_BY_KEY else reference.order_by_child(order_by)
+        if start_at is not None:
+            query = query.start_at(start_at)
+        if end_at is not None:
+            query = query.end_at(end_at)
+        if limit_to_last:
+            query = query.limit_to_last(limit_to_last)
+
+        data = query.get()
+        return list(data.items()) if data else []
+
+    def transaction(self, path: str, update_fn: Callable[[Any], Any]) -> Any:
+        return db.reference(path).transaction(update_fn)
+
+    def listen(self, path: str, callback: Callable[[Any], None]):
+        return db.reference(path).listen(callback)
@@ -0,0 +1,147 @@
+import copy
+import os
+import random
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from services.storage.base import StorageBackend
+from services.storage.push_id import generate_push_id
+from services.storage.tree import split_path, prune, assign, sort_rank, child_field
+
+# Sorts after any real key, for inclusive upper bounds in the ordered indexes.
+_MAX_KEY = '\U0010ffff'
+
+
+class MemoryBackend(StorageBackend):
+    # In-process tree for load tests and benchmarks. Every call sleeps for
+    # `latency_ms` plus up to `jitter_ms` to stand in for the network round
+    # trip, and ordered queries use sorted indexes the way Realtime Database
+    # uses `.indexOn`, built on first query and kept up to date by writes, so
+    # query cost does not grow with history size.
+
+    name = 'memory'
+
+    def __init__(self, latency_ms: float = None, jitter_ms: float = None):
+        self.latency_ms = float(os.getenv('MEMORY_STORAGE_LATENCY_MS', '0')) if latency_ms is None else latency_ms
+        self.jitter_ms = float(os.getenv('MEMORY_STORAGE_JITTER_MS', '0')) if jitter_ms is None else jitter_ms
+        self._lock = threading.RLock()
+        self._root: Dict[str, Any] = {}
+        self._indexes: Dict[Tuple[str, str], List[Tuple[Tuple, str]]] = {}
+
+    def _delay(self) -> None:
+        delay = self.latency_ms + random.uniform(0, self.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+    def _read(self, parts: List[str]) -> Any:
+        node = self._root
+        for part in parts:
+            if not isinstance(node, dict) or part not in node:
+                return None
+            node = node[part]
+        return node
+
+    def _write(self, parts: List[str], value: Any) -> None:
+        value = prune(copy.deepcopy(value))
+        if not parts:
+            self._root = value if isinstance(value, dict) else {}
+            self._indexes.clear()
+            return
+
+        # Writing below an indexed node moves one child within its indexes;
+        # writing the node itself or above it drops them.
+        path = '/'.join(parts)
+        moved = []
+        for index_key in list(self._indexes):
+            indexed = split_path(index_key[0])
+            if len(parts) > len(indexed) and parts[:len(indexed)] == indexed:
+                key = parts[len(indexed)]
+                moved.append((index_key, key, self._index_entry(index_key, key)))
+            elif index_key[0] == path or index_key[0].startswith(path + '/'):
+                del self._indexes[index_key]
+
+        self._root = assign(self._root, parts, value) or {}
+        for index_key, key, old_entry in moved:
+            ordered = self._indexes[index_key]
+            if old_entry is not None:
+                del ordered[bisect_left(ordered, old_entry)]
+            new_entry = self._index_entry(index_key, key)
+            if new_entry is not None:
+                insort(ordered, new_entry)
+
+    def _index_entry(self, index_key: Tuple[str, str], key: str) -> Optional[Tuple[Tuple, str]]:
+        child = self._read(split_path(index_key[0]) + [key])
+        if child is None:
+            return None
+        return sort_rank(child_field(key, child, index_key[1])), key
+
+    def create(self, path: str, data: Dict[str, Any]) -> str:
+        self._delay()
+        key = generate_push_id()
+        with self._lock:
+            self._write(split_path(path) + [key], data)
+        return key
+
+    def set(self, path: str, data: Any) -> None:
+        self._delay()
+        with self._lock:
+            self._write(split_path(path), data)
+
+    def get(self, path: str) -> Optional[Any]:
+        self._delay()
+        with self._lock:
+            return copy.deepcopy(self._read(split_path(path)))
+
+    def update(self, path: str, data: Dict[str, Any]) -> None:
+        self._delay()
+        parts = split_path(path)
+        with self._lock:
+            for key, value in data.items():
+                self._write(parts + split_path(key), value)
+
+    def delete(self, path: str) -> None:
+        self._delay()
+        with self._lock:
+            self._write(split_path(path), None)
+
+    def transaction(self, path: str, update_fn: Callable[[Any], Any]) -> Any:
+        self._delay()
+        parts = split_path(path)
+        with self._lock:
+            value = update_fn(copy.deepcopy(self._read(parts)))
+            self._write(parts, value)
+        return value
+
+    def query(self, path: str, order_by: str, start_at: Optional[str] = None,
+              end_at: Optional[str] = None, limit_to_last: Optional[int] = None) -> List[Tuple[str, Dict]]:
+        self._delay()
+        parts = split_path(path)
+        with self._lock:
+            children = self._read(parts)
+            if not isinstance(children, dict):
+                return []
+
+            ordered = self._ordered(('/'.join(parts), order_by), children)
+            low, high = 0, len(ordered)
+            if start_at is not None or end_at is not None:
+                # Like Realtime Database, a range never matches missing fields.
+                low = bisect_left(ordered, (sort_rank(start_at) if start_at is not None else (1,),))
+            if end_at is not None:
+                high = bisect_right(ordered, (sort_rank(end_at), _MAX_KEY))
+
+            selected = ordered[low:high]
+            if limit_to_last:
+                selected = selected[-limit_to_last:]
+            return [(key, copy.deepcopy(children[key])) for _, key in selected]
+
+    def _ordered(self, index_key: Tuple[str, str], children: Dict) -> List[Tuple[Tuple, str]]:
+        ordered = self._indexes.get(index_key)
+        if ordered is None:
+            order_by = index_key[1]
+            ordered = sorted(
+                (sort_rank(child_field(key, value, order_by)), key)
+                for key, value in children.items()
+            )
+            self._indexes[index_key] = ordered
+        return ordered
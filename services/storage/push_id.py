@@ -0,0 +1,40 @@
+import random
+import threading
+import time
+
+# Same alphabet and layout as Firebase push keys: 8 characters of millisecond
+# timestamp followed by 12 random characters, so keys sort chronologically.
+PUSH_CHARS = '-0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ_abcdefghijklmnopqrstuvwxyz'
+
+_lock = threading.Lock()
+_random = random.SystemRandom()
+_last_push_time = 0
+_last_rand_chars = [0] * 12
+
+
+def generate_push_id() -> str:
+    global _last_push_time, _last_rand_chars
+
+    with _lock:
+        now = int(time.time() * 1000)
+        duplicate_time = now == _last_push_time
+        _last_push_time = now
+
+        timestamp_chars = []
+        for _ in range(8):
+            timestamp_chars.append(PUSH_CHARS[now % 64])
+            now //= 64
+        timestamp_chars.reverse()
+
+        if not duplicate_time:
+            _last_rand_chars = [_random.randrange(64) for _ in range(12)]
+        else:
+            # Same millisecond: increment the random part so keys stay ordered.
+            i = 11
+            while i >= 0 and _last_rand_chars[i] == 63:
+                _last_rand_chars[i] = 0
+                i -= 1
+            if i >= 0:
+                _last_rand_chars[i] += 1
+
+        return ''.join(timestamp_chars) + ''.join(PUSH_CHARS[c] for c in _last_rand_chars)
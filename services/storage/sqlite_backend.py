@@ -0,0 +1,204 @@
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from services.storage.base import StorageBackend
+from services.storage.push_id import generate_push_id
+from services.storage.tree import split_path, prune, assign, order_children, ORDER_BY_KEY
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'upliftai.db')
+
+# Child fields with an expression index. Records live at
+# "<collection>/<user_id>/<record_id>", so (parent, field) is the
+# (user_id, created_at) index for history queries.
+INDEXED_FIELDS = ('created_at', 'timestamp')
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS nodes (
+        path TEXT PRIMARY KEY,
+        parent TEXT NOT NULL,
+        key TEXT NOT NULL,
+        value TEXT NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_nodes_parent ON nodes (parent, key)",
+    "CREATE INDEX IF NOT EXISTS idx_nodes_parent_created_at ON nodes (parent, json_extract(value, '$.created_at'), key)",
+    "CREATE INDEX IF NOT EXISTS idx_nodes_parent_timestamp ON nodes (parent, json_extract(value, '$.timestamp'), key)",
+]
+
+
+class SQLiteBackend(StorageBackend):
+    # Embedded stand-in for Realtime Database. Each written path is stored as
+    # one JSON document; reads of a parent path assemble the documents below
+    # it, and writes below an existing document are merged into that document.
+
+    name = 'sqlite'
+
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or os.getenv('SQLITE_DB_PATH', DEFAULT_DB_PATH)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        for statement in SCHEMA:
+            self._conn.execute(statement)
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                yield
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+            self._conn.execute('COMMIT')
+
+    def _find_document(self, parts: List[str]) -> Optional[Tuple[List[str], Any]]:
+        # The document stored at `parts` or at one of its ancestors, if any.
+        if not parts:
+            return None
+        candidates = ['/'.join(parts[:i]) for i in range(1, len(parts) + 1)]
+        placeholders = ', '.join('?' for _ in candidates)
+        row = self._conn.execute(
+            f'SELECT path, value FROM nodes WHERE path IN ({placeholders}) ORDER BY length(path) LIMIT 1',
+            candidates
+        ).fetchone()
+        if row is None:
+            return None
+        return split_path(row[0]), json.loads(row[1])
+
+    def _descendants(self, path: str) -> List[Tuple[str, str]]:
+        if not path:
+            return self._conn.execute('SELECT path, value FROM nodes').fetchall()
+        # '0' is the character right after '/', so this is a prefix scan on the primary key.
+        return self._conn.execute(
+            'SELECT path, value FROM nodes WHERE path >= ? AND path < ?',
+            (path + '/', path + '0')
+        ).fetchall()
+
+    def _read(self, parts: List[str]) -> Optional[Any]:
+        found = self._find_document(parts)
+        if found:
+            doc_parts, value = found
+            for part in parts[len(doc_parts):]:
+                if not isinstance(value, dict) or part not in value:
+                    return None
+                value = value[part]
+            return value
+
+        path = '/'.join(parts)
+        rows = self._descendants(path)
+        if not rows:
+            return None
+
+        offset = len(path) + 1 if path else 0
+        result = {}
+        for row_path, raw in rows:
+            rel_parts = row_path[offset:].split('/')
+            node = result
+            for part in rel_parts[:-1]:
+                node = node.setdefault(part, {})
+            node[rel_parts[-1]] = json.loads(raw)
+        return result
+
+    def _write(self, parts: List[str], value: Any) -> None:
+        value = prune(value)
+
+        if not parts:
+            self._conn.execute('DELETE FROM nodes')
+            if isinstance(value, dict):
+                for key, child in value.items():
+                    self._write([key], child)
+            return
+
+        found = self._find_document(parts[:-1])
+        if found:
+            doc_parts, document = found
+            document = assign(document, parts[len(doc_parts):], value)
+            self._put(doc_parts, document)
+            return
+
+        path = '/'.join(parts)
+        self._conn.execute(
+            'DELETE FROM nodes WHERE path = ? OR (path >= ? AND path < ?)',
+            (path, path + '/', path + '0')
+        )
+        if value is not None:
+            self._put(parts, value)
+
+    def _put(self, parts: List[str], value: Any) -> None:
+        path = '/'.join(parts)
+        if value is None:
+            self._conn.execute('DELETE FROM nodes WHERE path = ?', (path,))
+            return
+        self._conn.execute(
+            'INSERT OR REPLACE INTO nodes (path, parent, key, value) VALUES (?, ?, ?, ?)',
+            (path, '/'.join(parts[:-1]), parts[-1], json.dumps(value))
+        )
+
+    def create(self, path: str, data: Dict[str, Any]) -> str:
+        key = generate_push_id()
+        with self._transaction():
+            self._write(split_path(path) + [key], data)
+        return key
+
+    def set(self, path: str, data: Any) -> None:
+        with self._transaction():
+            self._write(split_path(path), data)
+
+    def get(self, path: str) -> Optional[Any]:
+        with self._lock:
+            return self._read(split_path(path))
+
+    def update(self, path: str, data: Dict[str, Any]) -> None:
+        parts = split_path(path)
+        with self._transaction():
+            for key, value in data.items():
+                self._write(parts + split_path(key), value)
+
+    def delete(self, path: str) -> None:
+        with self._transaction():
+            self._write(split_path(path), None)
+
+    def transaction(self, path: str, update_fn: Callable[[Any], Any]) -> Any:
+        parts = split_path(path)
+        with self._transaction():
+            value = update_fn(self._read(parts))
+            self._write(parts, value)
+        return value
+
+    def query(self, path: str, order_by: str, start_at: Optional[str] = None,
+              end_at: Optional[str] = None, limit_to_last: Optional[int] = None) -> List[Tuple[str, Dict]]:
+        parts = split_path(path)
+        with self._lock:
+            if (order_by in INDEXED_FIELDS or order_by == ORDER_BY_KEY) and self._find_document(parts) is None:
+                return self._query_indexed('/'.join(parts), order_by, start_at, end_at, limit_to_last)
+            return order_children(self._read(parts), order_by, start_at, end_at, limit_to_last)
+
+    def _query_indexed(self, parent: str, order_by: str, start_at: Optional[str],
+                       end_at: Optional[str], limit_to_last: Optional[int]) -> List[Tuple[str, Dict]]:
+        # The expression must match the index definition for SQLite to use it.
+        field = 'key' if order_by == ORDER_BY_KEY else f"json_extract(value, '$.{order_by}')"
+        sql = 'SELECT key, value FROM nodes WHERE parent = ?'
+        params: List[Any] = [parent]
+        if start_at is not None:
+            sql += f' AND {field} >= ?'
+            params.append(start_at)
+        if end_at is not None:
+            sql += f' AND {field} <= ?'
+            params.append(end_at)
+
+        if limit_to_last:
+            sql += f' ORDER BY {field} DESC, key DESC LIMIT ?'
+            params.append(limit_to_last)
+            rows = self._conn.execute(sql, params).fetchall()
+            rows.reverse()
+        else:
+            sql += f' ORDER BY {field}, key'
+            rows = self._conn.execute(sql, params).fetchall()
+
+        return [(key, json.loads(value)) for key, value in rows]
@@ -0,0 +1,198 @@
+import asyncio
+import contextvars
+import os
+import random
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, List, Optional
+
+STORAGE_POOL_SIZE = int(os.getenv('STORAGE_POOL_SIZE', '32'))
+STORAGE_CONNECT_TIMEOUT = float(os.getenv('STORAGE_CONNECT_TIMEOUT', '3.05'))
+STORAGE_READ_TIMEOUT = float(os.getenv('STORAGE_READ_TIMEOUT', '10'))
+STORAGE_READ_RETRIES = int(os.getenv('STORAGE_READ_RETRIES', '2'))
+STORAGE_RETRY_BASE_MS = float(os.getenv('STORAGE_RETRY_BASE_MS', '50'))
+STORAGE_RETRY_MAX_MS = float(os.getenv('STORAGE_RETRY_MAX_MS', '1000'))
+STORAGE_BREAKER_THRESHOLD = int(os.getenv('STORAGE_BREAKER_THRESHOLD', '5'))
+STORAGE_BREAKER_RESET_SECONDS = float(os.getenv('STORAGE_BREAKER_RESET_SECONDS', '15'))
+
+# Only reads are retried: a push or transaction that timed out may still
+# have been applied, and repeating it would write twice.
+RETRYABLE_OPS = ('get', 'query')
+
+TRANSIENT_CODES = {'UNAVAILABLE', 'DEADLINE_EXCEEDED', 'INTERNAL', 'RESOURCE_EXHAUSTED'}
+TRANSIENT_STATUSES = {429, 500, 502, 503, 504}
+TRANSIENT_NAMES = ('Timeout', 'ConnectionError', 'ConnectError', 'TransportError', 'RemoteProtocolError')
+
+# The failure behind the current request, if any, so the API can answer
+# 503 instead of a generic 500.
+_request_failure: contextvars.ContextVar[Optional[List]] = contextvars.ContextVar(
+    'storage_request_failure', default=None)
+
+
+class StorageUnavailableError(RuntimeError):
+
+    def __init__(self, message: str, retry_after: float = 1.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def is_transient(error: Exception) -> bool:
+    if isinstance(error, StorageUnavailableError):
+        return False
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    if getattr(error, 'code', None) in TRANSIENT_CODES:
+        return True
+    if getattr(getattr(error, 'response', None), 'status_code', None) in TRANSIENT_STATUSES:
+        return True
+    if isinstance(error, sqlite3.OperationalError) and 'locked' in str(error):
+        return True
+    return any(name in cls.__name__ for cls in type(error).__mro__ for name in TRANSIENT_NAMES)
+
+
+def begin_request_scope() -> contextvars.Token:
+    return _request_failure.set([])
+
+
+def end_request_scope(token: contextvars.Token) -> Optional[StorageUnavailableError]:
+    failures = _request_failure.get() or []
+    _request_failure.reset(token)
+    return failures[-1] if failures else None
+
+
+def record_request_failure(error: StorageUnavailableError) -> None:
+    failures = _request_failure.get()
+    if failures is not None:
+        failures.append(error)
+
+
+# Opens after `threshold` consecutive calls fail with transient errors and
+# then rejects calls immediately for `reset_seconds`, so a struggling
+# backend is not met with a growing queue of threads all waiting on
+# timeouts. After that a single trial call is let through: success closes
+# the breaker, failure opens it again.
+class CircuitBreaker:
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, threshold: int = STORAGE_BREAKER_THRESHOLD,
+                 reset_seconds: float = STORAGE_BREAKER_RESET_SECONDS):
+        self.threshold = threshold
+        self.reset_seconds = reset_seconds
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.rejected = 0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def retry_after(self) -> float:
+        if self.state != self.OPEN:
+            return 1.0
+        return max(self.reset_seconds - (time.monotonic() - self.opened_at), 1.0)
+
+    def before_call(self) -> None:
+        if self.threshold <= 0:
+            return
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_seconds:
+                self.state = self.HALF_OPEN
+            if self.state == self.CLOSED:
+                return
+            if self.state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return
+            self.rejected += 1
+        raise StorageUnavailableError('Storage unavailable: circuit breaker is open', self.retry_after())
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.state = self.CLOSED
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.state == self.HALF_OPEN or (self.threshold > 0 and self.failures >= self.threshold):
+                if self.state != self.OPEN:
+                    print(f"⚠️ Storage circuit breaker opened after {self.failures} failed calls")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def stats(self) -> dict:
+        return {
+            'open': int(self.state == self.OPEN),
+            'consecutive_failures': self.failures,
+            'rejected': self.rejected
+        }
+
+
+# Runs storage calls behind the circuit breaker, retrying idempotent reads
+# on transient errors with full-jitter exponential backoff. Transient
+# failures that survive the retries surface as StorageUnavailableError
+# rather than as an empty result.
+class TransportPolicy:
+
+    def __init__(self, breaker: CircuitBreaker = None, retries: int = STORAGE_READ_RETRIES,
+                 base_ms: float = STORAGE_RETRY_BASE_MS, max_ms: float = STORAGE_RETRY_MAX_MS):
+        self.breaker = breaker or CircuitBreaker()
+        self.retries = retries
+        self.base_ms = base_ms
+        self.max_ms = max_ms
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_ms, self.base_ms * 2 ** attempt)) / 1000
+
+    def _attempts(self, op: str) -> int:
+        return 1 + (self.retries if op in RETRYABLE_OPS else 0)
+
+    def _give_up(self, op: str, error: Exception) -> StorageUnavailableError:
+        self.breaker.record_failure()
+        unavailable = StorageUnavailableError(f'Storage unavailable during {op}: {str(error)}',
+                                              self.breaker.retry_after())
+        record_request_failure(unavailable)
+        return unavailable
+
+    def _check(self) -> None:
+        try:
+            self.breaker.before_call()
+        except StorageUnavailableError as e:
+            record_request_failure(e)
+            raise
+
+    def call(self, op: str, fn: Callable, *args, **kwargs) -> Any:
+        self._check()
+        attempts = self._attempts(op)
+        for attempt in range(attempts):
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                if not is_transient(e):
+                    # The backend answered, so it is up; the error is the caller's.
+                    self.breaker.record_success()
+                    raise
+                if attempt + 1 < attempts:
+                    time.sleep(self._backoff(attempt))
+                    continue
+                raise self._give_up(op, e) from e
+            self.breaker.record_success()
+            return result
+
+    async def call_async(self, op: str, fn: Callable, *args, **kwargs) -> Any:
+        self._check()
+        attempts = self._attempts(op)
+        for attempt in range(attempts):
+            try:
+                result = await fn(*args, **kwargs)
+            except Exception as e:
+                if not is_transient(e):
+                    self.breaker.record_success()
+                    raise
+                if attempt + 1 < attempts:
+                    await asyncio.sleep(self._backoff(attempt))
+                    continue
+                raise self._give_up(op, e) from e
+            self.breaker.record_success()
+            return result
@@ -0,0 +1,87 @@
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+# Helpers for Realtime Database-style JSON trees, shared by the local backends.
+
+
+def split_path(path: str) -> List[str]:
+    return [part for part in path.strip('/').split('/') if part]
+
+
+def prune(value: Any) -> Any:
+    # Like Realtime Database, null values and empty objects are not stored.
+    if isinstance(value, dict):
+        pruned = {}
+        for key, child in value.items():
+            child = prune(child)
+            if child is not None:
+                pruned[str(key)] = child
+        return pruned or None
+    return value
+
+
+def assign(document: Any, rel_parts: List[str], value: Any) -> Any:
+    root = document if isinstance(document, dict) else {}
+    node = root
+    trail = []
+    for part in rel_parts[:-1]:
+        child = node.get(part)
+        if not isinstance(child, dict):
+            child = {}
+            node[part] = child
+        trail.append((node, part))
+        node = child
+
+    if value is None:
+        node.pop(rel_parts[-1], None)
+    else:
+        node[rel_parts[-1]] = value
+
+    for parent, part in reversed(trail):
+        if parent[part]:
+            break
+        del parent[part]
+    return root or None
+
+
+# Pass as `order_by` to order children by their own keys, like Realtime
+# Database's orderByKey. Keys are unique, so pages never tie.
+ORDER_BY_KEY = '$key'
+
+
+def child_field(key: str, value: Any, order_by: str) -> Any:
+    if order_by == ORDER_BY_KEY:
+        return key
+    return value.get(order_by) if isinstance(value, dict) else None
+
+
+def sort_rank(value: Any) -> Tuple:
+    if value is None:
+        return (0, '')
+    if isinstance(value, bool):
+        return (1, value)
+    if isinstance(value, (int, float)):
+        return (2, value)
+    if isinstance(value, str):
+        return (3, value)
+    return (4, json.dumps(value, sort_keys=True))
+
+
+def order_children(children: Any, order_by: str, start_at: Optional[str],
+                    end_at: Optional[str], limit_to_last: Optional[int]) -> List[Tuple[str, Dict]]:
+    if not isinstance(children, dict):
+        return []
+
+    rows = []
+    for key, value in children.items():
+        field = child_field(key, value, order_by)
+        if start_at is not None and (field is None or sort_rank(field) < sort_rank(start_at)):
+            continue
+        if end_at is not None and (field is None or sort_rank(field) > sort_rank(end_at)):
+            continue
+        rows.append((sort_rank(field), key, value))
+
+    rows.sort(key=lambda row: (row[0], row[1]))
+    if limit_to_last:
+        rows = rows[-limit_to_last:]
+    return [(key, value) for _, key, value in rows]
@@ -0,0 +1,269 @@
+import asyncio
+import itertools
+import json
+import os
+import queue
+import threading
+from typing import AsyncIterator, Callable, Dict, Iterator, List, Optional
+from models.journal_entry import JournalEntry
+from models.mood_entry import MoodEntry
+from services import events
+from services.firebase_service import firebase_service
+from services.metrics import metrics
+
+STREAM_SOURCE = os.getenv('STREAM_SOURCE', 'auto').lower()
+STREAM_QUEUE_SIZE = int(os.getenv('STREAM_QUEUE_SIZE', '100'))
+STREAM_HEARTBEAT_SECONDS = float(os.getenv('STREAM_HEARTBEAT_SECONDS', '15'))
+STREAM_RETRY_MS = int(os.getenv('STREAM_RETRY_MS', '3000'))
+# Each stream served by the Flask app holds a worker thread for as long as
+# it is open; past this many, new ones are told to come back later.
+STREAM_MAX_THREADED = int(os.getenv('STREAM_MAX_THREADED', '32'))
+STREAM_BUSY_RETRY_MS = int(os.getenv('STREAM_BUSY_RETRY_MS', '30000'))
+
+STREAM_SOURCES = ('auto', 'events', 'listen')
+STREAM_COLLECTIONS = ('moods', 'journals', 'user_activities')
+
+# Records are sent in the same shape as the history endpoints return them.
+FORMATTERS = {
+    'moods': MoodEntry.row_to_dict,
+    'journals': JournalEntry.row_to_dict,
+    'user_activities': lambda record_id, data: dict(data, id=record_id)
+}
+
+HEARTBEAT = ': keep-alive\n\n'
+# Proxies must neither cache nor buffer the stream.
+STREAM_HEADERS = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+
+
+def change_event(collection: str, op: str, record_id: Optional[str] = None, data: Optional[Dict] = None) -> Dict:
+    record = None
+    if isinstance(data, dict) and record_id:
+        record = FORMATTERS[collection](record_id, data)
+    return {'collection': collection, 'op': op, 'id': record_id, 'record': record}
+
+
+def encode(event_type: str, payload: Dict) -> str:
+    return f'event: {event_type}\ndata: {json.dumps(payload, default=str)}\n\n'
+
+
+# Fans changes to a user's moods, journals and activities out to every open
+# stream of that user. Changes come from the database's listeners when the
+# backend has them ("listen"), which also sees writes made by other workers,
+# or from the in-process write events ("events"). With listeners, one set is
+# opened per user when their first stream connects and is closed when their
+# last one goes away, however many devices are connected.
+class StreamHub:
+
+    def __init__(self, source: str = STREAM_SOURCE, queue_size: int = STREAM_QUEUE_SIZE,
+                 heartbeat_seconds: float = STREAM_HEARTBEAT_SECONDS, max_threaded: int = STREAM_MAX_THREADED):
+        if source not in STREAM_SOURCES:
+            raise ValueError(f"Unknown stream source '{source}', expected one of {', '.join(STREAM_SOURCES)}")
+        self._source = source
+        self.queue_size = queue_size
+        self.heartbeat_seconds = heartbeat_seconds
+        self.max_threaded = max_threaded
+        self._lock = threading.Lock()
+        self._threaded = 0
+        self._ids = itertools.count(1)
+        # {user_id: {'subscribers': {id: deliver}, 'listeners': [registration]}}
+        self._users: Dict[str, Dict] = {}
+        self.delivered = 0
+        self.overflows = 0
+        self.turned_away = 0
+
+    @property
+    def source(self) -> str:
+        # Resolved on first use, so importing the hub does not start storage.
+        if self._source == 'auto':
+            self._source = 'listen' if firebase_service.backend.name == 'firebase' else 'events'
+        return self._source
+
+    def subscribe(self, user_id: str, deliver: Callable[[Dict], None]) -> int:
+        subscriber_id = next(self._ids)
+        source = self.source
+        with self._lock:
+            user = self._users.get(user_id)
+            if user is not None:
+                user['subscribers'][subscriber_id] = deliver
+                return subscriber_id
+            user = self._users[user_id] = {'subscribers': {subscriber_id: deliver}, 'listeners': []}
+            if source == 'listen':
+                try:
+                    for collection in STREAM_COLLECTIONS:
+                        user['listeners'].append(firebase_service.listen(
+                            f'{collection}/{user_id}', self._listener(user_id, collection)))
+                except Exception:
+                    del self._users[user_id]
+                    self._close_later(user['listeners'])
+                    raise
+        return subscriber_id
+
+    def unsubscribe(self, user_id: str, subscriber_id: int) -> None:
+        with self._lock:
+            user = self._users.get(user_id)
+            if user is None:
+                return
+            user['subscribers'].pop(subscriber_id, None)
+            if user['subscribers']:
+                return
+            del self._users[user_id]
+        self._close_later(user['listeners'])
+
+    def _close_later(self, registrations: List) -> None:
+        # Closing a listener waits for its thread, so the stream that left
+        # last does not.
+        if registrations:
+            threading.Thread(target=lambda: [registration.close() for registration in registrations],
+                             name='stream-listener-close', daemon=True).start()
+
+    def publish(self, user_id: str, event: Dict) -> None:
+        with self._lock:
+            user = self._users.get(user_id)
+            subscribers = list(user['subscribers'].values()) if user else []
+        for deliver in subscribers:
+            try:
+                deliver(event)
+                self.delivered += 1
+            except Exception as e:
+                print(f"Error delivering stream event to {user_id}: {str(e)}")
+
+    def _listener(self, user_id: str, collection: str) -> Callable:
+        state = {'initial': True}
+
+        def on_change(event) -> None:
+            # The first event replays the whole collection, which the client
+            # already has from the history endpoint.
+            if state['initial']:
+                state['initial'] = False
+                return
+            parts = [part for part in (event.path or '/').split('/') if part]
+            if not parts:
+                if event.event_type == 'patch' and isinstance(event.data, dict):
+                    for record_id, data in event.data.items():
+                        self.publish(user_id, change_event(collection, 'delete' if data is None else 'create',
+                                                           record_id, data))
+                else:
+                    self.publish(user_id, change_event(collection, 'resync'))
+            elif len(parts) == 1:
+                self.publish(user_id, change_event(collection, 'delete' if event.data is None else 'create',
+                                                   parts[0], event.data))
+            else:
+                # A field inside a record changed; the client refetches it.
+                self.publish(user_id, change_event(collection, 'update', parts[0]))
+
+        return on_change
+
+    def on_write(self, event: Dict) -> None:
+        # The source is resolved by the first subscribe, so until then there
+        # is nobody to deliver to.
+        if self._source == 'events' and event['collection'] in STREAM_COLLECTIONS:
+            self.publish(event['user_id'], change_event(event['collection'], event['op'],
+                                                        event['id'], event['data']))
+
+    def _hello(self, user_id: str) -> str:
+        return f'retry: {STREAM_RETRY_MS}\n' + encode('ready', {'user_id': user_id, 'collections': STREAM_COLLECTIONS})
+
+    def open_stream(self, user_id: str) -> Iterator[str]:
+        # The text/event-stream body for the Flask app. It subscribes when the
+        # server starts sending it and unsubscribes when the client goes away,
+        # so a client that disconnects before the first chunk leaves nothing
+        # behind. Past `max_threaded` open streams, it sends a `busy` event
+        # with a longer retry and closes.
+        changes: queue.Queue = queue.Queue(self.queue_size)
+        overflowed = threading.Event()
+
+        def deliver(event: Dict) -> None:
+            try:
+                changes.put_nowait(event)
+            except queue.Full:
+                overflowed.set()
+
+        def body() -> Iterator[str]:
+            with self._lock:
+                admitted = self._threaded < self.max_threaded
+                if admitted:
+                    self._threaded += 1
+                else:
+                    self.turned_away += 1
+            if not admitted:
+                yield f'retry: {STREAM_BUSY_RETRY_MS}\n' + encode('busy', {'user_id': user_id})
+                return
+            try:
+                subscriber_id = self.subscribe(user_id, deliver)
+                try:
+                    yield self._hello(user_id)
+                    while True:
+                        try:
+                            event = changes.get(timeout=self.heartbeat_seconds)
+                        except queue.Empty:
+                            yield HEARTBEAT
+                            continue
+                        if overflowed.is_set():
+                            yield self._overflow(user_id)
+                            return
+                        yield encode('change', event)
+                finally:
+                    self.unsubscribe(user_id, subscriber_id)
+            finally:
+                with self._lock:
+                    self._threaded -= 1
+
+        return body()
+
+    async def open_stream_async(self, user_id: str) -> AsyncIterator[str]:
+        # The same stream on the event loop, for the ASGI app. Changes arrive
+        # on listener or request threads and are handed to the loop.
+        loop = asyncio.get_running_loop()
+        changes: asyncio.Queue = asyncio.Queue(self.queue_size)
+        overflowed = asyncio.Event()
+
+        def put(event: Dict) -> None:
+            try:
+                changes.put_nowait(event)
+            except asyncio.QueueFull:
+                overflowed.set()
+
+        def deliver(event: Dict) -> None:
+            loop.call_soon_threadsafe(put, event)
+
+        async def body() -> AsyncIterator[str]:
+            # Subscribes on first iteration, like open_stream.
+            subscriber_id = await asyncio.to_thread(self.subscribe, user_id, deliver)
+            try:
+                yield self._hello(user_id)
+                while True:
+                    try:
+                        event = await asyncio.wait_for(changes.get(), self.heartbeat_seconds)
+                    except asyncio.TimeoutError:
+                        yield HEARTBEAT
+                        continue
+                    if overflowed.is_set():
+                        yield self._overflow(user_id)
+                        return
+                    yield encode('change', event)
+            finally:
+                self.unsubscribe(user_id, subscriber_id)
+
+        return body()
+
+    def _overflow(self, user_id: str) -> str:
+        # A client too slow to keep up is told to refetch and reconnect
+        # rather than being sent an incomplete set of changes.
+        self.overflows += 1
+        return encode('resync', {'user_id': user_id, 'reason': 'too many pending changes'})
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'users': len(self._users),
+                'connections': sum(len(user['subscribers']) for user in self._users.values()),
+                'threaded': self._threaded,
+                'delivered': self.delivered,
+                'overflows': self.overflows,
+                'turned_away': self.turned_away
+            }
+
+
+stream_hub = StreamHub()
+metrics.register_collector('stream', stream_hub.stats)
+events.subscribe(stream_hub.on_write)
@@ -0,0 +1,299 @@
+import atexit
+import importlib
+import json
+import multiprocessing
+import os
+import random
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+from services.metrics import metrics
+
+TASK_QUEUE_ENABLED = os.getenv('TASK_QUEUE_ENABLED', 'true').lower() == 'true'
+TASK_QUEUE_PATH = os.getenv('TASK_QUEUE_PATH', os.path.join(os.path.dirname(__file__), '..', 'tasks.db'))
+TASK_QUEUE_MODE = os.getenv('TASK_QUEUE_MODE', 'thread').lower()
+TASK_QUEUE_WORKERS = int(os.getenv('TASK_QUEUE_WORKERS', '2'))
+TASK_QUEUE_CONCURRENCY = os.getenv('TASK_QUEUE_CONCURRENCY', '')
+TASK_QUEUE_MAX_ATTEMPTS = int(os.getenv('TASK_QUEUE_MAX_ATTEMPTS', '5'))
+TASK_QUEUE_RETRY_BASE_SECONDS = float(os.getenv('TASK_QUEUE_RETRY_BASE_SECONDS', '2'))
+TASK_QUEUE_RETRY_MAX_SECONDS = float(os.getenv('TASK_QUEUE_RETRY_MAX_SECONDS', '300'))
+TASK_QUEUE_POLL_SECONDS = float(os.getenv('TASK_QUEUE_POLL_SECONDS', '1'))
+TASK_QUEUE_LEASE_SECONDS = float(os.getenv('TASK_QUEUE_LEASE_SECONDS', '300'))
+
+TASK_QUEUE_MODES = ('thread', 'process')
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS tasks (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        type TEXT NOT NULL,
+        payload TEXT NOT NULL,
+        status TEXT NOT NULL,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        run_at REAL NOT NULL,
+        created_at REAL NOT NULL,
+        last_error TEXT
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_tasks_status_run_at ON tasks (status, run_at)",
+]
+
+
+def parse_concurrency(value: str) -> Dict[str, int]:
+    # "journal_sentiment=4,other=1"
+    limits = {}
+    for part in value.split(','):
+        task_type, _, limit = part.partition('=')
+        if task_type.strip() and limit.strip():
+            limits[task_type.strip()] = max(int(limit), 1)
+    return limits
+
+
+def retry_delay(attempts: int, base: float = TASK_QUEUE_RETRY_BASE_SECONDS,
+                cap: float = TASK_QUEUE_RETRY_MAX_SECONDS) -> float:
+    # Exponential backoff with jitter, so tasks that failed together during
+    # an outage are not all retried at the same moment.
+    delay = min(cap, base * 2 ** max(attempts - 1, 0))
+    return delay * random.uniform(0.5, 1.0)
+
+
+def _run_in_process(module: str, name: str, payload: Dict) -> Any:
+    # Runs in a pool process: the handler is looked up by name there.
+    handler: Any = importlib.import_module(module)
+    for attribute in name.split('.'):
+        handler = getattr(handler, attribute)
+    return handler(payload)
+
+
+# Durable queue for work that can happen after a request has been answered,
+# such as enriching a record that was just stored. Tasks are rows in a local
+# SQLite file, so they survive restarts, and are run by `workers` threads,
+# or in a pool of as many processes with TASK_QUEUE_MODE=process. Each task
+# type has a concurrency limit. A failed task is retried with exponential
+# backoff until it has been tried `max_attempts` times, and is then kept as
+# "failed" with its last error. A claimed task is leased for
+# `lease_seconds`; if its worker dies it is picked up again once the lease
+# runs out, so handlers must be safe to run twice. Several processes can
+# share one queue file.
+class TaskQueue:
+
+    def __init__(self, enabled: bool = TASK_QUEUE_ENABLED, path: str = TASK_QUEUE_PATH,
+                 mode: str = TASK_QUEUE_MODE, workers: int = TASK_QUEUE_WORKERS,
+                 concurrency: str = TASK_QUEUE_CONCURRENCY,
+                 poll_seconds: float = TASK_QUEUE_POLL_SECONDS,
+                 lease_seconds: float = TASK_QUEUE_LEASE_SECONDS):
+        if mode not in TASK_QUEUE_MODES:
+            raise ValueError(f"Unknown task queue mode '{mode}', expected one of {', '.join(TASK_QUEUE_MODES)}")
+        self.enabled = enabled
+        self.path = path
+        self.mode = mode
+        self.workers = max(workers, 1)
+        self.poll_seconds = poll_seconds
+        self.lease_seconds = lease_seconds
+        self._limits = parse_concurrency(concurrency)
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        # {type: {'handler', 'on_result', 'concurrency', 'max_attempts'}}
+        self._types: Dict[str, Dict] = {}
+        self._running: Dict[str, int] = {}
+        self._conn: Optional[sqlite3.Connection] = None
+        self._threads: List[threading.Thread] = []
+        self._processes: Optional[ProcessPoolExecutor] = None
+        self._closed = False
+        self.enqueued = 0
+        self.completed = 0
+        self.retried = 0
+
+    def register(self, task_type: str, handler: Callable[[Dict], Any], concurrency: int = 1,
+                 max_attempts: int = TASK_QUEUE_MAX_ATTEMPTS,
+                 on_result: Optional[Callable[[Dict, Any], None]] = None) -> None:
+        # In process mode the handler is imported by name in the pool, so it
+        # has to be a module-level function or a static method. `on_result`
+        # gets the payload and what the handler returned, in this process,
+        # for work such as publishing write events.
+        with self._lock:
+            self._types[task_type] = {
+                'handler': handler,
+                'on_result': on_result,
+                'concurrency': self._limits.get(task_type, max(concurrency, 1)),
+                'max_attempts': max(max_attempts, 1)
+            }
+            self._running.setdefault(task_type, 0)
+
+    def start(self) -> None:
+        # Also called on first enqueue; the app factories call it so tasks
+        # left over from an earlier run are resumed without waiting for one.
+        if not self.enabled:
+            return
+        with self._lock:
+            self._start()
+
+    def _start(self) -> None:
+        # Called with the lock held.
+        if self._conn is not None or self._closed:
+            return
+        processes = None
+        if self.mode == 'process':
+            from services.firebase_service import firebase_service
+            # The in-memory backend is private to each process.
+            if firebase_service.backend.name == 'memory':
+                print("⚠️ Task queue runs tasks in threads with the memory storage backend")
+            else:
+                processes = ProcessPoolExecutor(max_workers=self.workers,
+                                                mp_context=multiprocessing.get_context('spawn'))
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=10)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        for statement in SCHEMA:
+            conn.execute(statement)
+        self._conn = conn
+        self._processes = processes
+        for number in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f'task-worker-{number}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        atexit.register(self.close)
+
+    def enqueue(self, task_type: str, payload: Dict, delay: float = 0) -> Optional[int]:
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._lock:
+            if task_type not in self._types:
+                raise ValueError(f"Unknown task type '{task_type}'")
+            if self._closed:
+                raise RuntimeError('Task queue is shut down')
+            self._start()
+            cursor = self._conn.execute(
+                'INSERT INTO tasks (type, payload, status, run_at, created_at) VALUES (?, ?, ?, ?, ?)',
+                (task_type, json.dumps(payload), 'pending', now + delay, now)
+            )
+            self.enqueued += 1
+            if delay <= 0:
+                self._wake.notify()
+            return cursor.lastrowid
+
+    def _claim(self) -> Optional[Dict]:
+        # Called with the lock held. Takes the next due task of a type that
+        # is below its concurrency limit, or one whose lease has run out.
+        types = [task_type for task_type, spec in self._types.items()
+                 if self._running[task_type] < spec['concurrency']]
+        if not types:
+            return None
+        now = time.time()
+        placeholders = ', '.join('?' for _ in types)
+        self._conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = self._conn.execute(
+                f"SELECT id, type, payload, attempts FROM tasks WHERE status IN ('pending', 'running') "
+                f"AND run_at <= ? AND type IN ({placeholders}) ORDER BY run_at, id LIMIT 1",
+                [now, *types]
+            ).fetchone()
+            if row is not None:
+                self._conn.execute(
+                    "UPDATE tasks SET status = 'running', attempts = attempts + 1, run_at = ? WHERE id = ?",
+                    (now + self.lease_seconds, row[0])
+                )
+            self._conn.execute('COMMIT')
+        except Exception:
+            self._conn.execute('ROLLBACK')
+            raise
+        if row is None:
+            return None
+        self._running[row[1]] += 1
+        return {'id': row[0], 'type': row[1], 'payload': row[2], 'attempts': row[3] + 1}
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                task = None
+                while not self._closed:
+                    try:
+                        task = self._claim()
+                    except sqlite3.Error as e:
+                        print(f"Error claiming task: {str(e)}")
+                    if task is not None:
+                        break
+                    self._wake.wait(self.poll_seconds)
+                if task is None:
+                    return
+                spec = self._types[task['type']]
+            try:
+                payload = json.loads(task['payload'])
+                result = self._execute(spec['handler'], payload)
+            except Exception as e:
+                self._finish(task, spec, e)
+                continue
+            self._finish(task, spec, None)
+            if spec['on_result'] is not None:
+                try:
+                    spec['on_result'](payload, result)
+                except Exception as e:
+                    print(f"Error handling result of {task['type']} task {task['id']}: {str(e)}")
+
+    def _execute(self, handler: Callable[[Dict], Any], payload: Dict) -> Any:
+        if self._processes is None:
+            return handler(payload)
+        return self._processes.submit(_run_in_process, handler.__module__, handler.__qualname__, payload).result()
+
+    def _finish(self, task: Dict, spec: Dict, error: Optional[Exception]) -> None:
+        with self._lock:
+            self._running[task['type']] -= 1
+            self._wake.notify()
+            try:
+                if error is None:
+                    self._conn.execute('DELETE FROM tasks WHERE id = ?', (task['id'],))
+                    self.completed += 1
+                elif task['attempts'] >= spec['max_attempts']:
+                    self._conn.execute("UPDATE tasks SET status = 'failed', last_error = ? WHERE id = ?",
+                                       (str(error), task['id']))
+                else:
+                    self._conn.execute("UPDATE tasks SET status = 'pending', run_at = ?, last_error = ? WHERE id = ?",
+                                       (time.time() + retry_delay(task['attempts']), str(error), task['id']))
+                    self.retried += 1
+            except sqlite3.Error as e:
+                # The lease runs out and the task is run again.
+                print(f"Error recording result of task {task['id']}: {str(e)}")
+        if error is not None:
+            print(f"Error running {task['type']} task {task['id']} (attempt {task['attempts']}): {str(error)}")
+
+    def close(self) -> None:
+        # Running tasks are finished; pending ones stay queued for the next start.
+        with self._lock:
+            self._closed = True
+            self._wake.notify_all()
+            threads, self._threads = self._threads, []
+        for thread in threads:
+            thread.join()
+        if self._processes is not None:
+            self._processes.shutdown()
+            self._processes = None
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def stats(self) -> Dict:
+        with self._lock:
+            counts = {}
+            if self._conn is not None:
+                try:
+                    counts = dict(self._conn.execute('SELECT status, COUNT(*) FROM tasks GROUP BY status').fetchall())
+                except sqlite3.Error:
+                    pass
+            # Row counts cover every process sharing the queue file.
+            return {
+                'pending': counts.get('pending', 0),
+                'failed': counts.get('failed', 0),
+                'running': sum(self._running.values()),
+                'enqueued': self.enqueued,
+                'completed': self.completed,
+                'retried': self.retried,
+                'workers': self.workers
+            }
+
+
+task_queue = TaskQueue()
+metrics.register_collector('task_queue', task_queue.stats)
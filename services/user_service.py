@@ -38,10 +38,9 @@ class UserService:
             data = firebase_service.get(path)
             
             if data:
-                user = User.from_dict(user_id, data)
                 return {
                     'success': True,
-                    'user': user.to_dict()
+                    'user': User.row_to_dict(user_id, data)
                 }
             else:
                 return {
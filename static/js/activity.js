@@ -2,6 +2,7 @@ import { auth } from './FirebaseConfig.js';
 import { onAuthStateChanged } from "https://www.gstatic.com/firebasejs/10.11.1/firebase-auth.js";
 import activityViewModel from '../viewmodels/ActivityViewModel.js';
 import userViewModel from '../viewmodels/UserViewModel.js';
+import streamService from '../viewmodels/StreamService.js';
 
 
 const sidebar = document.querySelector(".sidebar");
@@ -74,6 +75,7 @@ onAuthStateChanged(auth, async (user) => {
             }
             
             await loadActivities(user.uid);
+            watchActivities(user.uid);
 
         } catch (error) {
             console.error("Error loading data:", error);
@@ -109,6 +111,18 @@ async function loadActivities(userId) {
     }
 }
 
+// Keeps the list current from the change stream instead of polling.
+function watchActivities(userId) {
+    streamService.subscribe(userId, (change) => {
+        if (change.op === 'resync' || !activityViewModel.applyChange(change)) {
+            loadActivities(userId);
+        } else if (change.collection === 'user_activities') {
+            renderActivities(activityViewModel.activities);
+            updateStats(activityViewModel.activities);
+        }
+    });
+}
+
 function renderActivities(activities) {
     activityList.innerHTML = '';
     
@@ -4,7 +4,7 @@ import journalViewModel from '../viewmodels/JournalViewModel.js';
 import moodViewModel from '../viewmodels/MoodViewModel.js';
 import userViewModel from '../viewmodels/UserViewModel.js';
 import contentViewModel from '../viewmodels/ContentViewModel.js';
-import geminiService from './GeminiService.js';
+import streamService from '../viewmodels/StreamService.js';
 
 
 const sidebar = document.querySelector(".sidebar");
@@ -210,6 +210,7 @@ onAuthStateChanged(auth, async (user) => {
 
             
             await loadEntries(user.uid);
+            watchEntries(user.uid);
             loadSuggestion(user.uid);
 
             
@@ -253,6 +254,18 @@ async function loadEntries(userId) {
     }
 }
 
+// Picks up entries written on the user's other devices without polling.
+function watchEntries(userId) {
+    streamService.subscribe(userId, (change) => {
+        if (change.op === 'resync' || !journalViewModel.applyChange(change)) {
+            loadEntries(userId).catch(error => console.error("Error refreshing entries:", error));
+        } else if (change.collection === 'journals') {
+            allEntries = journalViewModel.journals;
+            renderEntries(allEntries);
+        }
+    });
+}
+
 function renderEntries(entries) {
     journalGrid.innerHTML = '';
     
@@ -292,13 +305,27 @@ function renderEntries(entries) {
 }
 
 
+let searchTimer = null;
+
 searchInput.addEventListener('input', (e) => {
-    const term = e.target.value.toLowerCase();
-    const filtered = allEntries.filter(entry => 
-        (entry.prompt && entry.prompt.toLowerCase().includes(term)) || 
-        entry.content.toLowerCase().includes(term)
-    );
-    renderEntries(filtered);
+    const term = e.target.value.trim();
+    clearTimeout(searchTimer);
+
+    if (!term) {
+        renderEntries(allEntries);
+        return;
+    }
+
+    // Search runs on the server index; wait for the user to pause typing.
+    searchTimer = setTimeout(async () => {
+        const user = auth.currentUser;
+        if (!user) return;
+
+        const response = await journalViewModel.searchJournals(user.uid, term);
+        if (response.success && searchInput.value.trim() === term) {
+            renderEntries(response.results);
+        }
+    }, 250);
 });
 
 
@@ -345,8 +372,6 @@ async function loadSuggestion(userId) {
     `;
     
     try {
-        const recentJournals = allEntries.slice(0, 3).map(e => e.content);
-        
         let userMood = "neutral";
         const moodResponse = await moodViewModel.getUserMoods(userId, 1);
         if (moodResponse.success && moodResponse.moods.length > 0) {
@@ -360,18 +385,12 @@ async function loadSuggestion(userId) {
             userGoals = userProfile.user.goals || [];
         }
 
-        // Fetch Relevant Content (RAG)
-        const contentResponse = await contentViewModel.retrieveRelevantContent(userMood, userGoals);
-        let tips = [];
-        let quotes = [];
-        
-        if (contentResponse.success && contentResponse.content) {
-            tips = contentResponse.content.filter(c => c.type === 'Tip').map(c => c.text);
-            quotes = contentResponse.content.filter(c => c.type === 'Quote').map(c => c.text);
+        // Relevant content (RAG) and recent journals are gathered on the server
+        const aiResponse = await contentViewModel.generateWellnessContent(userId, userMood, userGoals);
+        if (!aiResponse.success) {
+            throw new Error(aiResponse.error);
         }
 
-        // Use the new combined API call to save requests
-        const aiResponse = await geminiService.generateFullWellnessContent(userMood, tips, quotes, recentJournals);
         currentPrompt = aiResponse.prompt;
 
         // Update UI with all content at once
@@ -2,8 +2,6 @@ import { auth } from './FirebaseConfig.js';
 import { onAuthStateChanged } from "https://www.gstatic.com/firebasejs/10.11.1/firebase-auth.js";
 import userViewModel from '../viewmodels/UserViewModel.js';
 import moodViewModel from '../viewmodels/MoodViewModel.js';
-import journalViewModel from '../viewmodels/JournalViewModel.js';
-import contentViewModel from '../viewmodels/ContentViewModel.js';
 
 
 const sidebar = document.querySelector(".sidebar");
@@ -79,19 +77,23 @@ onAuthStateChanged(auth, async (user) => {
             setGreeting();
 
             
-            const response = await userViewModel.getUserProfile(user.uid);
+            // Profile, stats and daily content arrive in one request.
+            const response = await userViewModel.getDashboard(user.uid, ['profile', 'stats', 'tips', 'quote']);
             if (response.success) {
-                const userData = response.user;
-                setGreeting(userData.username || 'Friend');
+                const dashboard = response.dashboard;
+                if (dashboard.profile) {
+                    const userData = dashboard.profile;
+                    setGreeting(userData.username || 'Friend');
+                    
+                    
+                    const initials = getInitials(userData.username || 'User');
+                    const avatarEl = document.getElementById('header-profile-avatar');
+                    if (avatarEl) avatarEl.textContent = initials;
+                }
                 
-                
-                const initials = getInitials(userData.username || 'User');
-                const avatarEl = document.getElementById('header-profile-avatar');
-                if (avatarEl) avatarEl.textContent = initials;
+                renderStats(dashboard.stats);
+                renderDailyContent(dashboard.tips, dashboard.quote);
             }
-            
-            await loadStats(user.uid);     
-            loadDailyContent();
             renderCalendar();
 
         } catch (error) {
@@ -126,69 +128,22 @@ function getInitials(name) {
     return (parts[0][0] + parts[parts.length - 1][0]).toUpperCase();
 }
 
-async function loadStats(userId) {
-    try {
-
-        const journalResponse = await journalViewModel.getUserJournals(userId);
-        if (journalResponse.success) {
-            const journals = journalResponse.journals || [];
-            document.getElementById('total-entries').textContent = journals.length;
-            
-            const streak = calculateStreak(journals);
-            document.getElementById('streak-count').textContent = `${streak} Days`;
-        }
-    } catch (error) {
-        console.error("Error loading stats:", error);
-    }
+function renderStats(stats) {
+    if (!stats) return;
+    const journalStats = stats.journal;
+    document.getElementById('total-entries').textContent = journalStats.total_entries;
+    document.getElementById('streak-count').textContent = `${journalStats.longest_streak} Days`;
 }
 
-function calculateStreak(journals) {
-    if (!journals || journals.length === 0) return 0;
-
-    const dates = journals.map(j => new Date(j.date).setHours(0,0,0,0))
-                          .sort((a, b) => a - b);
-    
-    const uniqueDates = [...new Set(dates)];
-
-    if (uniqueDates.length === 0) return 0;
-
-    let maxStreak = 1;
-    let currentStreak = 1;
-
-    for (let i = 0; i < uniqueDates.length - 1; i++) {
-        const current = uniqueDates[i];
-        const next = uniqueDates[i+1];
-        
-        const diffTime = Math.abs(next - current);
-        const diffDays = Math.round(diffTime / (1000 * 60 * 60 * 24)); 
-
-        if (diffDays === 1) {
-            currentStreak++;
-        } else {
-            maxStreak = Math.max(maxStreak, currentStreak);
-            currentStreak = 1;
-        }
+function renderDailyContent(tips, quote) {
+    if (tips && tips.length > 0) {
+        const randomTip = tips[Math.floor(Math.random() * tips.length)];
+        document.getElementById('wellness-tip').textContent = randomTip.text;
     }
-    
-    return Math.max(maxStreak, currentStreak);
-}
 
-async function loadDailyContent() {
-    try {
-        const tipsResponse = await contentViewModel.getWellnessTips();
-        if (tipsResponse.success && tipsResponse.tips.length > 0) {
-            const randomTip = tipsResponse.tips[Math.floor(Math.random() * tipsResponse.tips.length)];
-            document.getElementById('wellness-tip').textContent = randomTip.text;
-        }
-
-        const quoteResponse = await contentViewModel.getMotivationalQuote();
-        if (quoteResponse.success && quoteResponse.quote) {
-            const quote = quoteResponse.quote;
-            document.getElementById('daily-quote').textContent = `"${quote.text}"`;
-            document.getElementById('quote-author').textContent = `- ${quote.author || 'Unknown'}`;
-        }
-    } catch (error) {
-        console.error("Error loading daily content:", error);
+    if (quote) {
+        document.getElementById('daily-quote').textContent = `"${quote.text}"`;
+        document.getElementById('quote-author').textContent = `- ${quote.author || 'Unknown'}`;
     }
 }
 
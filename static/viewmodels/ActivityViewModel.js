@@ -70,6 +70,23 @@ class ActivityViewModel {
             this.isLoading = false;
         }
     }
+
+    // Applies a change from the stream to the loaded list. Returns false when
+    // the list has to be fetched again instead.
+    applyChange(change) {
+        if (change.collection !== 'user_activities') {
+            return true;
+        }
+        if (change.op === 'create' && change.record) {
+            this.activities = [change.record, ...this.activities.filter(item => item.id !== change.id)];
+            return true;
+        }
+        if (change.op === 'delete') {
+            this.activities = this.activities.filter(item => item.id !== change.id);
+            return true;
+        }
+        return false;
+    }
 }
 
 const activityViewModel = new ActivityViewModel();
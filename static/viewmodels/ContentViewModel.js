@@ -46,6 +46,71 @@ class ContentViewModel {
             this.isLoading = false;
         }
     }
+
+    async retrieveRelatedContent(userId, count = 3, type = null) {
+        try {
+            const params = { count };
+            if (type) params.type = type;
+
+            const response = await apiService.get(`/content/related/${userId}`, params);
+
+            if (response.success) {
+                return {
+                    success: true,
+                    content: response.data.content || [],
+                    count: response.data.count
+                };
+            }
+            return {
+                success: false,
+                error: response.error
+            };
+        } catch (error) {
+            return {
+                success: false,
+                error: error.message
+            };
+        }
+    }
+    async generateWellnessContent(userId, mood = null, goals = []) {
+        this.isLoading = true;
+        this.error = null;
+
+        try {
+            const response = await apiService.post('/content/generate', {
+                user_id: userId,
+                mood: mood,
+                goals: goals
+            });
+
+            if (response.success) {
+                this.currentPrompt = response.data.prompt;
+                return {
+                    success: true,
+                    prompt: response.data.prompt,
+                    affirmation: response.data.affirmation,
+                    quote: response.data.quote,
+                    mood: response.data.mood,
+                    source: response.data.source
+                };
+            } else {
+                this.error = response.error;
+                return {
+                    success: false,
+                    error: response.error
+                };
+            }
+        } catch (error) {
+            this.error = error.message;
+            return {
+                success: false,
+                error: error.message
+            };
+        } finally {
+            this.isLoading = false;
+        }
+    }
+
     async getWellnessTips(mood = null) {
         this.isLoading = true;
         this.error = null;
@@ -113,6 +113,62 @@ class JournalViewModel {
             this.isLoading = false;
         }
     }
+
+    async searchJournals(userId, query, pageSize = null, cursor = null) {
+        this.isLoading = true;
+        this.error = null;
+
+        try {
+            const params = { q: query };
+            if (pageSize) params.page_size = pageSize;
+            if (cursor) params.cursor = cursor;
+            const response = await apiService.get(`/journals/${userId}/search`, params);
+
+            if (response.success) {
+                return {
+                    success: true,
+                    results: response.data.results || [],
+                    count: response.data.count,
+                    nextCursor: response.data.next_cursor
+                };
+            } else {
+                this.error = response.error;
+                return {
+                    success: false,
+                    error: response.error
+                };
+            }
+        } catch (error) {
+            this.error = error.message;
+            return {
+                success: false,
+                error: error.message
+            };
+        } finally {
+            this.isLoading = false;
+        }
+    }
+
+    // Applies a change from the stream to the loaded list. Returns false when
+    // the list has to be fetched again instead.
+    applyChange(change) {
+        if (change.collection !== 'journals') {
+            return true;
+        }
+        if (change.op === 'create' && change.record) {
+            this.journals = [change.record, ...this.journals.filter(item => item.journal_id !== change.id)];
+            return true;
+        }
+        if (change.op === 'delete') {
+            this.journals = this.journals.filter(item => item.journal_id !== change.id);
+            return true;
+        }
+        if (change.op === 'update' && change.record) {
+            this.journals = this.journals.map(item => item.journal_id === change.id ? change.record : item);
+            return true;
+        }
+        return false;
+    }
 }
 
 const journalViewModel = new JournalViewModel();
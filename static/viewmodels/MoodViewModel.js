@@ -84,6 +84,20 @@ class MoodViewModel {
             this.isLoading = false;
         }
     }
+
+    // Applies a change from the stream to the loaded list. Returns false when
+    // the list has to be fetched again instead; mood records carry no id, so
+    // only new entries can be applied in place.
+    applyChange(change) {
+        if (change.collection !== 'moods') {
+            return true;
+        }
+        if (change.op === 'create' && change.record) {
+            this.moods = [change.record, ...this.moods];
+            return true;
+        }
+        return false;
+    }
 }
 
 const moodViewModel = new MoodViewModel();
@@ -0,0 +1,62 @@
+// One server-sent events connection per page to /api/stream/<userId>.
+// Handlers receive change objects ({collection, op, id, record}); an op of
+// 'resync' means changes may have been missed (first connect, reconnect or
+// a slow client) and lists should be fetched again.
+class StreamService {
+    constructor() {
+        this.baseURL = '/api/stream';
+        this.source = null;
+        this.userId = null;
+        this.handlers = new Set();
+    }
+
+    subscribe(userId, handler) {
+        if (this.userId !== userId) {
+            this.close();
+            this.userId = userId;
+        }
+        this.handlers.add(handler);
+        if (!this.source && typeof EventSource !== 'undefined') {
+            this.open();
+        }
+        return () => {
+            this.handlers.delete(handler);
+            if (this.handlers.size === 0) {
+                this.close();
+            }
+        };
+    }
+
+    open() {
+        this.source = new EventSource(`${this.baseURL}/${encodeURIComponent(this.userId)}`);
+
+        // Sent on every (re)connect: anything written while disconnected
+        // is only in the history endpoints.
+        this.source.addEventListener('ready', () => this.dispatch({ op: 'resync' }));
+        this.source.addEventListener('change', (event) => this.dispatch(JSON.parse(event.data)));
+        this.source.addEventListener('resync', () => {
+            this.dispatch({ op: 'resync' });
+            // The server ends the stream after a resync; EventSource reconnects.
+        });
+    }
+
+    dispatch(change) {
+        this.handlers.forEach(handler => {
+            try {
+                handler(change);
+            } catch (error) {
+                console.error('Stream handler failed:', error);
+            }
+        });
+    }
+
+    close() {
+        if (this.source) {
+            this.source.close();
+            this.source = null;
+        }
+    }
+}
+
+const streamService = new StreamService();
+export default streamService;
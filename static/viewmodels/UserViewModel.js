@@ -3,6 +3,7 @@ import apiService from './ApiService.js';
 class UserViewModel {
     constructor() {
         this.currentUser = null;
+        this.stats = null;
         this.isLoading = false;
         this.error = null;
     }
@@ -75,6 +76,72 @@ class UserViewModel {
             this.isLoading = false;
         }
     }
+
+    async getUserStats(userId) {
+        this.isLoading = true;
+        this.error = null;
+
+        try {
+            const response = await apiService.get(`/users/${userId}/stats`);
+
+            if (response.success) {
+                this.stats = response.data.stats;
+                return {
+                    success: true,
+                    stats: this.stats
+                };
+            } else {
+                this.error = response.error;
+                return {
+                    success: false,
+                    error: response.error
+                };
+            }
+        } catch (error) {
+            this.error = error.message;
+            return {
+                success: false,
+                error: error.message
+            };
+        } finally {
+            this.isLoading = false;
+        }
+    }
+
+    async getDashboard(userId, fields = []) {
+        this.isLoading = true;
+        this.error = null;
+
+        try {
+            const params = fields.length ? { fields: fields.join(',') } : {};
+            const response = await apiService.get(`/dashboard/${userId}`, params);
+
+            if (response.success) {
+                const dashboard = response.data.dashboard;
+                if (dashboard.profile) this.currentUser = dashboard.profile;
+                if (dashboard.stats) this.stats = dashboard.stats;
+                return {
+                    success: true,
+                    dashboard: dashboard,
+                    errors: response.data.errors
+                };
+            } else {
+                this.error = response.error;
+                return {
+                    success: false,
+                    error: response.error
+                };
+            }
+        } catch (error) {
+            this.error = error.message;
+            return {
+                success: false,
+                error: error.message
+            };
+        } finally {
+            this.isLoading = false;
+        }
+    }
 }
 
 const userViewModel = new UserViewModel();
@@ -0,0 +1,137 @@
+import base64
+import json
+import pytest
+from services.storage.tree import order_children
+from utils.pagination import decode_cursor, encode_cursor, page_bounds, refetch_count, trim_page
+from utils.validators import validate_pagination
+
+
+def tied_records(runs):
+    # {key: {'created_at': ...}} with `count` records sharing each timestamp.
+    records = {}
+    for day, count in enumerate(runs, start=1):
+        for i in range(count):
+            records[f'k{day:02d}{i:02d}'] = {'created_at': f'2024-05-{day:02d}T09:00:00'}
+    return records
+
+
+def newest_first(records):
+    return sorted(records, key=lambda key: (records[key]['created_at'], key), reverse=True)
+
+
+def get_page(records, page_size, cursor=None, until=None):
+    # FirebaseService.get_page against an in-memory tree, counting queries.
+    end_at, fetch_count, after = page_bounds(until, cursor, page_size)
+    queries = 0
+    while True:
+        queries += 1
+        rows = order_children(records, 'created_at', None, end_at, fetch_count)
+        fetch_count = refetch_count(rows, 'created_at', after, fetch_count, page_size)
+        if fetch_count is None:
+            rows, next_cursor = trim_page(rows, 'created_at', after, page_size)
+            return [key for key, _ in rows], next_cursor, queries
+
+
+def all_pages(records, page_size):
+    pages, cursor = [], None
+    while True:
+        keys, cursor, _ = get_page(records, page_size, cursor)
+        pages.append(keys)
+        if cursor is None:
+            return pages
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor('2024-05-01T09:00:00', '-Nx_ü')
+    assert '=' not in cursor
+    assert decode_cursor(cursor) == ('2024-05-01T09:00:00', '-Nx_ü')
+
+
+@pytest.mark.parametrize('page_size', [1, 2, 3, 5, 7, 50])
+def test_pages_cover_ties_once_in_order(page_size):
+    records = tied_records([4, 9, 1, 6, 3])
+    pages = all_pages(records, page_size)
+    assert [key for page in pages for key in page] == newest_first(records)
+    assert all(len(page) <= page_size for page in pages)
+
+
+def test_page_splits_inside_a_run_of_equal_timestamps():
+    records = tied_records([2, 10, 2])
+    order = newest_first(records)
+    first, cursor, _ = get_page(records, 4)
+    assert first == order[:4]
+    # The boundary falls inside the run of ten, so the next query returns
+    # rows already served and has to fetch again to fill the page.
+    assert records[first[-1]]['created_at'] == records[order[4]]['created_at']
+    second, cursor, queries = get_page(records, 4, cursor)
+    assert second == order[4:8]
+    assert queries > 1
+    third, _, _ = get_page(records, 4, cursor)
+    assert third == order[8:12]
+
+
+def test_whole_page_of_ties():
+    records = tied_records([12])
+    assert all_pages(records, 5) == [newest_first(records)[:5], newest_first(records)[5:10],
+                                     newest_first(records)[10:]]
+
+
+def test_last_full_page_has_no_cursor():
+    records = tied_records([3, 3])
+    first, cursor, _ = get_page(records, 3)
+    second, next_cursor, _ = get_page(records, 3, cursor)
+    assert first + second == newest_first(records)
+    assert next_cursor is None
+
+
+def test_cursor_at_last_item_gives_empty_page():
+    records = tied_records([2, 3])
+    oldest = newest_first(records)[-1]
+    cursor = encode_cursor(records[oldest]['created_at'], oldest)
+    assert get_page(records, 3, cursor)[:2] == ([], None)
+
+
+def test_until_and_cursor_bound_together():
+    records = tied_records([3, 3, 3])
+    keys, _, _ = get_page(records, 10, until='2024-05-02')
+    assert keys == newest_first(records)[3:]
+    cursor = encode_cursor(records[keys[0]]['created_at'], keys[0])
+    assert get_page(records, 10, cursor, until='2024-05-03')[0] == keys[1:]
+
+
+def test_refetch_count_only_grows_when_ties_crowd_out_the_page():
+    after = ('2024-05-02', 'k0202')
+    crowded = [(f'k02{i:02d}', {'created_at': '2024-05-02'}) for i in range(6)]
+    # Only two of the six rows sort before the cursor.
+    assert refetch_count(crowded, 'created_at', after, 6, 4) == 12
+    # Enough rows before the cursor to fill the page and tell if another follows.
+    assert refetch_count(crowded, 'created_at', ('2024-05-02', 'k0205'), 6, 4) is None
+    # Fewer rows than asked for: nothing more to fetch.
+    assert refetch_count(crowded[:5], 'created_at', after, 6, 4) is None
+    # No cursor: the first page never refetches.
+    assert refetch_count(crowded, 'created_at', None, 6, 4) is None
+
+
+@pytest.mark.parametrize('cursor', [
+    'not a cursor!',
+    'e30',  # {}
+    base64.urlsafe_b64encode(json.dumps(['only one']).encode()).decode(),
+    base64.urlsafe_b64encode(json.dumps([1, 'key']).encode()).decode(),
+    base64.urlsafe_b64encode(b'\xff\xfe').decode(),
+])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+    with pytest.raises(ValueError):
+        page_bounds(cursor=cursor, page_size=10)
+    assert not validate_pagination(10, cursor)
+
+
+@pytest.mark.parametrize('page_size', ['0', '-1', 'abc', '501', 0])
+def test_invalid_page_size_is_rejected(page_size):
+    assert not validate_pagination(page_size)
+
+
+def test_valid_pagination_parameters():
+    assert validate_pagination('20', encode_cursor('2024-05-01', 'k'))
+    assert validate_pagination(None, None)
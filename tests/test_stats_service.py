@@ -0,0 +1,145 @@
+import pytest
+from services import events
+from services.firebase_service import firebase_service
+from services.stats_service import StatsService
+from services.storage import create_backend
+
+USER = 'u1'
+
+
+@pytest.fixture(autouse=True)
+def storage(monkeypatch):
+    monkeypatch.setattr(firebase_service, '_backend', create_backend('memory'))
+
+
+def mood(mood='Calm', energy='High', day='2024-05-01'):
+    return {'mood': mood, 'energy': energy, 'date': day, 'created_at': f'{day}T09:00:00'}
+
+
+def create(record_id, data, collection='moods'):
+    firebase_service.set(f'{collection}/{USER}/{record_id}', data)
+    return events.write_event(collection, USER, 'create', record_id, data)
+
+
+def delete(record_id, collection='moods'):
+    data = firebase_service.get(f'{collection}/{USER}/{record_id}')
+    firebase_service.delete(f'{collection}/{USER}/{record_id}')
+    return events.write_event(collection, USER, 'delete', record_id, data)
+
+
+def stored_stats():
+    return firebase_service.get(f'user_stats/{USER}')
+
+
+def during_rebuild(monkeypatch, writes):
+    # Runs `writes` once the rebuild has put its marker in and read the
+    # user's moods, as if they came from another request meanwhile.
+    get = firebase_service.get
+
+    def racing_get(path):
+        value = get(path)
+        if path == f'moods/{USER}' and writes:
+            assert 'building' in stored_stats()
+            batch = [write() for write in writes]
+            writes.clear()
+            StatsService.record_events(batch)
+        return value
+
+    monkeypatch.setattr(firebase_service, 'get', racing_get)
+
+
+def test_record_events_applies_a_batch_in_one_transaction(monkeypatch):
+    StatsService.rebuild_user_stats(USER)
+    transactions = []
+    transaction = firebase_service.transaction
+    monkeypatch.setattr(firebase_service, 'transaction',
+                        lambda path, fn: transactions.append(path) or transaction(path, fn))
+
+    StatsService.record_events([create(f'm{i}', mood(day=f'2024-05-0{i + 1}')) for i in range(5)])
+
+    assert transactions == [f'user_stats/{USER}']
+    stats = stored_stats()
+    assert stats['mood_count'] == 5
+    assert stats['mood_counts'] == {'Calm': 5}
+
+
+def test_record_events_skips_users_without_stats():
+    StatsService.record_events([create('m1', mood())])
+    assert stored_stats() is None
+
+
+def test_record_events_ignores_untracked_and_empty_events():
+    StatsService.rebuild_user_stats(USER)
+    StatsService.record_events([
+        events.write_event('content', USER, 'create', 'c1', {'text': 'x'}),
+        events.write_event('moods', USER, 'update', 'm1', mood()),
+        events.write_event('moods', USER, 'delete', 'm2', None)
+    ])
+    assert stored_stats().get('mood_count', 0) == 0
+
+
+def test_create_during_rebuild_is_counted(monkeypatch):
+    create('m1', mood())
+    during_rebuild(monkeypatch, [lambda: create('m2', mood('Sad', 'Low', '2024-05-02'))])
+
+    stats = StatsService.rebuild_user_stats(USER)
+
+    assert 'building' not in stats and 'pending' not in stats
+    assert stats['mood_count'] == 2
+    assert stats['mood_counts'] == {'Calm': 1, 'Sad': 1}
+
+
+def test_create_seen_by_rebuild_is_not_counted_twice(monkeypatch):
+    # The record is in the history the rebuild read, and its event is
+    # replayed while the rebuild is still running.
+    event = create('m1', mood())
+    during_rebuild(monkeypatch, [lambda: event, lambda: event])
+
+    stats = StatsService.rebuild_user_stats(USER)
+
+    assert stats['mood_count'] == 1
+    assert stats['mood_counts'] == {'Calm': 1}
+
+
+def test_delete_of_record_rebuild_did_not_see_is_ignored(monkeypatch):
+    create('m1', mood())
+    firebase_service.set(f'moods/{USER}/gone', mood('Sad'))
+    removed = delete('gone')
+    during_rebuild(monkeypatch, [lambda: removed])
+
+    stats = StatsService.rebuild_user_stats(USER)
+
+    assert stats['mood_count'] == 1
+    assert stats['mood_counts'] == {'Calm': 1}
+
+
+def test_delete_of_record_rebuild_saw_is_applied(monkeypatch):
+    create('m1', mood())
+    create('m2', mood('Sad'))
+    during_rebuild(monkeypatch, [lambda: delete('m2')])
+
+    stats = StatsService.rebuild_user_stats(USER)
+
+    assert stats['mood_count'] == 1
+    assert stats['mood_counts'] == {'Calm': 1}
+
+
+def test_create_and_delete_during_rebuild_cancel_out(monkeypatch):
+    create('m1', mood())
+    during_rebuild(monkeypatch, [lambda: create('m2', mood('Sad')), lambda: delete('m2')])
+
+    stats = StatsService.rebuild_user_stats(USER)
+
+    assert stats['mood_count'] == 1
+    assert stats['mood_counts'] == {'Calm': 1}
+
+
+def test_finished_rebuild_is_not_overwritten():
+    create('m1', mood())
+    StatsService.rebuild_user_stats(USER)
+    # Counted from its event only, so a rebuild from history would drop it.
+    StatsService.record_events([events.write_event('moods', USER, 'create', 'm2', mood('Sad'))])
+
+    stats = StatsService.rebuild_user_stats(USER)
+
+    assert stats['mood_count'] == 2
@@ -0,0 +1,101 @@
+import sqlite3
+import threading
+import pytest
+from services import task_queue as task_queue_module
+from services.task_queue import TaskQueue
+
+WAIT_SECONDS = 5
+
+
+@pytest.fixture
+def queues(tmp_path):
+    created = []
+
+    def make(**options):
+        options.setdefault('workers', 1)
+        queue = TaskQueue(enabled=True, path=str(tmp_path / 'tasks.db'), poll_seconds=0.01, **options)
+        created.append(queue)
+        return queue
+
+    yield make
+    for queue in created:
+        queue.close()
+
+
+def rows(queue):
+    with sqlite3.connect(queue.path) as conn:
+        return conn.execute('SELECT status, attempts, last_error FROM tasks').fetchall()
+
+
+def test_expired_lease_is_claimed_again(queues):
+    # The first queue's worker takes the task and never finishes it, as if
+    # its process had hung; another queue on the same file runs it once the
+    # lease is up.
+    claimed, release = threading.Event(), threading.Event()
+
+    def stuck(payload):
+        claimed.set()
+        release.wait(WAIT_SECONDS)
+
+    stalled = queues(lease_seconds=0.5)
+    stalled.register('note', stuck)
+    stalled.enqueue('note', {'n': 1})
+    assert claimed.wait(WAIT_SECONDS)
+    assert rows(stalled) == [('running', 1, None)]
+
+    ran = []
+    done = threading.Event()
+
+    def record(payload):
+        ran.append(payload)
+        done.set()
+
+    other = queues(lease_seconds=0.5)
+    other.register('note', record)
+    other.start()
+    # Not while the lease holds.
+    assert not done.wait(0.2)
+    assert done.wait(WAIT_SECONDS)
+    assert ran == [{'n': 1}]
+    release.set()
+
+
+def test_reclaimed_task_counts_attempts(queues):
+    seen = []
+    done, release = threading.Event(), threading.Event()
+    queue = queues(workers=2, lease_seconds=0.2)
+
+    def handler(payload):
+        seen.append(rows(queue))
+        if len(seen) == 1:
+            # Outlives its lease, so the other worker is handed the task.
+            release.wait(WAIT_SECONDS)
+        else:
+            done.set()
+
+    queue.register('note', handler, concurrency=2)
+    queue.enqueue('note', {'n': 1})
+    assert done.wait(WAIT_SECONDS)
+    assert seen == [[('running', 1, None)], [('running', 2, None)]]
+    release.set()
+
+
+def test_failed_task_is_retried_then_kept_as_failed(queues, monkeypatch):
+    monkeypatch.setattr(task_queue_module, 'retry_delay', lambda attempts: 0)
+    calls = []
+    done = threading.Event()
+
+    def failing(payload):
+        calls.append(payload)
+        if len(calls) == 3:
+            done.set()
+        raise RuntimeError('boom')
+
+    queue = queues()
+    queue.register('note', failing, max_attempts=3)
+    queue.enqueue('note', {'n': 1})
+    assert done.wait(WAIT_SECONDS)
+    queue.close()
+    assert len(calls) == 3
+    assert rows(queue) == [('failed', 3, 'boom')]
+    assert queue.retried == 2
@@ -0,0 +1,160 @@
+import asyncio
+import pytest
+from services.storage import transport
+from services.storage.transport import CircuitBreaker, StorageUnavailableError, TransportPolicy
+
+
+class Clock:
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(transport.time, 'monotonic', clock)
+    return clock
+
+
+class Flaky:
+    # Fails with `error` the first `failures` times it is called.
+
+    def __init__(self, failures: int, error: Exception = None):
+        self.failures = failures
+        self.error = error or TimeoutError('timed out')
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise self.error
+        return 'ok'
+
+
+def test_breaker_opens_after_threshold_failures(clock):
+    breaker = CircuitBreaker(threshold=3, reset_seconds=10)
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(StorageUnavailableError) as raised:
+        breaker.before_call()
+    assert raised.value.retry_after == 10
+    assert breaker.rejected == 1
+
+
+def test_breaker_success_resets_failure_count(clock):
+    breaker = CircuitBreaker(threshold=2, reset_seconds=10)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_half_open_breaker_lets_one_trial_through_and_closes(clock):
+    breaker = CircuitBreaker(threshold=1, reset_seconds=10)
+    breaker.record_failure()
+    clock.now += 9
+    with pytest.raises(StorageUnavailableError):
+        breaker.before_call()
+
+    clock.now += 1
+    breaker.before_call()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    # Only the one trial while it is in flight.
+    with pytest.raises(StorageUnavailableError):
+        breaker.before_call()
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.before_call()
+    breaker.before_call()
+
+
+def test_failed_trial_opens_breaker_again(clock):
+    breaker = CircuitBreaker(threshold=5, reset_seconds=10)
+    for _ in range(5):
+        breaker.record_failure()
+    clock.now += 10
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.opened_at == clock.now
+    with pytest.raises(StorageUnavailableError):
+        breaker.before_call()
+
+
+def test_disabled_breaker_never_opens(clock):
+    breaker = CircuitBreaker(threshold=0, reset_seconds=10)
+    for _ in range(10):
+        breaker.record_failure()
+        breaker.before_call()
+
+
+@pytest.mark.parametrize('op', ['get', 'query'])
+def test_reads_are_retried(op):
+    policy = TransportPolicy(CircuitBreaker(threshold=5), retries=2, base_ms=0)
+    fn = Flaky(failures=2)
+    assert policy.call(op, fn) == 'ok'
+    assert fn.calls == 3
+    assert policy.breaker.failures == 0
+
+
+def test_read_gives_up_after_retries():
+    policy = TransportPolicy(CircuitBreaker(threshold=5), retries=2, base_ms=0)
+    fn = Flaky(failures=10)
+    with pytest.raises(StorageUnavailableError):
+        policy.call('get', fn)
+    assert fn.calls == 3
+    # One failure for the call, not one per attempt.
+    assert policy.breaker.failures == 1
+
+
+@pytest.mark.parametrize('op', ['set', 'update', 'push', 'delete', 'transaction'])
+def test_writes_are_not_retried(op):
+    policy = TransportPolicy(CircuitBreaker(threshold=5), retries=2, base_ms=0)
+    fn = Flaky(failures=1)
+    with pytest.raises(StorageUnavailableError):
+        policy.call(op, fn)
+    assert fn.calls == 1
+
+
+def test_non_transient_errors_are_not_retried():
+    policy = TransportPolicy(CircuitBreaker(threshold=1), retries=2, base_ms=0)
+    fn = Flaky(failures=1, error=ValueError('bad path'))
+    with pytest.raises(ValueError):
+        policy.call('get', fn)
+    assert fn.calls == 1
+    assert policy.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_open_breaker_rejects_without_calling():
+    policy = TransportPolicy(CircuitBreaker(threshold=1, reset_seconds=60), retries=2, base_ms=0)
+    with pytest.raises(StorageUnavailableError):
+        policy.call('set', Flaky(failures=1))
+    fn = Flaky(failures=0)
+    with pytest.raises(StorageUnavailableError):
+        policy.call('get', fn)
+    assert fn.calls == 0
+
+
+def test_async_reads_are_retried_and_writes_are_not():
+    policy = TransportPolicy(CircuitBreaker(threshold=5), retries=2, base_ms=0)
+    read, write = Flaky(failures=2), Flaky(failures=1)
+
+    async def call(fn):
+        return fn()
+
+    assert asyncio.run(policy.call_async('get', call, read)) == 'ok'
+    assert read.calls == 3
+    with pytest.raises(StorageUnavailableError):
+        asyncio.run(policy.call_async('update', call, write))
+    assert write.calls == 1
@@ -0,0 +1,80 @@
+import base64
+import json
+from typing import Dict, List, Optional, Tuple
+
+MAX_PAGE_SIZE = 500
+
+# Appended to an upper bound so that a date like "2024-05-01" still matches
+# every timestamp recorded on that day ("2024-05-01T09:30:00" sorts after it).
+RANGE_END_SUFFIX = '\uf8ff'
+
+
+def encode_cursor(value: str, key: str) -> str:
+    raw = json.dumps([value, key]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        value, key = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except Exception:
+        raise ValueError(f'Invalid cursor: {cursor}')
+
+    if not isinstance(value, str) or not isinstance(key, str):
+        raise ValueError(f'Invalid cursor: {cursor}')
+    return value, key
+
+
+def range_end(until: Optional[str]) -> Optional[str]:
+    if not until:
+        return None
+    return until + RANGE_END_SUFFIX
+
+
+def page_bounds(until: Optional[str] = None, cursor: Optional[str] = None,
+                page_size: Optional[int] = None) -> Tuple[Optional[str], Optional[int], Optional[Tuple[str, str]]]:
+    # (end_at, fetch_count, after) for a newest-first page query.
+    end_at = range_end(until)
+    after = None
+    if cursor:
+        after = decode_cursor(cursor)
+        end_at = after[0] if end_at is None else min(end_at, after[0])
+
+    fetch_count = None
+    if page_size:
+        # One extra row tells us whether another page exists; with a
+        # cursor the boundary row itself comes back again as well.
+        fetch_count = page_size + (2 if after else 1)
+    return end_at, fetch_count, after
+
+
+def refetch_count(rows: List[Tuple[str, Dict]], order_by: str, after: Optional[Tuple[str, str]],
+                  fetch_count: Optional[int], page_size: Optional[int]) -> Optional[int]:
+    # A cursor query can only end at the boundary value, not at the boundary
+    # key, so rows tied with the boundary row on `order_by` come back again
+    # and are dropped by trim_page. When enough of them came back to crowd
+    # out the rows the page needs, returns a larger count to fetch again
+    # with; None once the page is complete or there are no more rows.
+    if not after or not fetch_count or len(rows) < fetch_count:
+        return None
+    kept = sum(1 for key, value in rows if (value.get(order_by) or '', key) < after)
+    if kept > page_size:
+        return None
+    return fetch_count * 2
+
+
+def trim_page(rows: List[Tuple[str, Dict]], order_by: str, after: Optional[Tuple[str, str]],
+              page_size: Optional[int]) -> Tuple[List[Tuple[str, Dict]], Optional[str]]:
+    # Turns ascending query rows into a newest-first page and its next cursor.
+    if after:
+        rows = [(key, value) for key, value in rows if (value.get(order_by) or '', key) < after]
+    rows = rows[::-1]
+
+    next_cursor = None
+    if page_size and len(rows) > page_size:
+        rows = rows[:page_size]
+        last_key, last_value = rows[-1]
+        next_cursor = encode_cursor(last_value.get(order_by) or '', last_key)
+    return rows, next_cursor
+
@@ -0,0 +1,79 @@
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Optional
+
+PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'false').lower() == 'true'
+PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', '0'))
+PROFILE_INTERVAL_MS = float(os.getenv('PROFILE_INTERVAL_MS', '2'))
+PROFILE_DIR = os.getenv('PROFILE_DIR', 'profiles')
+PROFILE_MAX_DEPTH = 128
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f'{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})'
+
+
+# Samples the stack of one thread from a background thread every interval
+# and aggregates identical stacks, so the request being profiled runs at
+# full speed apart from the GIL hand-offs. The result is written in the
+# folded format read by flamegraph.pl, speedscope and inferno.
+class SamplingProfiler:
+
+    def __init__(self, thread_id: Optional[int] = None, interval_ms: float = PROFILE_INTERVAL_MS):
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval_ms / 1000
+        self.samples: Counter = Counter()
+        self.started_at = 0.0
+        self.elapsed = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None and len(stack) < PROFILE_MAX_DEPTH:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            self.samples[';'.join(reversed(stack))] += 1
+
+    def start(self) -> 'SamplingProfiler':
+        self.started_at = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def stop(self) -> 'SamplingProfiler':
+        self._stop.set()
+        self._thread.join()
+        self.elapsed = time.perf_counter() - self.started_at
+        return self
+
+    def folded(self) -> str:
+        return ''.join(f'{stack} {count}\n' for stack, count in self.samples.most_common())
+
+    def dump(self, name: str, directory: str = PROFILE_DIR) -> str:
+        os.makedirs(directory, exist_ok=True)
+        safe_name = ''.join(ch if ch.isalnum() or ch in '-_' else '_' for ch in name).strip('_')
+        filename = f"{datetime.utcnow().strftime('%Y%m%dT%H%M%S%f')}-{safe_name or 'request'}.folded"
+        path = os.path.join(directory, filename)
+        with open(path, 'w') as f:
+            f.write(self.folded())
+        return path
+
+
+def should_profile(header_value: Optional[str]) -> bool:
+    # The X-Profile header is only honoured when profiling is switched on, so
+    # clients cannot make a production server write profiles on demand.
+    if not PROFILING_ENABLED:
+        return False
+    if header_value and header_value.lower() in ('1', 'true', 'yes'):
+        return True
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
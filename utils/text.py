@@ -0,0 +1,51 @@
+import re
+from typing import List
+
+_WORD = re.compile(r'[a-z0-9]+')
+
+STOPWORDS = frozenset("""
+a about after again all also always am an and any are as at be because been before
+being but by can could did didn't do does doing don't down during each even every
+feel feeling felt for from get got going had has have having he her here him his how
+i i'm if in into is it it's its just know like little made make me more most much my
+need no not of on one only or other our out really right said same she should so some
+still than that the their them then there these they thing things think this those
+through time to today too up very want was we were what when where which while who
+will with would you your
+""".replace("'", '').split())
+
+_DOUBLE_CONSONANT = re.compile(r'([b-df-hj-np-tv-z])\1$')
+_VOWEL = re.compile(r'[aeiouy]')
+
+
+def stem(word: str) -> str:
+    # Light suffix stripping: enough to match "stressed", "stressful" and
+    # "stress", without the full Porter rule set.
+    if len(word) <= 3 or word.isdigit():
+        return word
+
+    if word.endswith('sses'):
+        word = word[:-2]
+    elif word.endswith('ies') and len(word) > 4:
+        word = word[:-3] + 'y'
+    elif word.endswith('s') and not word.endswith(('ss', 'us', 'is')):
+        word = word[:-1]
+
+    for suffix in ('fulness', 'ness', 'ment', 'ful', 'ing', 'ly', 'ed'):
+        root = word[:-len(suffix)]
+        if word.endswith(suffix) and len(root) >= 3 and _VOWEL.search(root):
+            word = root
+            if suffix in ('ing', 'ed') and _DOUBLE_CONSONANT.search(word) and not word.endswith(('ll', 'ss', 'zz')):
+                word = word[:-1]
+            break
+
+    # "happiness" and "happily" strip to "happi"; map it back to "happy".
+    if word.endswith('i'):
+        word = word[:-1] + 'y'
+    return word
+
+
+def tokenize(text: str, stemmed: bool = True) -> List[str]:
+    words = _WORD.findall((text or '').lower().replace("'", '').replace('\u2019', ''))
+    tokens = [word for word in words if len(word) > 1 and word not in STOPWORDS]
+    return [stem(token) for token in tokens] if stemmed else tokens
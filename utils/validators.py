@@ -1,5 +1,6 @@
 import re
-from typing import Dict, List
+from typing import Dict, List, Union
+from utils.pagination import MAX_PAGE_SIZE, decode_cursor
 
 def validate_email(email: str) -> bool:
     pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
@@ -7,4 +8,23 @@ def validate_email(email: str) -> bool:
 
 
 def validate_required_fields(data: Dict, required_fields: List[str]) -> bool:
-    return all(field in data and data[field] for field in required_fields)
\ No newline at end of file
+    return all(field in data and data[field] for field in required_fields)
+
+
+def validate_pagination(page_size: Union[int, str] = None, cursor: str = None) -> bool:
+    # page_size may be the raw query string value, which has to be a whole
+    # number: "0" or "abc" must not silently mean "no limit".
+    if page_size is not None:
+        if isinstance(page_size, str):
+            if not page_size.isdigit():
+                return False
+            page_size = int(page_size)
+        if not 0 < page_size <= MAX_PAGE_SIZE:
+            return False
+
+    if cursor:
+        try:
+            decode_cursor(cursor)
+        except ValueError:
+            return False
+    return True